@@ -0,0 +1,113 @@
+import datetime
+import logging
+
+from flask_restful import Resource, reqparse
+
+import config
+from cache import TTLCache
+from models import db, Reservation, find_flowers_by_names
+from Resources.FlowerPriceCalculator import calculate_bouquet_price, bouquet_error_response
+
+# Налаштування логування
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Ключові слова всіх зон одним списком, найдовші першими, щоб "печерськ" не перекривався коротшими словами
+ZONE_KEYWORDS = sorted(
+    ((keyword.casefold(), zone) for zone, table in config.DELIVERY_ZONES.items() for keyword in table['keywords']),
+    key=lambda item: len(item[0]),
+    reverse=True,
+)
+
+# Кількість замовлень за годину змінюється повільно - рахуємо її не частіше ніж раз на 30 секунд
+recent_orders_cache = TTLCache(ttl=config.DELIVERY_LOAD_CACHE_SECONDS)
+
+
+def resolve_zone(address: str = None, zone: str = None) -> str:
+    """Визначає зону доставки: явно передана зона, інакше перше ключове слово в адресі."""
+    if zone in config.DELIVERY_ZONES:
+        return zone
+    if address:
+        address = address.casefold().replace('’', "'").replace('ʼ', "'")
+        for keyword, keyword_zone in ZONE_KEYWORDS:
+            if keyword in address:
+                return keyword_zone
+    return config.DELIVERY_DEFAULT_ZONE
+
+
+def count_recent_orders() -> int:
+    since = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+    return (
+        db.session.query(db.func.count(Reservation.id))
+        .filter(Reservation.status == 'confirmed', Reservation.created_at >= since)
+        .scalar()
+    )
+
+
+def quote_delivery(goods_total: float, address: str = None, zone: str = None, weather: str = None) -> dict:
+    """
+    Розраховує вартість і час доставки за таблицею зон, погодою та завантаженням кур'єрів.
+    :param weather: Група погоди OpenWeatherMap (clear, clouds, rain...) або None, якщо вона невідома.
+    """
+    zone = resolve_zone(address, zone)
+    table = config.DELIVERY_ZONES[zone]
+    delivery_fee = table['fee']
+    minutes = table['minutes']
+
+    bad_weather = weather is not None and weather not in config.DELIVERY_GOOD_WEATHER
+    if bad_weather:
+        delivery_fee += config.DELIVERY_WEATHER_SURCHARGE
+        minutes += config.DELIVERY_WEATHER_DELAY_MINUTES
+
+    # Завантаження > 1 означає чергу: кожне зайве замовлення чекає частку години вільного кур'єра
+    capacity = config.DELIVERY_COURIERS * config.DELIVERY_ORDERS_PER_COURIER_HOUR
+    courier_load = recent_orders_cache.get(count_recent_orders) / capacity
+    if courier_load >= config.DELIVERY_BUSY_LOAD:
+        delivery_fee += config.DELIVERY_BUSY_SURCHARGE
+    if courier_load > 1:
+        minutes += int((courier_load - 1) * 60)
+
+    eta = datetime.datetime.now() + datetime.timedelta(minutes=minutes)
+    return {
+        'zone': zone,
+        'goods_total': goods_total,
+        'delivery_fee': delivery_fee,
+        'total': goods_total + delivery_fee,
+        'eta_minutes': minutes,
+        'eta': eta.strftime('%H:%M'),
+        'courier_load': round(courier_load, 2),
+        'weather_surcharge': bad_weather,
+    }
+
+
+def add_delivery_arguments(parser: reqparse.RequestParser):
+    parser.add_argument('address', type=str, help="Delivery address")
+    parser.add_argument('zone', type=str, help="Delivery zone")
+    parser.add_argument('weather', type=str, help="Current weather group, e.g. clear, rain")
+
+
+class DeliveryQuoteResource(Resource):
+    def post(self):
+        """Повертає вартість квітів, доставки і час доставки букета однією відповіддю."""
+        parser = reqparse.RequestParser()
+        parser.add_argument('flowers', type=dict, required=True, help="Flowers data is required")  # Словник квітів
+        add_delivery_arguments(parser)
+        args = parser.parse_args()
+
+        flowers_data = args['flowers']
+        logger.info(f"Received POST request for delivery quote: {flowers_data}, address: {args['address']}")
+
+        try:
+            flowers_by_name = find_flowers_by_names(flowers_data)
+
+            result, errors = calculate_bouquet_price(flowers_data, flowers_by_name)
+            if errors:
+                logger.warning(f"Bouquet cannot be quoted: {errors}")
+                return bouquet_error_response(errors)
+
+            quote = quote_delivery(result['total_price'], args['address'], args['zone'], args['weather'])
+            return {**quote, 'flowers': result['flowers']}, 200
+
+        except Exception as e:
+            logger.error(f"An error occurred while quoting delivery: {e}")
+            return {'message': 'An error occurred while processing the request'}, 500
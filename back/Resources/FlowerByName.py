@@ -1,6 +1,6 @@
 import logging
 from flask_restful import Resource, reqparse
-from models import Flower
+from models import Flower, normalize_flower_name
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -16,7 +16,7 @@ class FlowerByNameResource(Resource):
         logger.info(f"Received GET request for flower with name: {name}")
 
         try:
-            flower = Flower.query.filter_by(name=name).first()  # Пошук квітки за назвою
+            flower = Flower.query.filter_by(name_normalized=normalize_flower_name(name)).first()  # Пошук квітки за нормалізованою назвою (індекс)
             if flower:
                 return {
                     'id': flower.id,
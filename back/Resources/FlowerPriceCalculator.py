@@ -1,11 +1,83 @@
 import logging
 from flask_restful import Resource, reqparse
-from models import Flower
+from models import find_flowers_by_names, normalize_flower_name
 
 # Налаштування логування
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+def calculate_bouquet_price(flowers_data: dict, flowers_by_name: dict):
+    """
+    Розраховує вартість букета за вже завантаженими з бази квітками.
+    :param flowers_data: Словник, де ключ - назва квітки, значення - кількість.
+    :param flowers_by_name: Словник нормалізована назва -> об'єкт з полями name, quantity, price.
+    :return: (відповідь з вартістю, помилки) - помилки містять усі відсутні квітки і квітки, яких не вистачає.
+    """
+    total_price = 0.0
+    response = {}
+    missing = []
+    insufficient = {}
+
+    # Кількість - лише ціле додатне число: від'ємна при резервуванні повернула б квіти на склад,
+    # а рядок чи дробове число зламали б підсумовування. bool - теж int, тож перевіряється окремо
+    invalid = {
+        flower_name: quantity
+        for flower_name, quantity in flowers_data.items()
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0
+    }
+    if invalid:
+        return {'total_price': total_price, 'flowers': response}, {'invalid': invalid}
+
+    # Сумарна кількість на квітку, якщо одна квітка записана в запиті кількома способами
+    requested_totals = {}
+    for flower_name, quantity in flowers_data.items():
+        key = normalize_flower_name(flower_name)
+        requested_totals[key] = requested_totals.get(key, 0) + quantity
+
+    for flower_name, quantity in flowers_data.items():
+        key = normalize_flower_name(flower_name)
+        flower = flowers_by_name.get(key)
+
+        if not flower:
+            missing.append(flower_name)
+            continue
+
+        if flower.quantity < requested_totals[key]:  # Перевірка, чи достатньо квітів на складі
+            # Повідомляємо сумарну кількість: саме її не вистачає, навіть якщо кожен рядок окремо вмістився б
+            insufficient[flower_name] = {'requested': requested_totals[key], 'available': flower.quantity}
+            continue
+
+        flower_cost = flower.price * quantity
+        total_price += flower_cost
+        response[flower_name] = {
+            'quantity': quantity,
+            'unit_price': flower.price,
+            'total_price': flower_cost
+        }
+
+    errors = {}
+    if missing:
+        errors['missing'] = missing
+    if insufficient:
+        errors['insufficient'] = insufficient
+
+    return {'total_price': total_price, 'flowers': response}, errors
+
+
+def bouquet_error_response(errors: dict):
+    """Формує відповідь API з переліком усіх проблемних квіток букета."""
+    messages = [f'Invalid quantity for flower "{name}": {quantity!r}' for name, quantity in errors.get('invalid', {}).items()]
+    messages += [f'Flower "{name}" not found' for name in errors.get('missing', [])]
+    messages += [
+        f'Not enough quantity for flower "{name}". Available: {info["available"]}'
+        for name, info in errors.get('insufficient', {}).items()
+    ]
+    # 404 лише коли проблема тільки у відсутніх квітках, інакше 400
+    status = 400 if errors.get('insufficient') or errors.get('invalid') else 404
+    return {'message': '; '.join(messages), **errors}, status
+
+
 class FlowerPriceCalculatorResource(Resource):
     def get(self):
         # Парсер для прийому словника з квітами та кількістю
@@ -16,36 +88,16 @@ class FlowerPriceCalculatorResource(Resource):
         flowers_data = args['flowers']
         logger.info(f"Received GET request for flowers: {flowers_data}")
 
-        total_price = 0.0
-        response = {}
-
         try:
-            # Перевірка наявності кожної квітки у базі та підрахунок вартості
-            for flower_name, quantity in flowers_data.items():
-                flower = Flower.query.filter_by(name=flower_name).first()
-
-                if flower:
-                    if flower.quantity >= quantity:  # Перевірка, чи достатньо квітів на складі
-                        flower_cost = flower.price * quantity
-                        total_price += flower_cost
-                        response[flower_name] = {
-                            'quantity': quantity,
-                            'unit_price': flower.price,
-                            'total_price': flower_cost
-                        }
-                    else:
-                        logger.warning(f"Not enough quantity for flower '{flower_name}'")
-                        return {
-                            'message': f'Not enough quantity for flower "{flower_name}". Available: {flower.quantity}'
-                        }, 400
-                else:
-                    logger.warning(f"Flower '{flower_name}' not found")
-                    return {'message': f'Flower "{flower_name}" not found'}, 404
-
-            return {
-                'total_price': total_price,
-                'flowers': response
-            }, 200
+            # Один запит IN (...) на весь букет замість окремого запиту на кожну квітку
+            flowers_by_name = find_flowers_by_names(flowers_data)
+
+            result, errors = calculate_bouquet_price(flowers_data, flowers_by_name)
+            if errors:
+                logger.warning(f"Bouquet cannot be priced: {errors}")
+                return bouquet_error_response(errors)
+
+            return result, 200
 
         except Exception as e:
             logger.error(f"An error occurred while calculating flower prices: {e}")
@@ -0,0 +1,46 @@
+import logging
+from flask_restful import Resource, reqparse
+from catalog import parse_fields, project
+from models import db, Flower, normalize_flower_name
+
+# Налаштування логування
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class FlowersByNamesResource(Resource):
+    def get(self):
+        parser = reqparse.RequestParser()
+        parser.add_argument('names', type=str, action='append', required=True, help="Names of the flowers are required")  # Список назв
+        parser.add_argument('fields', type=str, help="Comma-separated flower fields to return, e.g. id,name")
+        args = parser.parse_args()
+
+        names = args['names']
+        try:
+            fields = parse_fields(args['fields'])
+        except ValueError as e:
+            return {'message': {'fields': str(e)}}, 400
+        logger.info(f"Received GET request for flowers with names: {names}")
+
+        try:
+            # Один запит IN (...) за нормалізованими назвами замість окремого запиту на кожну квітку
+            normalized = {normalize_flower_name(name): name for name in reversed(names)}
+            # Лише запитані колонки (плюс нормалізована назва для зіставлення) - кортежі замість ORM сутностей
+            columns = [getattr(Flower, field) for field in fields] + [Flower.name_normalized]
+            flowers = db.session.query(*columns).filter(Flower.name_normalized.in_(normalized)).all() if normalized else []
+            flowers_by_name = {flower.name_normalized: flower for flower in flowers}
+
+            result = []
+            missing = []
+            for key in dict.fromkeys(normalize_flower_name(name) for name in names):  # Порядок запиту, без дублікатів
+                flower = flowers_by_name.get(key)
+                if flower:
+                    result.append(project(flower, fields))
+                else:
+                    missing.append(normalized[key])
+
+            logger.info(f"Successfully fetched {len(result)} flowers, missing: {missing}")
+            return {'flowers': result, 'missing': missing}, 200
+
+        except Exception as e:
+            logger.error(f"An error occurred while retrieving flowers by names: {e}")
+            return {'message': 'An error occurred while processing the request'}, 500
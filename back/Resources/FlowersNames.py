@@ -1,27 +1,33 @@
 import logging
 from flask_restful import Resource
-from models import Flower
+from catalog import snapshot_response
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Для списку імен зі знімка завантажуються лише колонки id і name
+NAME_FIELDS = ('name',)
+
+
+def build_flower_names(snapshot):
+    flowers = snapshot.flowers(NAME_FIELDS)
+    if flowers:
+        # Створення списку з імен квітів
+        result = [flower.name for flower in flowers]
+        logger.info(f"Serialized {len(result)} flower names")
+        return {'flower_names': result}, 200
+    else:
+        logger.warning("No flower names found")
+        return {'message': 'No flower names found'}, 404
+
 class FlowerNamesResource(Resource):
     def get(self):
         logger.info("Received GET request for all flower names")
 
         try:
-            # Отримання списку всіх квітів
-            flowers = Flower.query.all()
-
-            if flowers:
-                # Створення списку з імен квітів
-                result = [flower.name for flower in flowers]
-                logger.info(f"Successfully fetched {len(result)} flower names")
-                return {'flower_names': result}, 200
-            else:
-                logger.warning("No flower names found")
-                return {'message': 'No flower names found'}, 404
+            # Імена беруться зі знімка каталогу, без завантаження повних рядків з бази
+            return snapshot_response("flower_names", build_flower_names, NAME_FIELDS)
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
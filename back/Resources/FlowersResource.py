@@ -1,55 +1,60 @@
 import logging
-from flask_restful import Resource, reqparse
-from models import Flower
+from flask_restful import Resource, inputs, reqparse
+from catalog import FLOWER_FIELDS, parse_fields, project, snapshot_response
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def build_flowers_page(snapshot, page: int, per_page: int, after_id: int = None, fields: tuple = FLOWER_FIELDS):
+    """Сторінка каталогу зі знімка лише з запитаними полями; формат відповіді той самий, що й раніше."""
+    # Keyset пагінація за id; номер сторінки (offset) залишено для сумісності.
+    # Беремо на один запис більше, щоб знати, чи є наступна сторінка
+    flowers = snapshot.page(page, per_page + 1, after_id, fields)
+    has_next = len(flowers) > per_page
+    flowers = flowers[:per_page]
+
+    if not flowers:
+        logger.warning("No flowers found")
+        return {'message': 'No flowers found'}, 404
+
+    total_flowers = len(snapshot.flowers(fields))
+    logger.info(f"Serialized {len(flowers)} flowers for page {page}")
+    return {
+        'flowers': [project(flower, fields) for flower in flowers],
+        'total_flowers': total_flowers,
+        'total_pages': (total_flowers + per_page - 1) // per_page,
+        'page': page,
+        'per_page': per_page,
+        'next_after_id': flowers[-1].id if has_next else None
+    }, 200
+
+
 class FlowerResource(Resource):
     def get(self):
         parser = reqparse.RequestParser()
-        parser.add_argument('page', type=int, default=1, help="Page number for pagination")
-        parser.add_argument('per_page', type=int, default=10, help="Number of flowers per page")
+        parser.add_argument('page', type=inputs.positive, default=1, help="Page number must be a positive integer")
+        parser.add_argument('per_page', type=inputs.positive, default=10,
+                            help="Number of flowers per page must be a positive integer")
+        parser.add_argument('after_id', type=int, help="Cursor: return flowers with ID greater than this one")
+        parser.add_argument('fields', type=str, help="Comma-separated flower fields to return, e.g. id,name")
         args = parser.parse_args()
 
         page = args['page']
         per_page = args['per_page']
+        after_id = args['after_id']
+        try:
+            fields = parse_fields(args['fields'])
+        except ValueError as e:
+            return {'message': {'fields': str(e)}}, 400
 
-        logger.info(f"Received GET request for flowers with pagination: page={page}, per_page={per_page}")
+        logger.info(f"Received GET request for flowers with pagination: page={page}, per_page={per_page}, after_id={after_id}")
 
         try:
-            # Пагінація і отримання даних
-            flowers_query = Flower.query
-            total_flowers = flowers_query.count()
-
-            # Пагінація
-            flowers = flowers_query.order_by(Flower.id).offset((page - 1) * per_page).limit(per_page).all()
-
-            if flowers:
-                result = [
-                    {
-                        'id': flower.id,
-                        'name': flower.name,
-                        'photo': flower.photo,
-                        'quantity': flower.quantity,
-                        'price': flower.price,
-                        'description': flower.description
-                    }
-                    for flower in flowers
-                ]
-                total_pages = (total_flowers + per_page - 1) // per_page
-                logger.info(f"Successfully fetched {len(result)} flowers for page {page}")
-                return {
-                    'flowers': result,
-                    'total_flowers': total_flowers,
-                    'total_pages': total_pages,
-                    'page': page,
-                    'per_page': per_page
-                }, 200
-            else:
-                logger.warning("No flowers found")
-                return {'message': 'No flowers found'}, 404
+            # Відповідь береться з уже серіалізованого знімка каталогу, без запиту до бази
+            return snapshot_response(f"all_flowers:{page}:{per_page}:{after_id}:{','.join(fields)}",
+                                     lambda snapshot: build_flowers_page(snapshot, page, per_page, after_id, fields),
+                                     fields)
 
         except Exception as e:
             logger.error(f"An error occurred: {e}")
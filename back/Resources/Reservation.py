@@ -0,0 +1,181 @@
+import datetime
+import logging
+import uuid
+
+from flask import current_app
+from flask_restful import Resource, inputs, reqparse
+from sqlalchemy import update
+
+from catalog import invalidate_catalog
+from models import db, Flower, Reservation, ReservationItem, find_flowers_by_names, normalize_flower_name
+from reservations import release_expired_reservations, restore_stock
+from Resources.DeliveryQuote import add_delivery_arguments, quote_delivery
+from Resources.FlowerPriceCalculator import calculate_bouquet_price, bouquet_error_response
+
+# Налаштування логування
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class ReservationResource(Resource):
+    def post(self):
+        """
+        Резервує весь букет однією транзакцією з умовним UPDATE для кожної квітки.
+        У відповіді одразу повертається розрахунок доставки, тож оформлення потребує одного запиту.
+        """
+        parser = reqparse.RequestParser()
+        parser.add_argument('flowers', type=dict, required=True, help="Flowers data is required")  # Словник квітів
+        parser.add_argument('ttl', type=inputs.positive, help="Reservation TTL must be a positive number of seconds")
+        add_delivery_arguments(parser)
+        args = parser.parse_args()
+
+        flowers_data = args['flowers']
+        ttl = args['ttl'] if args['ttl'] is not None else current_app.config['RESERVATION_TTL_SECONDS']
+        max_ttl = current_app.config['RESERVATION_MAX_TTL_SECONDS']
+        if ttl > max_ttl:
+            return {'message': f'Reservation TTL must not exceed {max_ttl} seconds'}, 400
+        logger.info(f"Received POST request to reserve flowers: {flowers_data}")
+
+        try:
+            release_expired_reservations()
+
+            flowers_by_name = find_flowers_by_names(flowers_data)
+
+            result, errors = calculate_bouquet_price(flowers_data, flowers_by_name)
+            if errors:
+                logger.warning(f"Bouquet cannot be reserved: {errors}")
+                return bouquet_error_response(errors)
+
+            quantities = {}
+            for flower_name, quantity in flowers_data.items():
+                flower = flowers_by_name[normalize_flower_name(flower_name)]
+                quantities[flower.id] = quantities.get(flower.id, 0) + quantity
+            names_by_id = {flower.id: flower.name for flower in flowers_by_name.values()}
+            prices_by_id = {flower.id: flower.price for flower in flowers_by_name.values()}
+
+            # Оновлюємо рядки у порядку id, щоб паралельні резерви не створювали дедлоків.
+            # Умова quantity >= :quantity перевіряється після отримання блокування рядка,
+            # тож дві транзакції не можуть продати останні квіти двічі.
+            for flower_id in sorted(quantities):
+                updated = db.session.execute(
+                    update(Flower)
+                    .where(Flower.id == flower_id, Flower.quantity >= quantities[flower_id])
+                    .values(quantity=Flower.quantity - quantities[flower_id])
+                    .execution_options(synchronize_session=False)
+                )
+                if updated.rowcount != 1:
+                    db.session.rollback()
+                    flower_name = names_by_id[flower_id]
+                    # Паралельний резерв встиг раніше - повертаємо актуальний залишок, а не той, що бачили до UPDATE
+                    available = db.session.query(Flower.quantity).filter(Flower.id == flower_id).scalar() or 0
+                    logger.warning(f"Flower '{flower_name}' was sold out concurrently, available: {available}")
+                    return {
+                        'message': f'Not enough quantity for flower "{flower_name}". Available: {available}',
+                        'insufficient': {flower_name: {'requested': quantities[flower_id], 'available': available}}
+                    }, 409
+
+            # Доставку рахуємо до commit: якщо розрахунок впаде, транзакція відкотиться разом зі списанням квітів
+            delivery = quote_delivery(result['total_price'], args['address'], args['zone'], args['weather'])
+
+            expires_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=ttl)
+            reservation = Reservation(
+                id=uuid.uuid4().hex,
+                status='pending',
+                total_price=result['total_price'],
+                expires_at=expires_at,
+                items=[
+                    ReservationItem(flower_id=flower_id, quantity=quantity, unit_price=prices_by_id[flower_id])
+                    for flower_id, quantity in quantities.items()
+                ]
+            )
+            db.session.add(reservation)
+            db.session.commit()
+            # Залишки змінились: знімки каталогу і кеш бота мають показати їх одразу, а не через CATALOG_SNAPSHOT_MAX_AGE
+            invalidate_catalog()
+
+            logger.info(f"Reservation {reservation.id} created, expires at {expires_at}")
+            return {
+                'reservation_id': reservation.id,
+                'expires_at': expires_at.isoformat(),
+                'delivery': delivery,
+                **result
+            }, 201
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"An error occurred while reserving flowers: {e}")
+            return {'message': 'An error occurred while processing the request'}, 500
+
+    def put(self):
+        """Оформлює замовлення за резервом (checkout)."""
+        parser = reqparse.RequestParser()
+        parser.add_argument('reservation_id', type=str, required=True, help="Reservation ID is required")
+        args = parser.parse_args()
+
+        reservation_id = args['reservation_id']
+        logger.info(f"Received PUT request to confirm reservation: {reservation_id}")
+
+        try:
+            release_expired_reservations()
+
+            reservation = Reservation.query.filter_by(id=reservation_id).with_for_update().first()
+            if not reservation:
+                db.session.rollback()
+                return {'message': f'Reservation "{reservation_id}" not found'}, 404
+            if reservation.status == 'expired':
+                db.session.rollback()
+                return {'message': 'Reservation expired', 'status': 'expired'}, 410
+            if reservation.status != 'pending':
+                db.session.rollback()
+                return {'message': f'Reservation is {reservation.status}', 'status': reservation.status}, 409
+
+            # Статусу не довіряємо: резерв, який прибирання пропустило (рядок був заблокований), теж міг простроститись
+            if reservation.expires_at < datetime.datetime.utcnow():
+                restore_stock(reservation, 'expired')
+                db.session.commit()
+                invalidate_catalog()
+                logger.warning(f"Reservation {reservation_id} expired before checkout")
+                return {'message': 'Reservation expired', 'status': 'expired'}, 410
+
+            reservation.status = 'confirmed'
+            db.session.commit()
+            invalidate_catalog()
+            logger.info(f"Reservation {reservation_id} confirmed")
+            return {'reservation_id': reservation_id, 'status': 'confirmed',
+                    'total_price': reservation.total_price}, 200
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"An error occurred while confirming reservation: {e}")
+            return {'message': 'An error occurred while processing the request'}, 500
+
+    def delete(self):
+        """Скасовує резерв і повертає квіти на склад."""
+        parser = reqparse.RequestParser()
+        parser.add_argument('reservation_id', type=str, required=True, help="Reservation ID is required")
+        args = parser.parse_args()
+
+        reservation_id = args['reservation_id']
+        logger.info(f"Received DELETE request to cancel reservation: {reservation_id}")
+
+        try:
+            release_expired_reservations()
+
+            reservation = Reservation.query.filter_by(id=reservation_id).with_for_update().first()
+            if not reservation:
+                db.session.rollback()
+                return {'message': f'Reservation "{reservation_id}" not found'}, 404
+            if reservation.status != 'pending':
+                db.session.rollback()
+                return {'message': f'Reservation is {reservation.status}', 'status': reservation.status}, 409
+
+            restore_stock(reservation, 'cancelled')
+            db.session.commit()
+            invalidate_catalog()
+            logger.info(f"Reservation {reservation_id} cancelled")
+            return {'reservation_id': reservation_id, 'status': 'cancelled'}, 200
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"An error occurred while cancelling reservation: {e}")
+            return {'message': 'An error occurred while processing the request'}, 500
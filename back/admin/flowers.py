@@ -1,10 +1,11 @@
-import os
-import uuid
-import logging
-from werkzeug.datastructures import FileStorage
-from flask_admin.form import ImageUploadField
 from wtforms.fields.simple import TextAreaField
 from flask_admin.contrib.sqla import ModelView
+from sqlalchemy import inspect
+
+import config
+from catalog import invalidate_catalog, invalidate_photo
+from images import HashedImageUploadField, remove_photo_files
+from models import Flower
 
 
 class FlowerView(ModelView):
@@ -12,11 +13,11 @@ class FlowerView(ModelView):
     column_list = ['name', 'quantity']
 
     form_extra_fields = {
-        'photo': ImageUploadField('Фото квітки',
-                                  base_path='media/flowers',
-                                  url_relative_path='flowers/',
-                                  endpoint="media_files",
-                                  allowed_extensions=['jpg', 'png']),
+        'photo': HashedImageUploadField('Фото квітки',
+                                        base_path=config.MEDIA_ROOT,
+                                        url_relative_path='flowers/',
+                                        endpoint="media_files",
+                                        allowed_extensions=['jpg', 'png']),
         'description': TextAreaField('Опис квітки', render_kw={
             "style": "width: 100%; height: 200px; overflow-y: scroll;",
             "rows": 10,  # Кількість видимих рядків до появи прокрутки
@@ -37,26 +38,32 @@ class FlowerView(ModelView):
     }
 
     def on_model_change(self, form, model, is_created):
-        if isinstance(form.photo.data, FileStorage):
-            file_extension = os.path.splitext(form.photo.data.filename)[1]
-            unique_filename = f"{uuid.uuid4().hex}{file_extension}"
-            file_path = os.path.join('media/flowers', unique_filename)
-            file_data = form.photo.data.read()
-
-            if len(file_data) > 0:
-                with open(file_path, 'wb') as f:
-                    f.write(file_data)
-                model.photo = file_path
-                logging.info(f"File saved successfully at {file_path}, size: {len(file_data)} bytes")
-            else:
-                logging.error("File is empty, not saved.")
+        # Файл уже записано полем HashedImageUploadField; тут лише кеші та прибирання старого фото.
+        # Якщо фото замінено, бот більше не повинен надсилати старий Telegram file_id
+        photo_history = inspect(model).attrs.photo.history
+        for photo in (*photo_history.deleted, *photo_history.added):
+            if photo:
+                invalidate_photo(photo)
+        # Старі файли видаляються після коміту, коли вже відомо, чи посилаються на них інші квітки
+        model._replaced_photos = [photo for photo in photo_history.deleted if photo]
 
     def on_model_delete(self, model):
         if model.photo:
-            file_path = os.path.join('media/flowers', model.photo)
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                    logging.info(f"File {file_path} deleted successfully.")
-                except Exception as e:
-                    logging.error(f"Error deleting file {file_path}: {e}")
+            invalidate_photo(model.photo)
+
+    @staticmethod
+    def remove_orphaned_photo(photo: str):
+        """Видаляє файли фото (з варіантами), якщо на нього більше не посилається жодна квітка."""
+        if Flower.query.filter_by(photo=photo).first() is None:
+            remove_photo_files(photo)
+
+    def after_model_change(self, form, model, is_created):
+        # Викликається після коміту, тож кеші каталогу не побачать незбережених змін
+        for photo in getattr(model, '_replaced_photos', ()):
+            self.remove_orphaned_photo(photo)
+        invalidate_catalog()
+
+    def after_model_delete(self, model):
+        if model.photo:
+            self.remove_orphaned_photo(model.photo)
+        invalidate_catalog()
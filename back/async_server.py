@@ -0,0 +1,372 @@
+"""
+Асинхронний API читання каталогу для бота: ті самі маршрути і формати JSON, що й у Flask-RESTful ресурсів.
+
+Працює окремим процесом поруч із Flask застосунком (адмінка, резервування):
+
+    python async_server.py
+    gunicorn async_server:create_app --worker-class aiohttp.GunicornWebWorker --bind 0.0.0.0:5001
+
+Каталог (all_flowers, flower_names) віддається з того самого версійного знімка CatalogSnapshot, що й у Flask:
+з ETag, 304 на If-None-Match і gzip. Знімок перебудовується, коли адмінка чи резервування змінюють
+catalog:version у Redis. Прострочені резерви сервер звільняє сам у фоні, не чекаючи запитів до Flask.
+"""
+import asyncio
+import datetime
+import logging
+import time
+
+import redis.asyncio as redis
+from aiohttp import web
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+import config
+from catalog import (CATALOG_INVALIDATE_CHANNEL, CATALOG_VERSION_KEY, FLOWER_FIELDS, CatalogSnapshot, conditional_body, parse_fields, project,
+                     snapshot_columns)
+from models import Flower, Reservation, ReservationItem, normalize_flower_name
+from Resources.FlowerPriceCalculator import calculate_bouquet_price, bouquet_error_response
+from Resources.FlowersNames import NAME_FIELDS, build_flower_names
+from Resources.FlowersResource import build_flowers_page
+
+# Налаштування логування
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Таблиця з метаданих моделі Flower - схема описана в одному місці для обох серверів
+flowers_table = Flower.__table__
+reservations_table = Reservation.__table__
+reservation_items_table = ReservationItem.__table__
+FLOWER_COLUMNS = tuple(flowers_table.c[field] for field in FLOWER_FIELDS)
+
+
+class ArgumentError(Exception):
+    """Помилка параметра запиту; відповідь має той самий формат, що й у reqparse."""
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(help_text)
+        self.name = name
+        self.help_text = help_text
+
+
+def fields_argument(args: dict) -> tuple:
+    """Параметр fields= списків: лише запитані колонки вибираються з бази."""
+    try:
+        return parse_fields(args.get('fields'))
+    except ValueError as e:
+        raise ArgumentError('fields', str(e))
+
+
+async def read_args(request: web.Request) -> dict:
+    """Параметри запиту: query string і JSON тіло (бот надсилає GET запити з JSON тілом)."""
+    args = dict(request.query)
+    if request.body_exists:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text='{"message": "Failed to decode JSON object"}',
+                                     content_type='application/json')
+        if isinstance(body, dict):
+            args.update(body)
+    return args
+
+
+def positive_int(value) -> int:
+    """Ціле число від 1, як inputs.positive у reqparse, але без залежності від Flask-RESTful."""
+    value = int(value)
+    if value < 1:
+        raise ValueError(f"{value} is not a positive integer")
+    return value
+
+
+def argument(args: dict, name: str, type_=str, required: bool = False, default=None, help_text: str = None):
+    value = args.get(name)
+    if value is None:
+        if required:
+            raise ArgumentError(name, help_text or f"{name} is required")
+        return default
+    try:
+        return type_(value)
+    except (TypeError, ValueError):
+        raise ArgumentError(name, help_text or f"Invalid value for {name}")
+
+
+@web.middleware
+async def error_middleware(request: web.Request, handler):
+    try:
+        return await handler(request)
+    except ArgumentError as e:
+        return web.json_response({'message': {e.name: e.help_text}}, status=400)
+    except web.HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"An error occurred while processing {request.path}: {e}")
+        return web.json_response({'message': 'An error occurred while processing the request'}, status=500)
+
+
+class CatalogState:
+    """Знімок каталогу процесу і остання прочитана версія каталогу; як у catalog.py, але без блокування потоків."""
+
+    def __init__(self):
+        self.snapshot = None
+        self.version = None
+        self.version_checked_at = 0.0
+        self.lock = asyncio.Lock()
+
+
+# Стан застосунку: пул з'єднань з базою, Redis з версією каталогу і знімок каталогу процесу
+ENGINE_KEY = web.AppKey('engine', AsyncEngine)
+REDIS_KEY = web.AppKey('redis', redis.Redis)
+CATALOG_KEY = web.AppKey('catalog', CatalogState)
+
+
+async def catalog_version(app: web.Application):
+    """Версія каталогу з Redis, не частіше ніж раз на CATALOG_VERSION_CHECK_INTERVAL секунд."""
+    state = app[CATALOG_KEY]
+    now = time.monotonic()
+    if now - state.version_checked_at >= config.CATALOG_VERSION_CHECK_INTERVAL:
+        state.version_checked_at = now
+        try:
+            state.version = str(await app[REDIS_KEY].get(CATALOG_VERSION_KEY) or '0')
+        except Exception as e:
+            # Без Redis знімок оновлюється лише за CATALOG_SNAPSHOT_MAX_AGE
+            logger.error(f"Failed to read catalog version: {e}")
+    return state.version
+
+
+async def get_catalog_snapshot(app: web.Application, fields: tuple = FLOWER_FIELDS) -> CatalogSnapshot:
+    """Актуальний знімок каталогу з колонками для fields; паралельні запити чекають на одне завантаження."""
+    state = app[CATALOG_KEY]
+    version = await catalog_version(app)
+    columns = snapshot_columns(fields)
+    snapshot = state.snapshot
+    if snapshot is not None and snapshot.is_fresh(version) and snapshot.has(columns):
+        return snapshot
+
+    async with state.lock:
+        snapshot = state.snapshot
+        if snapshot is None or not snapshot.is_fresh(version):
+            snapshot = state.snapshot = CatalogSnapshot(version)
+            logger.info(f"Catalog snapshot rebuilt, catalog version {version}")
+        if not snapshot.has(columns):
+            query = select(*(flowers_table.c[column] for column in columns)).order_by(flowers_table.c.id)
+            async with app[ENGINE_KEY].connect() as connection:
+                rows = (await connection.execute(query)).all()
+            snapshot.add(columns, rows)
+            logger.info(f"Catalog snapshot loaded {len(rows)} flowers with columns {', '.join(columns)}")
+        return snapshot
+
+
+async def invalidate_catalog(app: web.Application):
+    """Те саме, що catalog.invalidate_catalog: нова версія каталогу в Redis і скидання знімка цього процесу."""
+    try:
+        version = await app[REDIS_KEY].incr(CATALOG_VERSION_KEY)
+        await app[REDIS_KEY].publish(CATALOG_INVALIDATE_CHANNEL, version)
+        logger.info(f"Catalog caches invalidated, catalog version {version}")
+    except Exception as e:
+        logger.error(f"Failed to publish catalog invalidation: {e}")
+    state = app[CATALOG_KEY]
+    state.snapshot = None
+    state.version_checked_at = 0.0
+
+
+async def release_expired_reservations(app: web.Application) -> int:
+    """
+    Те саме, що reservations.release_expired_reservations: повертає на склад квіти прострочених резервів.
+    Рядки, які зараз блокує інша транзакція (Flask оформлює чи скасовує резерв), пропускаються.
+    :return: Кількість звільнених резервів.
+    """
+    async with app[ENGINE_KEY].begin() as connection:
+        expired = (await connection.execute(
+            select(reservations_table.c.id)
+            .where(reservations_table.c.status == 'pending',
+                   reservations_table.c.expires_at < datetime.datetime.utcnow())
+            .with_for_update(skip_locked=True)
+        )).scalars().all()
+        if not expired:
+            return 0
+        items = (await connection.execute(
+            select(reservation_items_table.c.flower_id, func.sum(reservation_items_table.c.quantity))
+            .where(reservation_items_table.c.reservation_id.in_(expired))
+            .group_by(reservation_items_table.c.flower_id)
+            .order_by(reservation_items_table.c.flower_id)
+        )).all()
+        # У порядку id, як і при резервуванні, щоб не створювати дедлоків
+        for flower_id, quantity in items:
+            await connection.execute(
+                update(flowers_table)
+                .where(flowers_table.c.id == flower_id)
+                .values(quantity=flowers_table.c.quantity + quantity)
+            )
+        await connection.execute(
+            update(reservations_table).where(reservations_table.c.id.in_(expired)).values(status='expired'))
+    logger.info(f"Released {len(expired)} expired reservations")
+    await invalidate_catalog(app)
+    return len(expired)
+
+
+async def snapshot_response(request: web.Request, key: str, build, fields: tuple = FLOWER_FIELDS) -> web.Response:
+    """Те саме, що catalog.snapshot_response у Flask: ETag, 304 без тіла і gzip."""
+    body = (await get_catalog_snapshot(request.app, fields)).serialized(key, build)
+    etags = request.if_none_match or ()
+    not_modified = any(etag.value in (body[0], '*') for etag in etags)
+    status, data, headers = conditional_body(body, not_modified, 'gzip' in request.headers.get('Accept-Encoding', ''))
+    return web.Response(body=data, status=status, headers=headers)
+
+
+async def all_flowers(request: web.Request) -> web.Response:
+    args = await read_args(request)
+    page = argument(args, 'page', positive_int, default=1, help_text="Page number must be a positive integer")
+    per_page = argument(args, 'per_page', positive_int, default=10,
+                        help_text="Number of flowers per page must be a positive integer")
+    after_id = argument(args, 'after_id', int)
+    fields = fields_argument(args)
+    logger.info(f"Received GET request for flowers with pagination: page={page}, per_page={per_page}, after_id={after_id}")
+
+    # Ключ і побудова відповіді ті самі, що у Flask ресурсі, тож і ETag однаковий
+    return await snapshot_response(request, f"all_flowers:{page}:{per_page}:{after_id}:{','.join(fields)}",
+                                   lambda snapshot: build_flowers_page(snapshot, page, per_page, after_id, fields),
+                                   fields)
+
+
+async def flower_by_id(request: web.Request) -> web.Response:
+    args = await read_args(request)
+    flower_id = argument(args, 'id', int, required=True, help_text="ID of the flower is required")
+    logger.info(f"Received GET request for flower with ID: {flower_id}")
+
+    async with request.app[ENGINE_KEY].connect() as connection:
+        row = (await connection.execute(select(*FLOWER_COLUMNS).where(flowers_table.c.id == flower_id))).first()
+
+    if row is None:
+        logger.warning(f"Flower with ID '{flower_id}' not found")
+        return web.json_response({'message': f'Flower with ID "{flower_id}" not found'}, status=404)
+    return web.json_response(project(row))
+
+
+async def flower_by_name(request: web.Request) -> web.Response:
+    args = await read_args(request)
+    name = argument(args, 'name', required=True, help_text="Name of the flower is required")
+    logger.info(f"Received GET request for flower with name: {name}")
+
+    query = select(*FLOWER_COLUMNS).where(flowers_table.c.name_normalized == normalize_flower_name(name))
+    async with request.app[ENGINE_KEY].connect() as connection:
+        row = (await connection.execute(query)).first()
+
+    if row is None:
+        logger.warning(f"Flower with name '{name}' not found")
+        return web.json_response({'message': f'Flower with name "{name}" not found'}, status=404)
+    return web.json_response(project(row))
+
+
+async def flowers_by_names(request: web.Request) -> web.Response:
+    args = await read_args(request)
+    # Як action='append' у reqparse: один рядок теж вважається списком
+    names = argument(args, 'names', lambda value: [value] if isinstance(value, str) else list(value),
+                     required=True, help_text="Names of the flowers are required")
+    names = [str(name) for name in names]
+    fields = fields_argument(args)
+    logger.info(f"Received GET request for flowers with names: {names}")
+
+    normalized = {normalize_flower_name(name): name for name in reversed(names)}
+    rows = []
+    if normalized:
+        columns = [flowers_table.c[field] for field in fields]
+        query = select(*columns, flowers_table.c.name_normalized).where(
+            flowers_table.c.name_normalized.in_(normalized))
+        async with request.app[ENGINE_KEY].connect() as connection:
+            rows = (await connection.execute(query)).all()
+    rows_by_name = {row.name_normalized: row for row in rows}
+
+    result = []
+    missing = []
+    for key in dict.fromkeys(normalize_flower_name(name) for name in names):  # Порядок запиту, без дублікатів
+        row = rows_by_name.get(key)
+        if row is not None:
+            result.append(project(row, fields))
+        else:
+            missing.append(normalized[key])
+    return web.json_response({'flowers': result, 'missing': missing})
+
+
+async def flower_names(request: web.Request) -> web.Response:
+    logger.info("Received GET request for all flower names")
+    return await snapshot_response(request, "flower_names", build_flower_names, NAME_FIELDS)
+
+
+async def flower_parse_calculator(request: web.Request) -> web.Response:
+    args = await read_args(request)
+    flowers_data = argument(args, 'flowers', dict, required=True, help_text="Flowers data is required")
+    logger.info(f"Received GET request for flowers: {flowers_data}")
+
+    names = {normalize_flower_name(flower_name) for flower_name in flowers_data}
+    rows = []
+    if names:
+        query = select(flowers_table.c.name_normalized, flowers_table.c.quantity, flowers_table.c.price).where(
+            flowers_table.c.name_normalized.in_(names))
+        async with request.app[ENGINE_KEY].connect() as connection:
+            rows = (await connection.execute(query)).all()
+
+    # Рядки мають атрибути quantity і price, тож розрахунок спільний з Flask ресурсом
+    result, errors = calculate_bouquet_price(flowers_data, {row.name_normalized: row for row in rows})
+    if errors:
+        logger.warning(f"Bouquet cannot be priced: {errors}")
+        body, status = bouquet_error_response(errors)
+        return web.json_response(body, status=status)
+    return web.json_response(result)
+
+
+async def database_engine(app: web.Application):
+    """Пул з'єднань asyncpg на процес; закривається при зупинці сервера."""
+    app[ENGINE_KEY] = create_async_engine(config.ASYNC_DATABASE_URI, **config.SQLALCHEMY_ENGINE_OPTIONS)
+    yield
+    await app[ENGINE_KEY].dispose()
+
+
+async def catalog_redis(app: web.Application):
+    """Redis, в якому адмінка змінює версію каталогу (catalog.invalidate_catalog)."""
+    app[REDIS_KEY] = redis.from_url(config.REDIS_URL, decode_responses=True)
+    app[CATALOG_KEY] = CatalogState()
+    yield
+    await app[REDIS_KEY].aclose()
+
+
+async def reservation_sweeper(app: web.Application):
+    """Фонове звільнення прострочених резервів раз на RESERVATION_SWEEP_INTERVAL секунд."""
+
+    async def sweep():
+        try:
+            await release_expired_reservations(app)
+        except Exception as e:
+            logger.error(f"Failed to release expired reservations: {e}")
+
+    async def sweep_periodically():
+        while True:
+            await asyncio.sleep(config.RESERVATION_SWEEP_INTERVAL)
+            await sweep()
+
+    # Резерви, що прострочились, поки сервер не працював, звільняються до першого запиту
+    await sweep()
+    task = asyncio.create_task(sweep_periodically())
+    yield
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def create_app() -> web.Application:
+    app = web.Application(middlewares=[error_middleware])
+    app.cleanup_ctx.append(database_engine)
+    app.cleanup_ctx.append(catalog_redis)
+    app.cleanup_ctx.append(reservation_sweeper)
+    app.router.add_get('/api/resources/all_flowers', all_flowers)
+    app.router.add_get('/api/resources/flower_by_id', flower_by_id)
+    app.router.add_get('/api/resources/flower_by_name', flower_by_name)
+    app.router.add_get('/api/resources/flowers_by_names', flowers_by_names)
+    app.router.add_get('/api/resources/flower_names', flower_names)
+    app.router.add_get('/api/resources/flower_parse_calculator', flower_parse_calculator)
+    return app
+
+
+if __name__ == '__main__':
+    web.run_app(create_app(), host='0.0.0.0', port=config.ASYNC_API_PORT)
@@ -0,0 +1,36 @@
+import threading
+import time
+
+
+class TTLCache:
+    """Одне значення з TTL у пам'яті процесу, наприклад результат агрегатного запиту до бази"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, loader):
+        """Повертає закешоване значення або завантажує його через loader()."""
+        value = self.peek()
+        if value is None:
+            value = loader()
+            self.set(value)
+        return value
+
+    def peek(self):
+        """Повертає закешоване значення або None, якщо його немає чи TTL минув."""
+        with self._lock:
+            if self._value is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return self._value
+            return None
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
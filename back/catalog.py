@@ -0,0 +1,224 @@
+import bisect
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+
+import redis
+from flask import Response, request
+
+import config
+from models import db, Flower
+from reservations import sweep_expired_reservations
+
+logger = logging.getLogger(__name__)
+
+# Префікс ключів кешу Telegram file_id у боті (bot/Services/PhotoCache.py)
+PHOTO_CACHE_PREFIX = 'flower_photo:'
+# Версія каталогу і канал інвалідацій кешу каталогу в боті (bot/Services/CatalogCache.py)
+CATALOG_VERSION_KEY = 'catalog:version'
+CATALOG_INVALIDATE_CHANNEL = 'catalog:invalidate'
+
+_redis_client = None
+
+
+def get_redis():
+    """Лінива ініціалізація синхронного клієнта Redis, спільного з ботом."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(config.REDIS_URL, decode_responses=True)
+    return _redis_client
+
+
+# Поля квітки у відповідях API, у порядку колонок знімка і запитів з проекцією
+FLOWER_FIELDS = ('id', 'name', 'photo', 'quantity', 'price', 'description')
+
+
+def parse_fields(value) -> tuple:
+    """
+    Розбирає параметр fields= ("id,name" або список) у кортеж полів у порядку FLOWER_FIELDS.
+    Без параметра повертаються всі поля; невідомі поля - ValueError.
+    """
+    if not value:
+        return FLOWER_FIELDS
+    requested = value.split(',') if isinstance(value, str) else value
+    requested = {str(field).strip() for field in requested if str(field).strip()}
+    unknown = requested - set(FLOWER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in FLOWER_FIELDS if field in requested) or FLOWER_FIELDS
+
+
+def project(row, fields: tuple = FLOWER_FIELDS) -> dict:
+    """Словник лише з запитаних полів; row - кортеж або рядок запиту з атрибутами полів."""
+    return {field: getattr(row, field) for field in fields}
+
+
+def snapshot_columns(fields: tuple) -> tuple:
+    """Колонки, які знімок завантажує для запиту з fields: запитані поля і id для порядку та курсора."""
+    return tuple(field for field in FLOWER_FIELDS if field == 'id' or field in fields)
+
+
+class CatalogSnapshot:
+    """
+    Знімок каталогу на момент побудови з уже серіалізованими відповідями API.
+
+    Відповідь серіалізується і стискається один раз для кожного набору параметрів; ETag - хеш тіла,
+    тож однаковий вміст має однаковий ETag у всіх воркерах і після перебудови знімка.
+    """
+
+    MAX_BODIES = 512  # Скільки різних відповідей (сторінок) тримати в одному знімку
+
+    def __init__(self, version: str):
+        self.version = version
+        # Колонки -> (рядки, їх id). Рядки - легкі кортежі лише з цих колонок, відсортовані за id: запит з fields=id,name
+        # не завантажує описи з бази. Словники будуються лише для запитаних полів під час серіалізації
+        self._rows = {}
+        self.built_at = time.monotonic()
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def has(self, columns: tuple) -> bool:
+        return columns in self._rows
+
+    def add(self, columns: tuple, rows: list):
+        self._rows[columns] = (rows, [row.id for row in rows])
+
+    def flowers(self, fields: tuple = FLOWER_FIELDS) -> list:
+        """Рядки знімка з полями fields (і id); колонки мають бути завантажені через get_catalog_snapshot(fields)."""
+        return self._rows[snapshot_columns(fields)][0]
+
+    def serialized(self, key: str, build) -> tuple:
+        """
+        Повертає (ETag, JSON, JSON у gzip, статус) відповіді; build(snapshot) -> (тіло, статус) викликається один раз.
+        """
+        body = self._bodies.get(key)
+        if body is None:
+            payload, status = build(self)
+            raw = json.dumps(payload, ensure_ascii=False).encode()
+            body = (hashlib.sha1(raw).hexdigest(), raw, gzip.compress(raw, compresslevel=6), status)
+            with self._lock:
+                if len(self._bodies) >= self.MAX_BODIES:
+                    self._bodies.clear()
+                self._bodies[key] = body
+        return body
+
+    def is_fresh(self, version) -> bool:
+        """Знімок актуальний, доки не змінилась версія каталогу і він не старший за CATALOG_SNAPSHOT_MAX_AGE."""
+        return self.version == version and time.monotonic() - self.built_at < config.CATALOG_SNAPSHOT_MAX_AGE
+
+    def page(self, page: int, per_page: int, after_id: int = None, fields: tuple = FLOWER_FIELDS) -> list:
+        """Сторінка квіток: keyset за id, якщо вказано after_id, інакше за номером сторінки."""
+        flowers, ids = self._rows[snapshot_columns(fields)]
+        start = bisect.bisect_right(ids, after_id) if after_id is not None else (page - 1) * per_page
+        return flowers[max(start, 0):max(start, 0) + per_page]
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+_version_checked_at = 0.0
+_known_version = None
+
+
+def _catalog_version():
+    """Версія каталогу з Redis, не частіше ніж раз на CATALOG_VERSION_CHECK_INTERVAL секунд."""
+    global _version_checked_at, _known_version
+    now = time.monotonic()
+    if now - _version_checked_at >= config.CATALOG_VERSION_CHECK_INTERVAL:
+        _version_checked_at = now
+        try:
+            _known_version = str(get_redis().get(CATALOG_VERSION_KEY) or '0')
+        except Exception as e:
+            # Без Redis знімок оновлюється лише за CATALOG_SNAPSHOT_MAX_AGE
+            logger.error(f"Failed to read catalog version: {e}")
+    return _known_version
+
+
+def get_catalog_snapshot(fields: tuple = FLOWER_FIELDS) -> CatalogSnapshot:
+    """
+    Повертає актуальний знімок каталогу із завантаженими колонками для fields. Знімок перебудовується,
+    коли змінилась версія каталогу (адмінка змінила квітку або резервування змінило залишки) або коли
+    він старший за CATALOG_SNAPSHOT_MAX_AGE - на випадок, якщо Redis недоступний.
+    Кожен набір колонок завантажується з бази один раз на знімок.
+    """
+    global _snapshot
+    version = _catalog_version()
+    columns = snapshot_columns(fields)
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.is_fresh(version) and snapshot.has(columns):
+        return snapshot
+
+    with _snapshot_lock:
+        # Поки чекали на блокування, знімок міг перебудувати інший потік
+        snapshot = _snapshot
+        if snapshot is None or not snapshot.is_fresh(version):
+            # Залишки у знімку не мають враховувати квіти з прострочених, але ще не звільнених резервів.
+            # Звільнення резервів змінює версію каталогу - знімок будується вже з новою
+            if sweep_expired_reservations(force=True):
+                version = _catalog_version()
+            snapshot = _snapshot = CatalogSnapshot(version)
+            logger.info(f"Catalog snapshot rebuilt, catalog version {version}")
+        if not snapshot.has(columns):
+            # Проекція колонок: рядки-кортежі без ORM сутностей і identity map, лише потрібні колонки
+            rows = db.session.query(*(getattr(Flower, column) for column in columns)).order_by(Flower.id).all()
+            snapshot.add(columns, rows)
+            logger.info(f"Catalog snapshot loaded {len(rows)} flowers with columns {', '.join(columns)}")
+        return snapshot
+
+
+def conditional_body(body: tuple, not_modified: bool, accepts_gzip: bool) -> tuple:
+    """
+    Вибирає відповідь для серіалізованого тіла знімка: 304 без тіла, якщо клієнт уже має цю версію (ETag),
+    і gzip, якщо клієнт його приймає. Спільне для Flask і асинхронного API (async_server.py).
+    :param body: (ETag, JSON, JSON у gzip, статус) з CatalogSnapshot.serialized().
+    :return: (статус, тіло або None, заголовки).
+    """
+    etag, raw, gzipped, status = body
+    headers = {'ETag': f'"{etag}"', 'Vary': 'Accept-Encoding'}
+    if not_modified:
+        return 304, None, headers
+    headers['Content-Type'] = 'application/json'
+    if accepts_gzip:
+        headers['Content-Encoding'] = 'gzip'
+        return status, gzipped, headers
+    return status, raw, headers
+
+
+def snapshot_response(key: str, build, fields: tuple = FLOWER_FIELDS) -> Response:
+    """
+    Відповідь зі знімка каталогу з ETag: 304 без тіла, якщо клієнт уже має цю версію, і gzip, якщо клієнт його приймає.
+    :param fields: Поля квіток, які використовує build; лише їх колонки завантажуються з бази.
+    """
+    body = get_catalog_snapshot(fields).serialized(key, build)
+    status, data, headers = conditional_body(body, request.if_none_match.contains(body[0]),
+                                             'gzip' in request.accept_encodings)
+    return Response(data, status=status, headers=headers)
+
+
+def invalidate_catalog():
+    """
+    Скидає кеші каталогу. Викликається з адмінки після збереження або видалення квітки
+    і після кожної зміни залишків резервуванням (створення, оформлення, скасування, звільнення).
+    """
+    global _snapshot, _version_checked_at
+    try:
+        # Нова версія робить недійсними кеші бота в Redis, повідомлення скидає кеші в пам'яті процесів бота
+        version = get_redis().incr(CATALOG_VERSION_KEY)
+        get_redis().publish(CATALOG_INVALIDATE_CHANNEL, version)
+        logger.info(f"Catalog caches invalidated, catalog version {version}")
+    except Exception as e:
+        logger.error(f"Failed to publish catalog invalidation: {e}")
+    # Знімок цього процесу скидається одразу, інші воркери помітять нову версію в Redis
+    _snapshot = None
+    _version_checked_at = 0.0
+
+
+def invalidate_photo(photo_filename: str):
+    """Видаляє кешовані ботом Telegram file_id для фото. Помилки Redis не зупиняють роботу адмінки."""
+    try:
+        get_redis().delete(f"{PHOTO_CACHE_PREFIX}{photo_filename}")
+        logger.info(f"Photo cache invalidated for {photo_filename}")
+    except Exception as e:
+        logger.error(f"Failed to invalidate photo cache for {photo_filename}: {e}")
@@ -0,0 +1,25 @@
+# Конфігурація gunicorn: gunicorn -c gunicorn.conf.py wsgi:app
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+
+# Процеси обходять GIL; потоки в кожному воркері покривають очікування на базу і Redis
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', '4'))
+
+# Застосунок створюється в кожному воркері окремо, тож пули з'єднань з базою не діляться між процесами
+preload_app = False
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 30  # Бот тримає keep-alive з'єднання у пулі aiohttp (bot/configuration.py HTTP_SETTINGS)
+
+# Періодичний перезапуск воркерів страхує від витоків пам'яті
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info')
@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from flask_admin.form import ImageUploadField
+from PIL import Image, ImageOps
+
+import config
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Лінивий пул потоків для обробки фото, щоб збереження квітки в адмінці не чекало на Pillow."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=config.IMAGE_WORKERS, thread_name_prefix='images')
+    return _executor
+
+
+def photo_path(photo_filename: str) -> str:
+    return os.path.join(config.MEDIA_ROOT, photo_filename)
+
+
+def variant_filename(photo_filename: str, variant: str) -> str:
+    """Ім'я варіанта фото: <ім'я оригіналу>_<варіант>.<розширення формату>, наприклад 3fa9..._tg.jpg"""
+    stem = os.path.splitext(photo_filename)[0]
+    return f"{stem}_{variant}{config.IMAGE_VARIANTS[variant]['extension']}"
+
+
+def build_variants(photo_filename: str):
+    """
+    Створює зменшені варіанти фото (мініатюра, JPEG для Telegram, WebP для сайту).
+    Кожен файл пишеться у тимчасовий і атомарно перейменовується, тож бот не прочитає недописаний файл.
+    """
+    source = photo_path(photo_filename)
+    try:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            for variant, settings in config.IMAGE_VARIANTS.items():
+                target = photo_path(variant_filename(photo_filename, variant))
+                if os.path.exists(target):
+                    continue
+                resized = image.copy()
+                resized.thumbnail((settings['max_size'], settings['max_size']), Image.LANCZOS)
+                if settings['format'] == 'JPEG' and resized.mode != 'RGB':
+                    resized = resized.convert('RGB')
+
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.part')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        resized.save(f, settings['format'], quality=settings['quality'], optimize=True)
+                    os.replace(temp_path, target)
+                except Exception:
+                    os.remove(temp_path)
+                    raise
+        logger.info(f"Image variants built for {photo_filename}")
+    except Exception as e:
+        logger.error(f"Failed to build image variants for {photo_filename}: {e}")
+
+
+def schedule_variants(photo_filename: str):
+    get_executor().submit(build_variants, photo_filename)
+
+
+def remove_photo_files(photo_filename: str):
+    """Видаляє оригінал фото і всі його варіанти."""
+    filenames = [photo_filename, *(variant_filename(photo_filename, variant) for variant in config.IMAGE_VARIANTS)]
+    for filename in filenames:
+        path = photo_path(filename)
+        try:
+            os.remove(path)
+            logger.info(f"File {path} deleted successfully.")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error deleting file {path}: {e}")
+
+
+class HashedImageUploadField(ImageUploadField):
+    """
+    Поле завантаження фото, яке пише файл частинами і називає його за SHA-256 вмісту.
+
+    Однакові фото зберігаються один раз. Зменшені копії будує build_variants за config.IMAGE_VARIANTS,
+    тому параметри max_size, thumbnail_size і thumbgen батьківського ImageUploadField не підтримуються.
+    """
+
+    def __init__(self, label=None, validators=None, **kwargs):
+        unsupported = sorted(option for option in ('max_size', 'thumbnail_size', 'thumbgen') if kwargs.get(option))
+        if unsupported:
+            raise TypeError(f"HashedImageUploadField does not support {', '.join(unsupported)}; "
+                            f"configure config.IMAGE_VARIANTS instead")
+        super().__init__(label, validators, **kwargs)
+
+    def _save_file(self, data, filename):
+        extension = os.path.splitext(filename)[1].lower()
+        directory = os.path.dirname(self._get_path(filename))
+        os.makedirs(directory, exist_ok=True)
+
+        data.stream.seek(0)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: data.stream.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            hashed_filename = f"{digest.hexdigest()[:32]}{extension}"
+            path = self._get_path(hashed_filename)
+            if os.path.exists(path):
+                os.remove(temp_path)  # Такий самий файл уже завантажено
+            else:
+                os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        logger.info(f"File saved successfully at {path}")
+        schedule_variants(hashed_filename)
+        return hashed_filename
+
+    def _delete_file(self, filename):
+        # Видалення делеговано FlowerView.remove_orphaned_photo: файл з тим самим вмістом може
+        # використовувати інша квітка, а це відомо лише після коміту
+        pass
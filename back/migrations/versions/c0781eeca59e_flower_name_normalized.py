@@ -0,0 +1,76 @@
+"""flower name_normalized
+
+Revision ID: c0781eeca59e
+Revises: 3d0c43d74325
+Create Date: 2026-10-18 10:12:41.215307
+
+"""
+from collections import defaultdict
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from models.flower import normalize_flower_name
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c0781eeca59e'
+down_revision: Union[str, None] = '3d0c43d74325'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Скільки рядків оновлюємо за один executemany
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    flower = sa.table('flower', sa.column('id', sa.Integer), sa.column('name', sa.String),
+                      sa.column('name_normalized', sa.String))
+
+    # Нормалізуємо тією ж функцією, що й пошук під час роботи: lower() у Postgres залежить від
+    # локалі бази й інакше згортає регістр, тож значення могли б не збігтися з normalize_flower_name
+    normalized = [
+        (flower_id, name, normalize_flower_name(name))
+        for flower_id, name in connection.execute(sa.select(flower.c.id, flower.c.name).order_by(flower.c.id))
+    ]
+
+    # Унікальний індекс не створиться, якщо дві назви відрізняються лише регістром чи пробілами
+    # ("Троянда" і "троянда "). Перевіряємо до змін схеми, щоб міграція не зупинилась на півдорозі
+    groups = defaultdict(list)
+    for flower_id, name, name_normalized in normalized:
+        groups[name_normalized].append((flower_id, name))
+    duplicates = {key: rows for key, rows in groups.items() if len(rows) > 1}
+    if duplicates:
+        details = '; '.join(
+            f"{key!r}: " + ', '.join(f"id={flower_id} {name!r}" for flower_id, name in rows)
+            for key, rows in sorted(duplicates.items())
+        )
+        raise RuntimeError(
+            f"Cannot create unique index on flower.name_normalized, duplicate flower names: {details}. "
+            f"Rename or merge these flowers and run the migration again."
+        )
+
+    op.add_column('flower', sa.Column('name_normalized', sa.String(length=100), nullable=True))
+
+    # Заповнюємо нормалізовані назви для існуючих записів пачками через executemany
+    statement = (
+        flower.update()
+        .where(flower.c.id == sa.bindparam('flower_id'))
+        .values(name_normalized=sa.bindparam('normalized'))
+    )
+    for start in range(0, len(normalized), BACKFILL_BATCH_SIZE):
+        batch = normalized[start:start + BACKFILL_BATCH_SIZE]
+        connection.execute(statement, [
+            {'flower_id': flower_id, 'normalized': name_normalized} for flower_id, _, name_normalized in batch
+        ])
+
+    op.alter_column('flower', 'name_normalized', existing_type=sa.String(length=100), nullable=False)
+    op.create_index(op.f('ix_flower_name_normalized'), 'flower', ['name_normalized'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_flower_name_normalized'), table_name='flower')
+    op.drop_column('flower', 'name_normalized')
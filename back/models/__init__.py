@@ -1,2 +1,3 @@
 from .base import db
-from .flower import Flower
\ No newline at end of file
+from .flower import Flower, find_flowers_by_names, normalize_flower_name
+from .reservation import Reservation, ReservationItem
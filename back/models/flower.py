@@ -1,9 +1,37 @@
+import re
+
+from sqlalchemy.orm import validates
+
 from models import db
 
+
+def normalize_flower_name(name: str) -> str:
+    """Нормалізує назву квітки для пошуку: без регістру та зайвих пробілів."""
+    return re.sub(r'\s+', ' ', name).strip().casefold()
+
+
 class Flower(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
+    # Нормалізована назва з унікальним індексом для пошуку за назвою
+    name_normalized = db.Column(db.String(100), nullable=False, unique=True, index=True)
     photo = db.Column(db.String(255), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     price = db.Column(db.Float, nullable=False)
     description = db.Column(db.String(1000), nullable=True)
+
+    @validates('name')
+    def validate_name(self, key, name):
+        self.name_normalized = normalize_flower_name(name) if name else name
+        return name
+
+
+def find_flowers_by_names(names) -> dict:
+    """
+    Завантажує квітки за назвами одним запитом IN (...) по індексу нормалізованої назви.
+    :return: Словник нормалізована назва -> Flower; назв, яких немає в каталозі, у словнику немає.
+    """
+    normalized = {normalize_flower_name(name) for name in names}
+    if not normalized:
+        return {}
+    return {flower.name_normalized: flower for flower in Flower.query.filter(Flower.name_normalized.in_(normalized))}
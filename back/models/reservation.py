@@ -0,0 +1,22 @@
+import datetime
+
+from models import db
+
+
+class Reservation(db.Model):
+    id = db.Column(db.String(32), primary_key=True)
+    # pending - квіти зарезервовані, confirmed - замовлення оформлено,
+    # cancelled - скасовано користувачем, expired - резерв звільнено після TTL
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)
+    total_price = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    items = db.relationship('ReservationItem', backref='reservation', lazy='selectin', cascade='all, delete-orphan')
+
+
+class ReservationItem(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    reservation_id = db.Column(db.String(32), db.ForeignKey('reservation.id', ondelete='CASCADE'), nullable=False, index=True)
+    flower_id = db.Column(db.Integer, db.ForeignKey('flower.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    unit_price = db.Column(db.Float, nullable=False)
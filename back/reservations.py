@@ -0,0 +1,69 @@
+import datetime
+import logging
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import update
+
+from models import db, Flower, Reservation
+
+logger = logging.getLogger(__name__)
+
+_swept_at = 0.0
+_sweep_lock = threading.Lock()
+
+
+def restore_stock(reservation: Reservation, status: str):
+    """Повертає зарезервовані квіти на склад і закриває резерв з указаним статусом."""
+    for item in sorted(reservation.items, key=lambda item: item.flower_id):
+        db.session.execute(
+            update(Flower)
+            .where(Flower.id == item.flower_id)
+            .values(quantity=Flower.quantity + item.quantity)
+            .execution_options(synchronize_session=False)
+        )
+    reservation.status = status
+
+
+def release_expired_reservations() -> int:
+    """
+    Звільняє прострочені резерви. Рядки, які зараз блокує інша транзакція, пропускаються.
+    :return: Кількість звільнених резервів.
+    """
+    expired = (
+        Reservation.query
+        .filter(Reservation.status == 'pending', Reservation.expires_at < datetime.datetime.utcnow())
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for reservation in expired:
+        restore_stock(reservation, 'expired')
+    db.session.commit()
+    if expired:
+        logger.info(f"Released {len(expired)} expired reservations")
+        # Імпорт тут: catalog сам викликає прибирання резервів перед побудовою знімка
+        from catalog import invalidate_catalog
+        invalidate_catalog()
+    return len(expired)
+
+
+def sweep_expired_reservations(force: bool = False) -> int:
+    """
+    Звільняє прострочені резерви не частіше ніж раз на RESERVATION_SWEEP_INTERVAL секунд у процесі.
+    Викликається з читань каталогу, тож резерви звільняються навіть тоді, коли ніхто не резервує нові.
+    Помилки лише логуються: читання каталогу не має падати через прибирання.
+    """
+    global _swept_at
+    with _sweep_lock:
+        now = time.monotonic()
+        if not force and now - _swept_at < current_app.config['RESERVATION_SWEEP_INTERVAL']:
+            return 0
+        _swept_at = now
+
+    try:
+        return release_expired_reservations()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to release expired reservations: {e}")
+        return 0
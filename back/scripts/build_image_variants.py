@@ -0,0 +1,40 @@
+"""
+Створює варіанти (thumb, tg, web) для всіх фото в MEDIA_ROOT, у яких їх ще немає:
+для фото, завантажених до появи фонової обробки, або якщо воркер перезапустився до її завершення.
+
+    cd back
+    python scripts/build_image_variants.py
+"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import config  # noqa: E402
+from images import build_variants, variant_filename  # noqa: E402
+
+
+def is_variant(filename: str) -> bool:
+    stem, extension = os.path.splitext(filename)
+    return any(stem.endswith(f"_{variant}") and extension == settings['extension']
+               for variant, settings in config.IMAGE_VARIANTS.items())
+
+
+def main():
+    originals = [
+        filename for filename in sorted(os.listdir(config.MEDIA_ROOT))
+        if not filename.endswith('.part') and not is_variant(filename)
+    ]
+    missing = [
+        filename for filename in originals
+        if not all(os.path.exists(os.path.join(config.MEDIA_ROOT, variant_filename(filename, variant)))
+                   for variant in config.IMAGE_VARIANTS)
+    ]
+    print(f"{len(originals)} photos, {len(missing)} without all variants")
+    with ThreadPoolExecutor(max_workers=config.IMAGE_WORKERS) as pool:
+        list(pool.map(build_variants, missing))
+
+
+if __name__ == '__main__':
+    main()
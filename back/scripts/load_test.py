@@ -0,0 +1,94 @@
+"""
+Навантажувальний тест API каталогу: пропускна здатність і затримки all_flowers і flower_parse_calculator.
+
+Запити генеруються кількома процесами, щоб клієнт не впирався в GIL раніше за сервер.
+Для перевірки масштабування запустіть сервер з різною кількістю воркерів і порівняйте req/s:
+
+    WEB_CONCURRENCY=1 gunicorn -c gunicorn.conf.py wsgi:app
+    python scripts/load_test.py --flower "Червона троянда" --concurrency 8,32,64
+    WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py wsgi:app
+    python scripts/load_test.py --flower "Червона троянда" --concurrency 8,32,64
+"""
+import argparse
+import http.client
+import json
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+def run_client(base_url: str, path: str, payload: dict, duration: float) -> list:
+    """Надсилає запити одним keep-alive з'єднанням до кінця тесту; повертає (статус, затримка) кожного запиту."""
+    url = urllib.parse.urlsplit(base_url)
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    body = json.dumps(payload).encode()  # bytes: заголовки і тіло йдуть одним пакетом
+    headers = {'Content-Type': 'application/json'}
+    results = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            connection.request('GET', f"{url.path}/{path}", body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            results.append((response.status, time.perf_counter() - started))
+        except (OSError, http.client.HTTPException):
+            results.append((0, time.perf_counter() - started))
+            connection.close()
+            connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    connection.close()
+    return results
+
+
+def run_process(base_url: str, path: str, payload: dict, duration: float, clients: int) -> list:
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        futures = [pool.submit(run_client, base_url, path, payload, duration) for _ in range(clients)]
+        return [result for future in futures for result in future.result()]
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run(base_url: str, path: str, payload: dict, duration: float, concurrency: int, processes: int) -> dict:
+    processes = max(1, min(processes, concurrency))
+    per_process = [concurrency // processes + (1 if i < concurrency % processes else 0) for i in range(processes)]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(run_process, base_url, path, payload, duration, clients) for clients in per_process]
+        results = [result for future in futures for result in future.result()]
+
+    latencies = sorted(latency for status, latency in results if status == 200)
+    return {
+        'requests': len(results),
+        'errors': sum(1 for status, _ in results if status != 200),
+        'rps': len(latencies) / duration,
+        'p50_ms': percentile(latencies, 0.5) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog API load test")
+    parser.add_argument('--base-url', default='http://localhost:5000/api/resources')
+    parser.add_argument('--flower', required=True, help="Flower name for flower_parse_calculator")
+    parser.add_argument('--concurrency', default='8,32', help="Comma-separated numbers of concurrent clients")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per run")
+    parser.add_argument('--processes', type=int, default=4, help="Client processes generating load")
+    args = parser.parse_args()
+
+    scenarios = [
+        ('all_flowers', {'page': 1, 'per_page': 10}),
+        ('flower_parse_calculator', {'flowers': {args.flower: 3}}),
+    ]
+    print(f"{'endpoint':<26}{'clients':>8}{'requests':>10}{'errors':>8}{'req/s':>10}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for concurrency in (int(value) for value in args.concurrency.split(',')):
+        for path, payload in scenarios:
+            stats = run(args.base_url, path, payload, args.duration, concurrency, args.processes)
+            print(f"{path:<26}{concurrency:>8}{stats['requests']:>10}{stats['errors']:>8}{stats['rps']:>10.1f}"
+                  f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Стрес-тест резервування: багато паралельних клієнтів намагаються купити одну квітку.
+
+Перевіряє, що успішних резервів не більше, ніж було квітів на складі, і що залишок
+на складі точно дорівнює початковій кількості мінус зарезервовані квіти.
+
+    python scripts/reservation_stress.py --name "Червона троянда" --clients 200
+"""
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def call(method: str, url: str, payload: dict):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(), method=method,
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b'{}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent reservation stress test")
+    parser.add_argument('--base-url', default='http://localhost:5000/api/resources')
+    parser.add_argument('--name', required=True, help="Flower name to buy")
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--quantity', type=int, default=1, help="Flowers per reservation")
+    args = parser.parse_args()
+
+    status, flower = call('GET', f"{args.base_url}/flower_by_name", {'name': args.name})
+    if status != 200:
+        sys.exit(f"Flower '{args.name}' not found: {flower}")
+    initial = flower['quantity']
+
+    def reserve(_):
+        return call('POST', f"{args.base_url}/reservation", {'flowers': {args.name: args.quantity}})
+
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        results = list(pool.map(reserve, range(args.clients)))
+
+    succeeded = [body for status, body in results if status == 201]
+    rejected = sum(1 for status, _ in results if status in (400, 409))
+    errors = len(results) - len(succeeded) - rejected
+
+    _, flower = call('GET', f"{args.base_url}/flower_by_name", {'name': args.name})
+    remaining = flower['quantity']
+    reserved = len(succeeded) * args.quantity
+
+    print(f"initial={initial} clients={args.clients} reserved={reserved} "
+          f"rejected={rejected} errors={errors} remaining={remaining}")
+
+    # Звільняємо резерви, щоб тест не змінював склад
+    for body in succeeded:
+        call('DELETE', f"{args.base_url}/reservation", {'reservation_id': body['reservation_id']})
+
+    if reserved > initial or remaining != initial - reserved:
+        sys.exit("OVERSOLD: stock accounting is inconsistent")
+    print("OK: no overselling")
+
+
+if __name__ == '__main__':
+    main()
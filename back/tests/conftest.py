@@ -0,0 +1,93 @@
+import contextlib
+import os
+import sys
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import config  # noqa: E402
+from catalog import invalidate_catalog  # noqa: E402
+from models import db, Flower  # noqa: E402
+from reservations import sweep_expired_reservations  # noqa: E402
+from server import create_app  # noqa: E402
+
+
+class TestConfig:
+    """Налаштування config.py, але з базою SQLite замість Postgres."""
+
+
+for name in dir(config):
+    if name.isupper():
+        setattr(TestConfig, name, getattr(config, name))
+TestConfig.TESTING = True
+TestConfig.SQLALCHEMY_ENGINE_OPTIONS = {}
+# Прострочені резерви тести звільняють явно, фонове прибирання не додає запитів до підрахунку
+TestConfig.RESERVATION_SWEEP_INTERVAL = 24 * 3600
+
+FLOWERS = [
+    {'name': 'Червона троянда', 'photo': 'rose.jpg', 'quantity': 10, 'price': 50.0, 'description': 'Троянда'},
+    {'name': 'Тюльпан', 'photo': 'tulip.jpg', 'quantity': 5, 'price': 30.0, 'description': 'Тюльпан'},
+    {'name': 'Півонія', 'photo': 'peony.jpg', 'quantity': 3, 'price': 80.0, 'description': 'Півонія'},
+]
+
+
+@contextlib.contextmanager
+def make_app(database_uri: str):
+    """Застосунок з тестовими квітами у вказаній базі; таблиці видаляються після тесту."""
+    database = type('Config', (TestConfig,), {'SQLALCHEMY_DATABASE_URI': database_uri})
+    app = create_app(database)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add_all(Flower(**flower) for flower in FLOWERS)
+        db.session.commit()
+        sweep_expired_reservations(force=True)
+        # Знімок каталогу живе на рівні процесу - скидаємо знімок попереднього тесту
+        invalidate_catalog()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def app(tmp_path):
+    # Файл, а не :memory:, щоб тести асинхронного API бачили ту саму базу через свій драйвер
+    with make_app(f"sqlite:///{tmp_path / 'flowers.db'}") as app:
+        yield app
+
+
+@pytest.fixture
+def postgres_app():
+    """Застосунок на Postgres з TEST_POSTGRES_URL; без нього тест пропускається. Таблиці в базі перестворюються."""
+    database_uri = os.getenv('TEST_POSTGRES_URL')
+    if not database_uri:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    with make_app(database_uri) as app:
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries(app):
+    """Контекстний менеджер, що рахує SQL запити до бази: with count_queries() as queries: ..."""
+
+    @contextlib.contextmanager
+    def counter():
+        queries = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            queries.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield queries
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return counter
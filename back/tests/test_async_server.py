@@ -0,0 +1,86 @@
+import asyncio
+import datetime
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip('aiohttp')
+pytest.importorskip('aiosqlite')
+
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+import async_server  # noqa: E402
+import config  # noqa: E402
+from models import db, Reservation  # noqa: E402
+
+RESERVATION_URL = '/api/resources/reservation'
+
+
+@pytest.fixture
+def async_get(app, monkeypatch):
+    """Виконує GET до асинхронного API над тією ж базою, що й Flask застосунок."""
+    monkeypatch.setattr(config, 'ASYNC_DATABASE_URI',
+                        app.config['SQLALCHEMY_DATABASE_URI'].replace('sqlite://', 'sqlite+aiosqlite://', 1))
+    monkeypatch.setattr(config, 'SQLALCHEMY_ENGINE_OPTIONS', {})
+
+    def get(*requests):
+        async def run():
+            async with TestClient(TestServer(async_server.create_app())) as client:
+                responses = []
+                for url, kwargs in requests:
+                    # Клієнт aiohttp за замовчуванням приймає gzip; тут - лише якщо тест це вказав
+                    headers = {'Accept-Encoding': 'identity', **kwargs.pop('headers', {})}
+                    response = await client.get(url, auto_decompress=False, headers=headers, **kwargs)
+                    responses.append((response.status, response.headers, await response.read()))
+                return responses
+
+        return asyncio.run(run())
+
+    return get
+
+
+def test_catalog_etag_matches_flask(client, async_get):
+    flask_response = client.get('/api/resources/flower_names')
+    [(status, headers, body)] = async_get(('/api/resources/flower_names', {}))
+
+    assert status == 200
+    assert headers['ETag'] == flask_response.headers['ETag']
+    assert body == flask_response.data
+
+
+def test_unchanged_catalog_is_not_modified_and_gzipped(async_get):
+    url = '/api/resources/all_flowers'
+    [(status, headers, body), *_] = responses = async_get(
+        (url, {'json': {'per_page': 2}, 'headers': {'Accept-Encoding': 'gzip'}}),
+        (url, {'json': {'per_page': 2}}),
+    )
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(body) == responses[1][2]
+
+    [(status, _, body)] = async_get((url, {'json': {'per_page': 2}, 'headers': {'If-None-Match': headers['ETag']}}))
+    assert status == 304
+    assert body == b''
+
+
+@pytest.mark.parametrize('name', ['page', 'per_page'])
+def test_async_paging_is_validated(async_get, name):
+    [(status, _, body)] = async_get(('/api/resources/all_flowers', {'json': {name: 0}}))
+    assert status == 400
+    assert name in json.loads(body)['message']
+
+
+def test_async_server_releases_expired_reservations(client, async_get):
+    reservation_id = client.post(RESERVATION_URL, json={'flowers': {'Півонія': 2}}).json['reservation_id']
+    reservation = db.session.get(Reservation, reservation_id)
+    reservation.expires_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+    db.session.commit()
+
+    [(status, _, body)] = async_get(('/api/resources/all_flowers', {'json': {'per_page': 10}}))
+
+    assert status == 200
+    quantities = {flower['name']: flower['quantity'] for flower in json.loads(body)['flowers']}
+    assert quantities['Півонія'] == 3
+    db.session.expire_all()
+    assert db.session.get(Reservation, reservation_id).status == 'expired'
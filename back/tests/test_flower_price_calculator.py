@@ -0,0 +1,41 @@
+URL = '/api/resources/flower_parse_calculator'
+
+
+def test_bouquet_is_priced_with_one_query(client, count_queries):
+    with count_queries() as queries:
+        response = client.get(URL, json={'flowers': {'Червона троянда': 3, 'тюльпан': 2, 'Півонія': 1}})
+
+    assert response.status_code == 200
+    assert response.json['total_price'] == 3 * 50.0 + 2 * 30.0 + 80.0
+    assert len(queries) == 1
+
+
+def test_all_problem_flowers_are_reported(client, count_queries):
+    with count_queries() as queries:
+        response = client.get(URL, json={'flowers': {'Червона троянда': 20, 'Кактус': 1, 'Тюльпан': 1}})
+
+    assert response.status_code == 400
+    assert response.json['missing'] == ['Кактус']
+    assert response.json['insufficient'] == {'Червона троянда': {'requested': 20, 'available': 10}}
+    assert len(queries) == 1
+
+
+def test_flowers_by_names_uses_one_query(client, count_queries):
+    with count_queries() as queries:
+        response = client.get('/api/resources/flowers_by_names',
+                              json={'names': ['Тюльпан', 'Червона  троянда', 'Кактус']})
+
+    assert response.status_code == 200
+    assert [flower['name'] for flower in response.json['flowers']] == ['Тюльпан', 'Червона троянда']
+    assert response.json['missing'] == ['Кактус']
+    assert len(queries) == 1
+
+
+def test_duplicate_lines_report_total_requested(client):
+    response = client.get(URL, json={'flowers': {'Тюльпан': 3, 'тюльпан ': 3}})
+
+    assert response.status_code == 400
+    assert response.json['insufficient'] == {
+        'Тюльпан': {'requested': 6, 'available': 5},
+        'тюльпан ': {'requested': 6, 'available': 5},
+    }
@@ -0,0 +1,32 @@
+import pytest
+
+URL = '/api/resources/all_flowers'
+
+
+def test_page_is_served_from_catalog_snapshot(client):
+    response = client.get(URL, json={'page': 1, 'per_page': 2})
+
+    assert response.status_code == 200
+    assert [flower['name'] for flower in response.json['flowers']] == ['Червона троянда', 'Тюльпан']
+    assert response.json['total_pages'] == 2
+    assert response.json['next_after_id'] == response.json['flowers'][-1]['id']
+
+
+@pytest.mark.parametrize('name', ['page', 'per_page'])
+@pytest.mark.parametrize('value', [0, -1, 'abc'])
+def test_invalid_paging_is_rejected(client, name, value):
+    response = client.get(URL, json={name: value})
+
+    assert response.status_code == 400
+    assert name in response.json['message']
+
+
+def test_projection_loads_only_requested_columns(client, count_queries):
+    with count_queries() as queries:
+        response = client.get(URL, json={'per_page': 10, 'fields': 'id,name'})
+
+    assert response.status_code == 200
+    assert set(response.json['flowers'][0]) == {'id', 'name'}
+    [select] = [query for query in queries if 'FROM flower' in query and 'reservation' not in query]
+    assert 'description' not in select
+    assert 'photo' not in select
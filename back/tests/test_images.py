@@ -0,0 +1,50 @@
+import io
+import os
+
+import pytest
+from werkzeug.datastructures import FileStorage
+from wtforms import Form
+
+import images
+from images import HashedImageUploadField
+
+
+@pytest.fixture
+def field(tmp_path, monkeypatch):
+    monkeypatch.setattr(images, 'schedule_variants', lambda filename: None)
+    return photo_form(base_path=str(tmp_path), allowed_extensions=['jpg', 'png']).photo
+
+
+def photo_form(**options) -> Form:
+    class PhotoForm(Form):
+        photo = HashedImageUploadField('Фото', **options)
+
+    return PhotoForm()
+
+
+def upload(content: bytes, filename: str) -> FileStorage:
+    return FileStorage(stream=io.BytesIO(content), filename=filename)
+
+
+def test_same_content_is_stored_once_under_its_hash(field, tmp_path):
+    first = field._save_file(upload(b'photo', 'rose.JPG'), 'rose.JPG')
+    second = field._save_file(upload(b'photo', 'other.jpg'), 'other.jpg')
+
+    assert first == second
+    assert first.endswith('.jpg') and len(first) == 32 + len('.jpg')
+    assert sorted(os.listdir(tmp_path)) == [first]
+
+
+def test_delete_keeps_file_for_remove_orphaned_photo(field, tmp_path):
+    filename = field._save_file(upload(b'photo', 'rose.jpg'), 'rose.jpg')
+
+    field._delete_file(filename)
+
+    assert os.path.exists(tmp_path / filename)
+
+
+@pytest.mark.parametrize('option, value', [('max_size', (800, 800, False)), ('thumbnail_size', (100, 100, True))])
+def test_resize_options_are_rejected(option, value):
+    # Зменшені копії будує build_variants, батьківська обробка фото не виконується
+    with pytest.raises(TypeError, match=option):
+        photo_form(**{option: value})
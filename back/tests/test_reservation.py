@@ -0,0 +1,113 @@
+import datetime
+
+import pytest
+
+from models import db, Flower, Reservation
+
+URL = '/api/resources/reservation'
+
+
+def stock(name: str) -> int:
+    db.session.expire_all()
+    return Flower.query.filter_by(name=name).one().quantity
+
+
+def reserve(client, flowers: dict):
+    return client.post(URL, json={'flowers': flowers})
+
+
+def expire(reservation_id: str):
+    reservation = db.session.get(Reservation, reservation_id)
+    reservation.expires_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_reservation_takes_stock_and_cancel_returns_it(client):
+    response = reserve(client, {'Червона троянда': 4, 'Тюльпан': 1})
+    assert response.status_code == 201
+    assert response.json['total_price'] == 4 * 50.0 + 30.0
+    assert stock('Червона троянда') == 6
+
+    response = client.delete(URL, json={'reservation_id': response.json['reservation_id']})
+    assert response.status_code == 200
+    assert stock('Червона троянда') == 10
+
+
+@pytest.mark.parametrize('quantity', [-5, 0, '3', 2.5, True, None])
+def test_invalid_quantity_is_rejected_without_touching_stock(client, quantity):
+    response = reserve(client, {'Червона троянда': quantity})
+
+    assert response.status_code == 400
+    assert 'Червона троянда' in response.json['invalid']
+    assert stock('Червона троянда') == 10
+    assert Reservation.query.count() == 0
+
+
+def test_invalid_quantity_is_rejected_by_price_calculator(client):
+    response = client.get('/api/resources/flower_parse_calculator', json={'flowers': {'Тюльпан': -1}})
+
+    assert response.status_code == 400
+    assert response.json['invalid'] == {'Тюльпан': -1}
+
+
+def test_checkout_of_expired_reservation_returns_stock(client):
+    reservation_id = reserve(client, {'Півонія': 3}).json['reservation_id']
+    assert stock('Півонія') == 0
+    expire(reservation_id)
+
+    response = client.put(URL, json={'reservation_id': reservation_id})
+
+    assert response.status_code == 410
+    assert response.json['status'] == 'expired'
+    assert stock('Півонія') == 3
+
+
+def test_catalog_read_releases_expired_reservations(client):
+    reservation_id = reserve(client, {'Півонія': 2}).json['reservation_id']
+    expire(reservation_id)
+
+    response = client.get('/api/resources/all_flowers', json={'per_page': 10})
+
+    assert response.status_code == 200
+    quantities = {flower['name']: flower['quantity'] for flower in response.json['flowers']}
+    assert quantities['Півонія'] == 3
+    assert db.session.get(Reservation, reservation_id).status == 'expired'
+
+
+@pytest.mark.parametrize('ttl', [-60, 0, 3601, 'soon'])
+def test_out_of_range_ttl_is_rejected(client, ttl):
+    response = client.post(URL, json={'flowers': {'Тюльпан': 1}, 'ttl': ttl})
+
+    assert response.status_code == 400
+    assert stock('Тюльпан') == 5
+    assert Reservation.query.count() == 0
+
+
+def test_unknown_reservation_is_not_found(client):
+    assert client.put(URL, json={'reservation_id': 'missing'}).status_code == 404
+    assert client.delete(URL, json={'reservation_id': 'missing'}).status_code == 404
+
+
+def test_failed_delivery_quote_keeps_stock(client, monkeypatch):
+    def broken_quote(*args, **kwargs):
+        raise RuntimeError("quote failed")
+
+    monkeypatch.setattr('Resources.Reservation.quote_delivery', broken_quote)
+
+    response = reserve(client, {'Тюльпан': 2})
+
+    assert response.status_code == 500
+    assert stock('Тюльпан') == 5
+    assert Reservation.query.count() == 0
+
+
+def test_reservation_changes_catalog_immediately(client):
+    url = '/api/resources/all_flowers'
+    before = client.get(url, json={'per_page': 10})
+
+    reserve(client, {'Тюльпан': 2})
+    after = client.get(url, json={'per_page': 10})
+
+    # Знімок каталогу не чекає CATALOG_SNAPSHOT_MAX_AGE: залишок і ETag змінюються одразу
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert {flower['name']: flower['quantity'] for flower in after.json['flowers']}['Тюльпан'] == 3
@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from models import db, Flower, Reservation, ReservationItem
+
+URL = '/api/resources/reservation'
+CLIENTS = 20
+
+
+def reserve_concurrently(app, flowers: dict) -> list:
+    """Одночасно надсилає CLIENTS резервів з окремих потоків; кожен потік має власний клієнт і сесію."""
+    barrier = threading.Barrier(CLIENTS)
+
+    def reserve(_):
+        client = app.test_client()
+        barrier.wait()
+        response = client.post(URL, json={'flowers': flowers})
+        return response.status_code, response.json
+
+    with ThreadPoolExecutor(max_workers=CLIENTS) as pool:
+        return list(pool.map(reserve, range(CLIENTS)))
+
+
+def reserved_total(flower_id: int) -> int:
+    return (
+        db.session.query(db.func.coalesce(db.func.sum(ReservationItem.quantity), 0))
+        .join(Reservation)
+        .filter(ReservationItem.flower_id == flower_id, Reservation.status == 'pending')
+        .scalar()
+    )
+
+
+def assert_not_oversold(app, name: str, per_client: int):
+    with app.app_context():
+        flower = Flower.query.filter_by(name=name).one()
+        initial = flower.quantity
+
+    results = reserve_concurrently(app, {name: per_client})
+
+    with app.app_context():
+        flower = Flower.query.filter_by(name=name).one()
+        reserved = reserved_total(flower.id)
+        succeeded = [body for status, body in results if status == 201]
+
+        assert reserved <= initial
+        assert reserved == len(succeeded) * per_client
+        assert flower.quantity == initial - reserved
+        assert flower.quantity >= 0
+        # Відмова через нестачу повідомляє справжній залишок, якого не вистачило на запит
+        for status, body in results:
+            if status == 409:
+                assert body['insufficient'][name]['available'] < per_client
+    return results, initial
+
+
+@pytest.mark.parametrize('per_client', [1, 2])
+def test_concurrent_reservations_never_oversell(app, per_client):
+    # SQLite серіалізує записи блокуванням усієї бази: частина потоків може отримати 500
+    # ("database is locked"), але продати більше, ніж є на складі, не може жоден
+    results, _ = assert_not_oversold(app, 'Тюльпан', per_client)
+
+    assert any(status == 201 for status, _ in results)
+
+
+@pytest.mark.parametrize('per_client', [1, 2])
+def test_concurrent_reservations_never_oversell_on_postgres(postgres_app, per_client):
+    results, initial = assert_not_oversold(postgres_app, 'Тюльпан', per_client)
+
+    # На Postgres умовний UPDATE чекає на блокування рядка, тож помилок немає і склад розпродано повністю
+    assert all(status in (201, 409) for status, _ in results)
+    assert sum(1 for status, _ in results if status == 201) == initial // per_client
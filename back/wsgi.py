@@ -0,0 +1,4 @@
+# WSGI точка входу для продакшену: gunicorn -c gunicorn.conf.py wsgi:app
+from server import create_app
+
+app = create_app()
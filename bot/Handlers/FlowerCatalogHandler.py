@@ -1,113 +1,156 @@
-import datetime
-import json
 import logging
-import os
-import re
 
-import requests
 from aiogram import types
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
-from aiogram.types import InlineKeyboardButton, FSInputFile
+from aiogram.types import InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from Handlers.GPTService import GPTService
-from Services.FlowerService import FlowerService
+from Services.FlowerMatcher import FlowerMatcher
+from Services.FlowerService import FlowerService, normalize_flower_name
+from Services.MessageStream import stream_answer
+from Services.PhotoCache import PhotoCache
+from Services.WeatherProvider import WeatherCache
 
 class BouquetOrderStates(StatesGroup):
     waiting_for_bouquet_choice = State()  # Стан очікування вибору букета
     waiting_for_purchase_confirmation = State()
+    waiting_for_delivery_address = State()  # Адреса потрібна для зони доставки перед резервуванням
     waiting_for_custom_bouquet = State()  #
 
 logger = logging.getLogger(__name__)
 
 class FlowerCatalogHandler:
-    def __init__(self):
+    def __init__(self, redis_client):
         self.flower_service = FlowerService()
-        self.gpt_service = GPTService()
+        self.gpt_service = GPTService(redis_client)
+        self.photo_cache = PhotoCache(redis_client)
+        self.flower_matcher = None
+        self.flower_matcher_source = None
 
     async def show_flower_catalog(self, message: types.Message, page: int = 1):
         """
         Відправляє каталог квітів з підтримкою пагінації.
         """
         per_page = 5
-        flowers_response = await self.flower_service.fetch_all_flowers(page, per_page)
+        # Для клавіатури каталогу потрібні лише id і назва
+        flower_page = await self.flower_service.fetch_all_flowers(page, per_page, fields=('id', 'name'))
 
-        if not flowers_response:
+        if not flower_page:
             await message.answer("Вибачте, наразі у нас немає квітів у наявності. 🌸")
             return
 
-        flowers = self.flower_service.flowers
-        total_pages = self.flower_service.get_total_pages(per_page)
-
         text = "🌼 Ось каталог квітів, що у нас є! 🌻🌼💛\nОберіть квітку для отримання детальної інформації:"
 
         builder = InlineKeyboardBuilder()
-        for flower in flowers:
-            builder.row(InlineKeyboardButton(text=flower['name'], callback_data=f"flower_info_{flower['id']}"))
+        for flower in flower_page.flowers:
+            builder.row(InlineKeyboardButton(text=flower.name, callback_data=f"flower_info_{flower.id}"))
 
         if page > 1:
             builder.row(InlineKeyboardButton(text="⬅️ Попередня", callback_data=f"flowers_page_{page - 1}"))
-        if page < total_pages:
+        if page < flower_page.total_pages:
             builder.row(InlineKeyboardButton(text="Наступна ➡️", callback_data=f"flowers_page_{page + 1}"))
 
         await message.answer(text, reply_markup=builder.as_markup())
 
 
 
+    @staticmethod
+    def price_error_text(price_response: dict) -> str:
+        """
+        Формує повідомлення про помилку розрахунку вартості з переліком усіх проблемних квіток.
+        """
+        missing = price_response.get('missing') or []
+        insufficient = price_response.get('insufficient') or {}
+        invalid = price_response.get('invalid') or {}
+        if not missing and not insufficient and not invalid:
+            return "Сталася помилка при розрахунку вартості. Спробуйте ще раз."
+
+        lines = ["На жаль, не вдалося скласти цей букет 😔"]
+        for name, quantity in invalid.items():
+            lines.append(f"{name}: кількість має бути цілим числом більше нуля, а не {quantity}.")
+        if missing:
+            lines.append(f"Немає в каталозі: {', '.join(missing)}.")
+        for name, info in insufficient.items():
+            if not info.get('available'):
+                # Останні квіти щойно зарезервував інший покупець
+                lines.append(f"{name}: на жаль, щойно розкупили.")
+            else:
+                lines.append(f"{name}: є лише {info['available']} шт. замість {info['requested']}.")
+        lines.append("Змініть склад букета, і ми все порахуємо 🌸")
+        return '\n'.join(lines)
+
+    def get_flower_matcher(self, flower_names: tuple) -> FlowerMatcher:
+        """
+        Повертає локальний індекс назв каталогу; перебудовує його лише тоді, коли змінився список назв.
+        """
+        # Поки кеш каталогу не оновився, він повертає той самий кортеж - порівнювати вміст не потрібно
+        if flower_names is self.flower_matcher_source:
+            return self.flower_matcher
+        if self.flower_matcher is None or tuple(self.flower_matcher.names) != flower_names:
+            self.flower_matcher = FlowerMatcher(flower_names)
+            logger.info(f"Flower matcher rebuilt for {len(flower_names)} flowers")
+        self.flower_matcher_source = flower_names
+        return self.flower_matcher
+
     async def check_flower_availability(self, flower_name: str, message: types.Message):
         """
         Перевіряє наявність квіток за запитом користувача та відповідає інформацією про кожну з них.
         """
         # Отримуємо всі імена квіток
         flower_names = await self.flower_service.fetch_flower_names()
+        query = flower_name or message.text
+
+        # Спершу локальний пошук за каталогом; GPT - лише для неоднозначних запитів
+        flower_list = self.get_flower_matcher(flower_names).match(query)
+
+        if flower_list is None:
+            logger.info(f"Local matcher is not sure about '{query}', asking GPT")
+            # Формуємо промпт для GPT
+            prompt = (
+                f"Користувач запитує про квітку '{query}'. "
+                f"Вибери всі квітки зі списку: {', '.join(flower_names)}, які на твою думку підходять під цей запит. "
+                "Поверни лише список відповідних квіток через кому у вигляді рядка. "
+                "Якщо жодна квітка не підходить, поверни порожній рядок."
+            )
 
-        logger.info(flower_names)
-
-        # Формуємо промпт для GPT
-        prompt = (
-            f"Користувач запитує про квітку '{flower_name}'. "
-            f"Вибери всі квітки зі списку: {', '.join(flower_names)}, які на твою думку підходять під цей запит. "
-            "Поверни лише список відповідних квіток через кому у вигляді рядка. "
-            "Якщо жодна квітка не підходить, поверни порожній рядок."
-        )
+            # Відправка промпту до GPT; відповідь залежить лише від запиту і каталогу
+            gpt_response = await self.gpt_service.send_to_gpt(prompt, cache_scope='availability', cache_text=query)
 
-        # Відправка промпту до GPT
-        gpt_response = await self.gpt_service.send_to_gpt(prompt)
+            # Перевіряємо, чи є відповідь від GPT
+            if gpt_response is None:
+                await message.answer("На жаль, ми не отримали відповіді від сервера. Спробуйте пізніше.")
+                return
 
-        # Перевіряємо, чи є відповідь від GPT
-        if gpt_response:
             # Парсимо відповідь GPT, припускаємо, що відповідь – це рядок із назвами квіток через кому
-            flower_list = gpt_response.split(", ") if gpt_response else []
-
-            if flower_list:
-                # Якщо є відповідні квітки, надсилаємо повідомлення з підтвердженням
-                await message.answer(f"🌼 Так, у нас є квіти, які ви хочете! 🌼\n"
-                                     f"Ось список квітів, що підходять під ваш запит: 🌻🌼💛")
-
-                # Проходимося по кожній квітці з отриманого списку
-                for flower in flower_list:
-                    flower_data = await self.flower_service.get_flower_by_name(flower)
-                    relative_path = f"../back/media/flowers/{flower_data['photo']}"
-                    photo_path = os.path.abspath(relative_path)
-                    photo = FSInputFile(photo_path)
-
-                    if flower_data:
-                        # Відправляємо інформацію про квітку
-                        await message.answer_photo(
-                            photo,
-                            caption=f"{flower_data['name']} - {flower_data['price']} грн 🌻\n"
-                                    f"Кількість: {flower_data['quantity']} 📦\n"
-                                    f"Опис: {flower_data['description']} 📜"
-                        )
-                    else:
-                        await message.answer(f"Квітка '{flower}' не знайдена в базі.")
-            else:
-                # Якщо квіток не знайдено, надсилаємо повідомлення
-                await message.answer(f"😔 На жаль, ми не знайшли жодних квіток за запитом '{flower_name}'.\n"
-                                     "🌼 Але ви можете ознайомитися з нашим асортиментом і знайти інші чудові квіти 💐💛!")
+            flower_list = [name.strip() for name in gpt_response.split(",") if name.strip()]
+
+        if flower_list:
+            # Якщо є відповідні квітки, надсилаємо повідомлення з підтвердженням
+            await message.answer(f"🌼 Так, у нас є квіти, які ви хочете! 🌼\n"
+                                 f"Ось список квітів, що підходять під ваш запит: 🌻🌼💛")
+
+            # Дані всіх квіток отримуємо одним запитом, а фото надсилаємо одним альбомом
+            flowers = await self.flower_service.get_flowers_by_names(flower_list)
+            # Назви зіставляються так само, як їх шукає бекенд, інакше знайдена квітка вважалась би відсутньою
+            found = {normalize_flower_name(flower_data.name) for flower_data in flowers}
+            for flower in flower_list:
+                if normalize_flower_name(flower) not in found:
+                    await message.answer(f"Квітка '{flower}' не знайдена в базі.")
+
+            if flowers:
+                await self.photo_cache.send_photo_group(message, [
+                    (flower_data.photo,
+                     f"{flower_data.name} - {flower_data.price} грн 🌻\n"
+                     f"Кількість: {flower_data.quantity} 📦\n"
+                     f"Опис: {flower_data.description} 📜")
+                    for flower_data in flowers
+                ])
         else:
-            await message.answer("На жаль, ми не отримали відповіді від сервера. Спробуйте пізніше.")
+            # Якщо квіток не знайдено, надсилаємо повідомлення
+            await message.answer(f"😔 На жаль, ми не знайшли жодних квіток за запитом '{query}'.\n"
+                                 "🌼 Але ви можете ознайомитися з нашим асортиментом і знайти інші чудові квіти 💐💛!")
 
     async def show_flower_details(self, flower_id: int, callback_query: types.CallbackQuery):
         """
@@ -115,13 +158,10 @@ class FlowerCatalogHandler:
         """
         flower = await self.flower_service.get_flower_by_id(flower_id)
         if flower:
-            relative_path = f"../back/media/flowers/{flower['photo']}"
-            photo_path = os.path.abspath(relative_path)
-            photo = FSInputFile(photo_path)
-
-            await callback_query.message.answer_photo(
-                photo,
-                caption=f"{flower['name']} - {flower['price']} грн 🌹\nКількість: {flower['quantity']} 📦\nОпис: {flower['description']} 📜"
+            await self.photo_cache.send_photo(
+                callback_query.message,
+                flower.photo,
+                caption=f"{flower.name} - {flower.price} грн 🌹\nКількість: {flower.quantity} 📦\nОпис: {flower.description} 📜"
             )
         else:
             await callback_query.message.answer("На жаль, ми не маємо такої квітки в наявності. 🌸")
@@ -160,11 +200,15 @@ class FlowerCatalogHandler:
         )
         logger.info(prompt)
 
-        gpt_response = await self.gpt_service.send_to_gpt(prompt)
+        # Варіанти букетів перевикористовуються, доки каталог не змінився; нові показуються по мірі генерації
+        gpt_response = await stream_answer(
+            message,
+            self.gpt_service.stream_to_gpt(prompt, cache_scope='bouquet_suggestions'),
+            prefix="Ось кілька варіантів букетів, які ви можете замовити:\n\n",
+            suffix=" 💐",
+        )
 
         if gpt_response:
-            await message.answer(f"Ось кілька варіантів букетів, які ви можете замовити:\n\n{gpt_response} 💐")
-
             # Зберігаємо запропоновані варіанти у FSM
             await state.update_data(bouquet_options=gpt_response)
 
@@ -173,101 +217,87 @@ class FlowerCatalogHandler:
         else:
             await message.answer("На жаль, не вдалося отримати варіанти букетів. Спробуйте пізніше.")
 
-    import json
-
-    async def handle_bouquet_choice(self, message: types.Message, state: FSMContext):
+    async def parse_bouquet(self, request: str, bouquet_options: str = None) -> list:
         """
-        Обробляє вибір користувача щодо букета і запитує підтвердження покупки разом з вартістю.
+        Визначає склад букета одним структурованим викликом LLM і зіставляє квітки з каталогом.
+        :return: Список {"id", "name", "quantity"} квіток каталогу; порожній, якщо склад визначити не вдалося.
         """
-        # Отримуємо дані із стану
-        user_data = await state.get_data()
-        bouquet_options = user_data.get("bouquet_options")
-
-        chosen_bouquet = message.text.strip()
-
-        # Формуємо промпт для GPT, щоб визначити, який букет вибрав користувач
-        prompt = (
-            f"Користувач вибрав варіант букета: '{chosen_bouquet}'. "
-            "Який букет з наступних варіантів найбільш схожий на вибір користувача? "
-            f"Ось варіанти: {bouquet_options}. Поверни назву вибраного букета."
-        )
-
-        # Надсилаємо запит до GPT
-        gpt_response = await self.gpt_service.send_to_gpt(prompt)
-
-        # Перевіряємо, чи GPT повернув відповідний варіант
-        if gpt_response:
-            chosen_bouquet = gpt_response.strip()
-        else:
-            await message.answer("Будь ласка, оберіть один із запропонованих варіантів букетів.")
-            return
-
-        # Зберігаємо вибір користувача
-        await state.update_data(chosen_bouquet=chosen_bouquet)
-        pattern = r'"назва":\s*"([^"]+)",\s*"кількість":\s*(\d+)'
-
-        # Створюємо промпт для отримання кількості квітів для вибраного букета
-        flowers_prompt = (
-            f"Назва букета: {chosen_bouquet}. Поверни список квітів та кількість кожної квітки в цьому букеті у форматі JSON. "
-            f"Обов'язково!Перше слово з великої букви, друге з маленької, наприклад Червона троянда"
-            f"Назви квітів повертай в однині. І якщо в назві є колір він повинен залишитися в назві.Обов'язково треба щоб воно розпарсилось таким виразом {pattern}"
-        )
-
-        # Надсилаємо запит до GPT для отримання інформації про склад букета
-        bouquet_flowers_response = await self.gpt_service.send_to_gpt(flowers_prompt)
-
-        # Лог для налагодження
-        logger.info(f"Raw response from GPT: '{bouquet_flowers_response}'")
-
-        # Регулярний вираз для витягнення квітів і кількості
-        matches = re.findall(pattern, bouquet_flowers_response)
-
-        if not matches:
-            await message.answer("Не вдалося знайти інформацію про квіти. Спробуйте ще раз.")
+        flower_names = await self.flower_service.fetch_flower_names()
+        items = await self.gpt_service.extract_bouquet_items(request, flower_names, bouquet_options)
+        if not items:
+            return []
+
+        # Назви поза переліком (великий каталог без enum у схемі) зіставляємо локальним пошуком
+        catalog_names = set(flower_names)
+        bouquet_flowers = {}
+        for item in items:
+            name = item['name']
+            if name not in catalog_names:
+                matches = self.get_flower_matcher(flower_names).match(name, limit=1)
+                if not matches:
+                    logger.info(f"Bouquet item '{name}' does not match the catalog")
+                    continue
+                name = matches[0]
+            bouquet_flowers[name] = bouquet_flowers.get(name, 0) + item['quantity']
+
+        if not bouquet_flowers:
+            return []
+        flowers = await self.flower_service.get_flowers_by_names(list(bouquet_flowers))
+        quantities = {normalize_flower_name(name): quantity for name, quantity in bouquet_flowers.items()}
+        return [
+            {'id': flower.id, 'name': flower.name, 'quantity': quantities[normalize_flower_name(flower.name)]}
+            for flower in flowers
+            if normalize_flower_name(flower.name) in quantities
+        ]
+
+    async def ask_purchase_confirmation(self, message: types.Message, state: FSMContext, bouquet_items: list,
+                                        title: str = "букет"):
+        """
+        Рахує вартість букета і запитує підтвердження покупки.
+        """
+        if not bouquet_items:
+            await message.answer("Не вдалося визначити склад букета з квітів нашого каталогу. "
+                                 "Опишіть, будь ласка, які квіти і скільки штук вам потрібно 🌸")
             return
 
-        # Формуємо словник квітів
-        bouquet_flowers = {name: int(quantity) for name, quantity in matches}
-
         # Зберігаємо склад букета в стані
-        await state.update_data(bouquet_flowers=bouquet_flowers)
+        bouquet_flowers = {item['name']: item['quantity'] for item in bouquet_items}
+        await state.update_data(bouquet_flowers=bouquet_flowers, bouquet_items=bouquet_items)
 
-        # Розрахунок вартості букета через FlowerService
-        flower_service = FlowerService()
-        price_response = await flower_service.calculate_flower_price(bouquet_flowers)
+        # Вартість букета і орієнтовна доставка (без адреси - за стандартною зоною) одним запитом
+        weather = await WeatherCache.get()
+        quote = await self.flower_service.quote_delivery(
+            bouquet_flowers, weather=weather['condition'] if weather else None)
 
         # Отримуємо загальну вартість з відповіді API
-        total_price = price_response.get('total_price')
+        total_price = quote.get('goods_total')
         if not total_price:
-            await message.answer("Сталася помилка при розрахунку вартості. Спробуйте ще раз.")
+            await message.answer(self.price_error_text(quote))
             return
 
         # Формуємо інформацію для підтвердження покупки
         bouquet_details = ', '.join([f"{flower}: {quantity}" for flower, quantity in bouquet_flowers.items()])
-        await message.answer(f"Ви обрали букет: {bouquet_details}. Загальна вартість: {total_price} грн. "
+        await message.answer(f"Ви обрали {title}: {bouquet_details}. Загальна вартість: {total_price} грн. "
+                             f"Доставка орієнтовно {quote['delivery_fee']} грн, точна сума залежить від адреси.\n"
                              f"Ви впевнені, що хочете купити цей букет? (так/ні) 🌹")
 
         # Переходимо до стану очікування підтвердження покупки
         await state.set_state(BouquetOrderStates.waiting_for_purchase_confirmation)
 
-    # Оновлена функція для отримання погоди
-    async def get_weather(self):
-        api_key = ""
-        location = "Kyiv"
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={location}&appid={api_key}&lang=ua&units=metric"
-        response = requests.get(url)
-
-        if response.status_code == 200:  # Перевірка на успішний статус запиту
-            weather_data = response.json()
-            if "weather" in weather_data:
-                logger.info(f'Weather API response: {weather_data}')
-                return weather_data
-            else:
-                logger.error(f'Weather data does not contain "weather" key: {weather_data}')
-                return None
-        else:
-            logger.error(f'Error fetching weather data: {response.status_code}, {response.text}')
-            return None
+    async def handle_bouquet_choice(self, message: types.Message, state: FSMContext):
+        """
+        Обробляє вибір користувача щодо букета і запитує підтвердження покупки разом з вартістю.
+        """
+        # Отримуємо дані із стану
+        user_data = await state.get_data()
+        bouquet_options = user_data.get("bouquet_options")
+
+        chosen_bouquet = message.text.strip()
+        await state.update_data(chosen_bouquet=chosen_bouquet)
+
+        # Вибір варіанта і склад букета визначаються одним викликом LLM
+        bouquet_items = await self.parse_bouquet(chosen_bouquet, bouquet_options)
+        await self.ask_purchase_confirmation(message, state, bouquet_items)
 
     # Оновлена функція confirm_purchase з перевіркою на наявність погоди
     async def confirm_purchase(self, message: types.Message, state: FSMContext):
@@ -275,51 +305,84 @@ class FlowerCatalogHandler:
 
         if user_response == "так":
             user_data = await state.get_data()
-            chosen_bouquet = user_data.get("chosen_bouquet")
-            bouquet_flowers = user_data.get("bouquet_flowers")
-
-            # Запит погоди
-            weather_data = await self.get_weather()
-            logger.info(weather_data)
-            if weather_data and "weather" in weather_data:
-                current_weather = weather_data["weather"][0]["description"]
-
-                # Перевірка погодних умов
-                if "clear" in current_weather or "clouds" in current_weather:
-                    delivery_cost = 50  # Вартість доставки при гарній погоді
-                    delivery_time = datetime.datetime.now() + datetime.timedelta(hours=1)  # Час доставки через годину
+            reservation_id = user_data.get("reservation_id")
+
+            # Повторне підтвердження після розрахунку доставки - оформлюємо замовлення за резервом
+            if reservation_id:
+                checkout = await self.flower_service.confirm_reservation(reservation_id)
+                if checkout.get('status') == 'confirmed':
+                    await message.answer("Дякуємо! Ваше замовлення оформлено 💐")
+                    await state.clear()
+                elif checkout.get('status') in ('expired', 'cancelled'):
+                    await message.answer("На жаль, час резерву вичерпано. Спробуйте скласти букет ще раз. 🌸")
+                    await state.clear()
                 else:
-                    delivery_cost = 100  # Вартість доставки при поганій погоді
-                    delivery_time = datetime.datetime.now() + datetime.timedelta(hours=1.5)  # Час доставки через 1.5 години
-            else:
-                # Якщо погода не доступна, встановлюємо стандартні значення
-                delivery_cost = 70  # Стандартна вартість доставки
-                delivery_time = datetime.datetime.now() + datetime.timedelta(hours=1.25)  # Стандартний час доставки
-
-            # Розрахунок загальної вартості
-            flower_service = FlowerService()
-            price_response = await flower_service.calculate_flower_price(bouquet_flowers)
-            total_price = price_response.get('total_price', 0)
-            total_cost = total_price + delivery_cost
-
-            bouquet_details = ', '.join([f"{flower}: {quantity}" for flower, quantity in bouquet_flowers.items()])
-            delivery_time_str = delivery_time.strftime("%H:%M")
-
-            await message.answer(
-                f"Ви обрали букет: {bouquet_details}. Загальна вартість: {total_price} грн. "
-                f"Вартість доставки: {delivery_cost} грн. Погода: {weather_data['weather'][0]['description']} \nЗагальна сума: {total_cost} грн.\n"
-                f"Час доставки: {delivery_time_str}.\n"
-                f"Ви впевнені, що хочете купити цей букет? (так/ні) 🌹"
-            )
+                    await message.answer("Не вдалося оформити замовлення. Спробуйте ще раз пізніше.")
+                return
 
-            await state.set_state(BouquetOrderStates.waiting_for_purchase_confirmation)
+            # Спершу адреса: від неї залежить зона, а отже вартість і час доставки
+            await message.answer("Вкажіть, будь ласка, адресу доставки (район, вулиця, будинок) 🏠")
+            await state.set_state(BouquetOrderStates.waiting_for_delivery_address)
 
         elif user_response == "ні":
+            user_data = await state.get_data()
+            reservation_id = user_data.get("reservation_id")
+            if reservation_id:
+                # Повертаємо зарезервовані квіти на склад
+                await self.flower_service.cancel_reservation(reservation_id)
             await message.answer("Ваше замовлення скасовано.")
             await state.clear()
         else:
             await message.answer("Будь ласка, відповідайте лише 'так' або 'ні'.")
 
+    async def handle_delivery_address(self, message: types.Message, state: FSMContext):
+        """
+        Отримує адресу доставки, резервує квіти і показує остаточну вартість з доставкою для підтвердження.
+        """
+        address = message.text.strip()
+        if address.lower() == "ні":
+            await message.answer("Ваше замовлення скасовано.")
+            await state.clear()
+            return
+
+        user_data = await state.get_data()
+        bouquet_flowers = user_data.get("bouquet_flowers")
+        await state.update_data(delivery_address=address)
+
+        # Погода з фонового кешу: обробник не чекає на API погоди
+        weather = await WeatherCache.get()
+
+        # Резервуємо квіти на складі, щоб паралельні замовлення не продали ті самі квіти.
+        # У тій самій відповіді бекенд повертає вартість і час доставки за адресою
+        reservation = await self.flower_service.reserve_bouquet(
+            bouquet_flowers,
+            address=address,
+            weather=weather['condition'] if weather else None,
+        )
+        if 'reservation_id' not in reservation:
+            await message.answer(self.price_error_text(reservation))
+            await state.clear()
+            return
+        await state.update_data(reservation_id=reservation['reservation_id'])
+
+        delivery = reservation['delivery']
+        total_price = delivery['goods_total']
+        delivery_cost = delivery['delivery_fee']
+        total_cost = delivery['total']
+
+        bouquet_details = ', '.join([f"{flower}: {quantity}" for flower, quantity in bouquet_flowers.items()])
+        delivery_time_str = delivery['eta']
+        weather_text = f" Погода: {weather['description']}" if weather else ""
+
+        await message.answer(
+            f"Ви обрали букет: {bouquet_details}. Загальна вартість: {total_price} грн. "
+            f"Вартість доставки: {delivery_cost} грн.{weather_text}\nЗагальна сума: {total_cost} грн.\n"
+            f"Час доставки: {delivery_time_str}.\n"
+            f"Ви впевнені, що хочете купити цей букет? (так/ні) 🌹"
+        )
+
+        await state.set_state(BouquetOrderStates.waiting_for_purchase_confirmation)
+
     # Хендлер, який користувач може запускати повторно
     async def custom_bouquet_creation(self, message: types.Message, state: FSMContext):
         """
@@ -352,47 +415,5 @@ class FlowerCatalogHandler:
         # Отримуємо текстовий ввід користувача (вибір квітів)
         chosen_bouquet = message.text.strip()
 
-        # Формуємо промпт для GPT для визначення кількості і типу квітів
-        pattern = r'"назва":\s*"([^"]+)",\s*"кількість":\s*(\d+)' # Регулярний вираз для отримання кількості та назви квіток
-        prompt = (
-            f"Назва букета: {chosen_bouquet}. Поверни список квітів та кількість кожної квітки в цьому букеті у форматі JSON. "
-            f"Обов'язково!Перше слово з великої букви, друге з маленької, наприклад Червона троянда"
-            f"Назви квітів повертай в однині. І якщо в назві є колір він повинен залишитися в назві.Обов'язково потрібно Щоб воно розпарсилось таким виразом {pattern}"
-        )
-
-        # Надсилаємо запит до GPT
-        gpt_response = await self.gpt_service.send_to_gpt(prompt)
-
-        # Лог для відслідковування відповіді GPT
-        logger.info(f"Raw response from GPT: '{gpt_response}'")
-
-        # Використовуємо регулярний вираз для витягнення інформації про квіти і кількість
-        matches = re.findall(pattern, gpt_response)
-
-        if not matches:
-            await message.answer("Не вдалося знайти інформацію про квіти. Спробуйте ще раз.")
-            return
-
-        # Формуємо словник квітів
-        bouquet_flowers = {name: int(quantity) for name, quantity in matches}
-        # Зберігаємо склад букета в стані
-        await state.update_data(bouquet_flowers=bouquet_flowers)
-
-        flower_service = FlowerService()
-        price_response = await flower_service.calculate_flower_price(bouquet_flowers)
-
-        # Отримуємо загальну вартість з відповіді API
-        total_price = price_response.get('total_price')
-        if not total_price:
-            await message.answer("Сталася помилка при розрахунку вартості. Спробуйте ще раз.")
-            return
-
-        # Створюємо рядок для виведення користувачеві
-        bouquet_details = ', '.join([f"{flower}: {quantity}" for flower, quantity in bouquet_flowers.items()])
-
-        # Виводимо запит на підтвердження покупки
-        await message.answer(f"Ви обрали кастомний букет: {bouquet_details}. Загальна вартість: {total_price} грн. "
-                             f"Ви впевнені, що хочете купити цей букет? (так/ні) 🌹")
-
-        # Переходимо до стану очікування підтвердження покупки
-        await state.set_state(BouquetOrderStates.waiting_for_purchase_confirmation)
\ No newline at end of file
+        bouquet_items = await self.parse_bouquet(chosen_bouquet)
+        await self.ask_purchase_confirmation(message, state, bouquet_items, title="кастомний букет")
\ No newline at end of file
@@ -1,15 +1,188 @@
+import asyncio
+import json
 import logging
-from openai import OpenAI  # Імпорт OpenAI клієнта
+import time
+from openai import AsyncOpenAI  # Асинхронний OpenAI клієнт, не блокує event loop
+
+from configuration import BOUQUET_SCHEMA_ENUM_LIMIT, GPT_SETTINGS, RESPONSE_CACHE_SETTINGS
+from Services.CatalogCache import CatalogCache
+from Services.LLMResilience import CircuitOpenError, LLMResilience
+from Services.ResponseCache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
 class GPTService:
-    def __init__(self):
-        self.client = OpenAI(api_key="")  # Замініть на ваш API ключ
+    # Клієнт, семафор і стан стійкості (статистика затримок, circuit breaker) спільні для всіх екземплярів у процесі
+    _client = None
+    _semaphore = None
+    _resilience = None
+
+    # Області кешу відповідей, що залежать від вмісту каталогу: ключ включає версію каталогу
+    CATALOG_SCOPES = {'availability', 'bouquet_suggestions'}
+
+    # Класифікація, коли LLM недоступний і локальний класифікатор теж не впевнений
+    FALLBACK_CLASSIFICATION = {'classification': 10, 'additional_info': ''}
+    FALLBACK_REPLY = "Вибачте, щось пішло не так. Спробуйте пізніше."
+    # Відповіді без LLM для типових категорій, поки провайдер недоступний
+    LOCAL_REPLIES = {
+        "1": "Добрий день! 🌸 Раді вітати вас у магазині квітів 'Квітка'. Чим можемо допомогти? 💐",
+        "3": "Залюбки допоможемо! 🌷 Напишіть 'Що у вас є?', щоб переглянути асортимент, або опишіть, що шукаєте 💐",
+        "6": "Ми доставляємо квіти по місту 🚚 Вартість і час доставки порахуємо під час оформлення замовлення 🌸",
+        "11": "Залюбки допоможемо з вибором! 🌷 Напишіть 'Що у вас є?', щоб переглянути асортимент квітів 💐",
+        "12": "Ви можете самі описати букет, який вам потрібен, або попросити нас підібрати варіанти 💐🌸",
+    }
+
+    def __init__(self, redis_client=None):
+        if GPTService._client is None:
+            GPTService._client = AsyncOpenAI(
+                api_key=GPT_SETTINGS['api_key'],
+                base_url=GPT_SETTINGS['base_url'],
+                timeout=GPT_SETTINGS['timeout'],
+                max_retries=0,
+            )
+            GPTService._semaphore = asyncio.Semaphore(GPT_SETTINGS['max_concurrency'])
+            GPTService._resilience = LLMResilience()
+        self.client = GPTService._client
+        self.semaphore = GPTService._semaphore
+        self.resilience = GPTService._resilience
+        self.model = GPT_SETTINGS['model']
+        self.timeout = GPT_SETTINGS['timeout']
+        self.response_cache = ResponseCache(redis_client) if redis_client is not None else None
+
+    @classmethod
+    async def close(cls):
+        """Закриває спільний HTTP клієнт LLM. Викликається при завершенні роботи бота."""
+        if cls._client is not None:
+            logger.info(f"LLM client closed. Resilience metrics: {cls._resilience.snapshot()}")
+            await cls._client.close()
+            cls._client = None
+            cls._semaphore = None
+            cls._resilience = None
+
+    @classmethod
+    def resilience_snapshot(cls) -> dict:
+        return cls._resilience.snapshot() if cls._resilience is not None else {}
+
+    def _cache_key(self, prompt: str, cache_scope: str = None, cache_text: str = None):
+        if not cache_scope or self.response_cache is None:
+            return None
+        catalog_version = CatalogCache.version if cache_scope in self.CATALOG_SCOPES else ''
+        return self.response_cache.make_key(cache_scope, self.model, cache_text or prompt, catalog_version)
+
+    async def _complete(self, prompt: str, timeout: float = None, cache_scope: str = None, cache_text: str = None,
+                        response_format: dict = None, kind: str = 'default') -> str:
+        """
+        Виконує запит до LLM з обмеженням кількості одночасних викликів через LLMResilience:
+        дедлайн, повтори, дублюючий запит і circuit breaker.
+        Скасування задачі (CancelledError) не перехоплюється і скасовує HTTP запит.
+        :param timeout: Загальний дедлайн разом з повторами; за замовчуванням - дедлайн для kind.
+        :param kind: Тип запиту (classify, structured...) для дедлайну і статистики затримок.
+        :param response_format: Формат відповіді (наприклад, JSON schema для структурованої відповіді).
+        :param cache_scope: Область кешу відповідей; передається лише для промптів без контексту розмови.
+        :param cache_text: Текст, за яким формується ключ кешу (за замовчуванням - сам промпт).
+        """
+        cache_key = self._cache_key(prompt, cache_scope, cache_text)
+        if cache_key is not None:
+            cached = await self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        options = {'response_format': response_format} if response_format else {}
+
+        def request():
+            return self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                **options,
+            )
+
+        # Слот семафора - один на логічний виклик: дублюючий запит не займає другий слот,
+        # а час у черзі не з'їдає дедлайн і не потрапляє у статистику затримок для p95
+        async with self.semaphore:
+            response = await self.resilience.call(request, kind=kind, deadline=timeout)
+        content = response.choices[0].message.content
+
+        if cache_key is not None and content:
+            tokens = response.usage.total_tokens if response.usage else 0
+            await self.response_cache.set(cache_key, content, time.perf_counter() - started, tokens)
+        return content
+
+    async def _stream(self, prompt: str, cache_scope: str = None, cache_text: str = None):
+        """
+        Асинхронний генератор частин відповіді LLM (stream=True) для поступового показу користувачу.
+        Запит на потік виконується з дедлайном і повторами (без дублювання); далі таймаут діє
+        на очікування кожної наступної частини, а не на всю генерацію.
+        Відповідь із кешу віддається однією частиною; повна відповідь кешується лише після завершення потоку.
+        """
+        cache_key = self._cache_key(prompt, cache_scope, cache_text)
+        if cache_key is not None:
+            cached = await self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        started = time.perf_counter()
+        parts = []
+        tokens = 0
+        async with self.semaphore:
+            stream = await self.resilience.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    stream=True,
+                    stream_options={'include_usage': True},
+                ),
+                kind='stream',
+                hedge=False,
+            )
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), timeout=self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    if chunk.usage:
+                        tokens = chunk.usage.total_tokens
+                    content = chunk.choices[0].delta.content if chunk.choices else None
+                    if content:
+                        parts.append(content)
+                        yield content
+            except Exception as e:
+                # Обрив посередині потоку теж свідчить про проблеми провайдера
+                self.resilience.record_failure(e)
+                raise
+            finally:
+                await stream.close()
+
+        if cache_key is not None and parts:
+            await self.response_cache.set(cache_key, ''.join(parts), time.perf_counter() - started, tokens)
+
+    async def _stream_or_fallback(self, prompt: str, action: str, fallback: str = None, **cache_options):
+        """
+        Потік відповіді з обробкою помилок: якщо LLM не відповів зовсім, віддає fallback (якщо він заданий).
+        Якщо потік обірвався посередині, користувач лишається з уже показаною частиною.
+        """
+        produced = False
+        try:
+            async for chunk in self._stream(prompt, **cache_options):
+                produced = True
+                yield chunk
+            return
+        except CircuitOpenError:
+            logger.warning(f"LLM circuit breaker is open, skipped {action}")
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out while {action}")
+        except Exception as e:
+            logger.error(f"Error while {action}: {e}")
+        if not produced and fallback:
+            yield fallback
 
-    async def gpt_classify_intent(self, text: str, stage: str) -> str:
+    async def gpt_classify_intent(self, text: str, stage: str, fallback=None) -> str:
         """
         Відправляє запит до GPT моделі для класифікації тексту повідомлення.
+        Завжди повертає JSON: якщо LLM недоступний - результат fallback() (наприклад, локального класифікатора),
+        а без нього - категорію 10 (Інше).
         """
         prompt = (
             f"Ви продовжуєте розмову на стадії: {stage}. "
@@ -37,24 +210,28 @@ class GPTService:
         )
 
         try:
-            response = self.client.chat.completions.with_raw_response.create(
-                model="gpt-4o-mini",
-                messages=[{
-                    "role": "user",
-                    "content": prompt,
-                }]
-            )
-            logger.info(response.parse().choices[0].message.content)
-            return response.parse().choices[0].message.content
+            # Класифікація залежить лише від тексту і стадії розмови
+            content = await self._complete(prompt, cache_scope='classify', cache_text=f"{stage}|{text}",
+                                           kind='classify')
+            logger.info(content)
+            return content
 
+        except CircuitOpenError:
+            logger.warning("LLM circuit breaker is open, classifying message locally")
+        except asyncio.TimeoutError:
+            logger.error("Timed out while classifying message")
         except Exception as e:
             logger.error(f"Error while classifying message: {e}")
-            return "10"  # Інші випадки
 
-    async def gpt_generate_reply(self, text: str, classification: str, stage: str) -> str:
+        result = fallback() if fallback else None
+        return json.dumps(result or self.FALLBACK_CLASSIFICATION, ensure_ascii=False)
+
+    async def gpt_generate_reply(self, text: str, classification: str, stage: str):
         """
         Генерує відповідь від імені магазину "Квітка" на основі класифікації GPT.
         Відповідь має бути українською мовою без форматування в стилі GPT і з використанням емоджі.
+        Повертає асинхронний генератор частин відповіді (показується через Services/MessageStream.py).
+        Якщо LLM недоступний, віддає заготовлену відповідь для категорії.
         """
         if classification == "1":  # Привітання, тільки на початку діалогу
             prompt = (
@@ -113,39 +290,118 @@ class GPTService:
                 f"Додай емоджі, щоб покращити взаємодію."
             )
 
-        try:
-            response = self.client.chat.completions.with_raw_response.create(
-                model="gpt-4o-mini",
-                messages=[{
-                    "role": "user",
-                    "content": prompt,
-                }]
-            )
-
-            return response.parse().choices[0].message.content
-
-        except Exception as e:
-            logger.error(f"Error while generating reply: {e}")
-            return "Вибачте, щось пішло не так. Спробуйте пізніше."
+        # Промпт відповіді не містить тексту користувача, тож для типових категорій її можна перевикористати
+        cache_options = {}
+        if classification in RESPONSE_CACHE_SETTINGS['reply_classifications']:
+            cache_options = {'cache_scope': 'reply', 'cache_text': classification}
+        fallback = self.LOCAL_REPLIES.get(classification, self.FALLBACK_REPLY)
+        async for chunk in self._stream_or_fallback(prompt, "generating reply", fallback, **cache_options):
+            yield chunk
 
-    async def send_to_gpt(self, prompt: str) -> str:
+    async def send_to_gpt(self, prompt: str, cache_scope: str = None, cache_text: str = None) -> str:
         """
         Відправляє промпт до GPT моделі для отримання відповіді про наявність квітки.
+        cache_scope передається лише для промптів, що не залежать від контексту розмови.
         """
         try:
-            response = self.client.chat.completions.with_raw_response.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            # Розбираємо відповідь для отримання детальної інформації
-            content = response.parse().choices[0].message.content
+            content = await self._complete(prompt, cache_scope=cache_scope, cache_text=cache_text)
             logger.info(f"GPT response: {content}")
 
             return content  # Повертаємо не розпарсений контент для подальшої обробки
 
+        except CircuitOpenError:
+            logger.warning("LLM circuit breaker is open, skipped prompt")
+            return None
+        except asyncio.TimeoutError:
+            logger.error("Timed out while sending prompt to GPT")
+            return None
         except Exception as e:
             logger.error(f"Error while sending prompt to GPT: {e}")
             return None
 
+    def stream_to_gpt(self, prompt: str, cache_scope: str = None, cache_text: str = None):
+        """
+        Як send_to_gpt, але повертає асинхронний генератор частин відповіді.
+        Якщо LLM недоступний, генератор нічого не віддає.
+        """
+        return self._stream_or_fallback(prompt, "streaming prompt to GPT", cache_scope=cache_scope,
+                                        cache_text=cache_text)
+
+    @staticmethod
+    def bouquet_schema(flower_names: list) -> dict:
+        """
+        JSON schema складу букета для структурованої відповіді.
+        Для невеликого каталогу назви обмежуються переліком (enum), тож модель не може вигадати квітку.
+        """
+        name_schema = {"type": "string"}
+        if len(flower_names) <= BOUQUET_SCHEMA_ENUM_LIMIT:
+            name_schema["enum"] = list(flower_names)
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "bouquet",
+                "strict": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "items": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "name": name_schema,
+                                    "quantity": {"type": "integer"},
+                                },
+                                "required": ["name", "quantity"],
+                                "additionalProperties": False,
+                            },
+                        },
+                    },
+                    "required": ["items"],
+                    "additionalProperties": False,
+                },
+            },
+        }
+
+    async def extract_bouquet_items(self, request: str, flower_names: list, bouquet_options: str = None):
+        """
+        Визначає склад букета одним структурованим викликом LLM.
+        :param request: Опис букета або вибір користувача серед запропонованих варіантів.
+        :param bouquet_options: Раніше запропоновані варіанти букетів, якщо користувач обирає з них.
+        :return: Список {"name", "quantity"} з додатною кількістю, або None, якщо відповіді немає.
+        """
+        if bouquet_options:
+            prompt = (
+                f"Раніше користувачу запропонували такі варіанти букетів: {bouquet_options}. "
+                f"Користувач відповів: '{request}'. Визнач, який букет він обрав, і поверни його склад."
+            )
+        else:
+            prompt = f"Користувач описав букет, який хоче купити: '{request}'. Поверни склад цього букета."
+        prompt += (
+            " Кожна квітка - окремий елемент з назвою з каталогу та кількістю штук. "
+            "Якщо кількість не вказана, обери доречну для букета. "
+            f"Каталог квітів: {', '.join(flower_names)}."
+        )
+
+        try:
+            content = await self._complete(prompt, response_format=self.bouquet_schema(flower_names),
+                                           kind='structured')
+            logger.info(f"Structured bouquet response: {content}")
+            items = json.loads(content)['items']
+        except CircuitOpenError:
+            logger.warning("LLM circuit breaker is open, skipped bouquet extraction")
+            return None
+        except asyncio.TimeoutError:
+            logger.error("Timed out while extracting bouquet items")
+            return None
+        except Exception as e:
+            logger.error(f"Error while extracting bouquet items: {e}")
+            return None
 
+        # Схема гарантує форму відповіді, але не змістовні обмеження - їх перевіряємо тут
+        return [
+            {'name': item['name'].strip(), 'quantity': item['quantity']}
+            for item in items
+            if isinstance(item, dict) and isinstance(item.get('name'), str) and item['name'].strip()
+            and isinstance(item.get('quantity'), int) and item['quantity'] > 0
+        ]
@@ -5,33 +5,57 @@ from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 from .FlowerCatalogHandler import FlowerCatalogHandler, BouquetOrderStates
 from .GPTService import GPTService
+from configuration import INTENT_FALLBACK_THRESHOLD
+from Services.IntentClassifier import IntentClassifier
+from Services.MessageStream import stream_answer
 
 logger = logging.getLogger(__name__)
 
 
 class IntentClassifyHandler:
-    def __init__(self, bot, dp):
+    def __init__(self, bot, dp, redis_client):
         self.bot = bot
         self.dp = dp
         self.router = Router()
         self.dp.include_router(self.router)
 
         # Ініціалізація сервісів
-        self.flower_catalog_handler = FlowerCatalogHandler()
-        self.gpt_service = GPTService()
+        self.flower_catalog_handler = FlowerCatalogHandler(redis_client)
+        self.gpt_service = GPTService(redis_client)
+        self.intent_classifier = IntentClassifier()
 
         # Реєстрація хендлерів
-        self.router.message.register(self.intent_classify_handler, F.text)
+        # Прапорець llm: хендлер потрапляє під загальний ліміт одночасних викликів LLM (Services/ChatQueue.py)
+        self.router.message.register(self.intent_classify_handler, F.text, flags={'llm': True})
         self.router.callback_query.register(self.flower_catalog_handler.paginate_flowers,
                                             F.data.startswith("flowers_page_"))
         self.router.callback_query.register(self.flower_catalog_handler.flower_info_handler,
                                             F.data.startswith("flower_info_"))
 
-    async def intent_classify_handler(self, message: types.Message, state: FSMContext):
+    @staticmethod
+    def parse_classification(response: str) -> dict:
+        """
+        Розбирає JSON класифікації від LLM. Модель може обгорнути JSON у ```json або повернути щось інше -
+        тоді повідомлення вважається категорією 10 (Інше), а не падає хендлер.
+        """
+        text = (response or '').strip()
+        if text.startswith('```'):
+            text = text.strip('`').removeprefix('json').strip()
+        try:
+            result = json.loads(text)
+        except ValueError:
+            result = None
+        if not isinstance(result, dict) or 'classification' not in result:
+            logger.warning(f"Unexpected classification response: {response!r}")
+            return dict(GPTService.FALLBACK_CLASSIFICATION)
+        return result
+
+    async def intent_classify_handler(self, message: types.Message, state: FSMContext, coalesced_text: str = None):
         """
         Обробник для текстових повідомлень, що використовує GPT для класифікації та відповіді.
+        coalesced_text - серія повідомлень, об'єднана ChatQueueMiddleware, класифікується як одне.
         """
-        user_message = message.text
+        user_message = coalesced_text or message.text
         logger.info(f"User {message.from_user.id} sent message: {user_message}")
 
         # Отримання поточного стану FSM
@@ -55,13 +79,24 @@ class IntentClassifyHandler:
             await self.flower_catalog_handler.confirm_purchase(message, state)
             return
 
+        # Якщо користувач знаходиться в стані введення адреси доставки
+        if current_state == BouquetOrderStates.waiting_for_delivery_address.state:
+            await self.flower_catalog_handler.handle_delivery_address(message, state)
+            return
+
         # Якщо користувач не знаходиться в специфічному стані - продовжуємо з GPT
         dialog_data = await state.get_data()
         stage = dialog_data.get('dialog_stage', 'initial')
 
-        # Класифікація повідомлення через GPT
-        response = await self.gpt_service.gpt_classify_intent(user_message, stage)
-        response_dict = json.loads(response)
+        # Спершу локальний класифікатор; GPT - лише коли він не впевнений
+        response_dict = self.intent_classifier.classify(user_message, stage)
+        if response_dict is None:
+            # Якщо LLM недоступний - найімовірніша категорія локального класифікатора з нижчим порогом
+            response = await self.gpt_service.gpt_classify_intent(
+                user_message, stage,
+                fallback=lambda: self.intent_classifier.classify(user_message, stage, INTENT_FALLBACK_THRESHOLD),
+            )
+            response_dict = self.parse_classification(response)
 
         classification = str(response_dict.get('classification'))
         additional_info = response_dict.get('additional_info')
@@ -79,9 +114,8 @@ class IntentClassifyHandler:
         elif classification == "14":  # Користувач хоче сам зібрати букет
             await self.flower_catalog_handler.custom_bouquet_creation(message, state)
         else:
-            # Генерація відповіді через GPT
-            response = await self.gpt_service.gpt_generate_reply(user_message, classification, stage)
-            await message.answer(response)
+            # Генерація відповіді через GPT: текст показується по мірі генерації
+            await stream_answer(message, self.gpt_service.gpt_generate_reply(user_message, classification, stage))
 
         # Оновлюємо стан для наступного етапу
         await state.update_data(
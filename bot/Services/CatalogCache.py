@@ -0,0 +1,185 @@
+import asyncio
+import json
+import logging
+import time
+
+from configuration import CATALOG_CACHE_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogCache:
+    """
+    Дворівневий кеш відповідей каталогу: пам'ять процесу + Redis, спільний для всіх процесів бота.
+
+    Записи свіжі протягом ttl; ще stale_ttl секунд після цього віддається старе значення,
+    а оновлення запускається у фоні (stale-while-revalidate). Бекенд при змінах у адмінці
+    збільшує catalog:version і публікує її в канал catalog:invalidate - після цього всі записи
+    попередньої версії ігноруються.
+    """
+
+    VERSION_KEY = 'catalog:version'
+    CHANNEL = 'catalog:invalidate'
+    KEY_PREFIX = 'catalog_cache:'
+
+    _redis = None
+    _listener = None
+    _local = {}  # Ключ -> (значення, час завантаження, версія каталогу)
+    _inflight = {}  # Ключ -> задача завантаження, щоб паралельні запити не дублювали HTTP виклики
+    _validators = {}  # Ключ -> (ETag, значення) для умовних запитів; переживає TTL та інвалідації
+    MAX_VALIDATORS = 1024
+    version = '0'
+    ttl = CATALOG_CACHE_SETTINGS['ttl']
+    stale_ttl = CATALOG_CACHE_SETTINGS['stale_ttl']
+    metrics = {'local_hits': 0, 'redis_hits': 0, 'misses': 0, 'stale_served': 0, 'refreshes': 0, 'invalidations': 0,
+               'not_modified': 0}
+
+    @classmethod
+    async def start(cls, redis_client):
+        """Підключає Redis і запускає слухача інвалідацій. Викликається при старті бота."""
+        cls._redis = redis_client
+        try:
+            cls.version = str(await redis_client.get(cls.VERSION_KEY) or '0')
+        except Exception as e:
+            logger.error(f"Failed to read catalog version: {e}")
+        cls._listener = asyncio.create_task(cls._listen())
+        logger.info(f"Catalog cache started, catalog version {cls.version}")
+
+    @classmethod
+    async def close(cls):
+        if cls._listener is not None:
+            cls._listener.cancel()
+            try:
+                await cls._listener
+            except asyncio.CancelledError:
+                pass
+            cls._listener = None
+        logger.info(f"Catalog cache closed. Metrics: {cls.metrics}")
+
+    @classmethod
+    async def _listen(cls):
+        """Слухає канал інвалідацій; при обриві з'єднання перепідписується."""
+        while True:
+            try:
+                pubsub = cls._redis.pubsub()
+                await pubsub.subscribe(cls.CHANNEL)
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        cls.invalidate(str(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Catalog invalidation listener failed: {e}")
+                await asyncio.sleep(5)
+
+    @classmethod
+    def invalidate(cls, version: str = None):
+        """Скидає локальний кеш. Нова версія робить недійсними і записи в Redis."""
+        if version is not None:
+            cls.version = version
+        cls._local.clear()
+        cls.metrics['invalidations'] += 1
+        logger.info(f"Catalog cache invalidated, catalog version {cls.version}")
+
+    @classmethod
+    def _redis_key(cls, key: str) -> str:
+        return f"{cls.KEY_PREFIX}{cls.version}:{key}"
+
+    @classmethod
+    async def get(cls, key: str, loader, decode=None):
+        """
+        Повертає значення з кешу або завантажує його через loader().
+        Порожні значення (None, {}, []) вважаються помилкою завантаження і не кешуються.
+        :param decode: Перетворює JSON значення на об'єкт (наприклад, FlowerPage). У Redis зберігається JSON,
+                       а в пам'яті процесу - вже перетворений незмінний об'єкт, тож попадання в кеш нічого не створюють.
+        """
+        entry = cls._local.get(key)
+        source = 'local_hits'
+
+        if entry is None and cls._redis is not None:
+            try:
+                cached = await cls._redis.get(cls._redis_key(key))
+            except Exception as e:
+                logger.error(f"Failed to read catalog cache '{key}': {e}")
+                cached = None
+            if cached:
+                cached = json.loads(cached)
+                value = decode(cached['value']) if decode else cached['value']
+                entry = (value, cached['fetched_at'], cls.version)
+                cls._local[key] = entry
+                source = 'redis_hits'
+
+        if entry is not None and entry[2] == cls.version:
+            age = time.time() - entry[1]
+            if age < cls.ttl:
+                cls.metrics[source] += 1
+                return entry[0]
+            if age < cls.ttl + cls.stale_ttl:
+                # Віддаємо застаріле значення одразу, а свіже завантажуємо у фоні
+                cls.metrics['stale_served'] += 1
+                cls._load(key, loader, decode)
+                return entry[0]
+
+        cls.metrics['misses'] += 1
+        return await cls._load(key, loader, decode)
+
+    @classmethod
+    def _load(cls, key: str, loader, decode=None) -> asyncio.Task:
+        task = cls._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(cls._refresh(key, loader, decode))
+            cls._inflight[key] = task
+            task.add_done_callback(lambda _: cls._inflight.pop(key, None))
+        return task
+
+    @classmethod
+    async def _refresh(cls, key: str, loader, decode=None):
+        version = cls.version
+        try:
+            raw = await loader()
+        except Exception as e:
+            logger.error(f"Failed to load catalog data '{key}': {e}")
+            return None
+        cls.metrics['refreshes'] += 1
+        if not raw:
+            # Не кешуємо помилки
+            return None if decode else raw
+        value = decode(raw) if decode else raw
+        if version != cls.version:
+            # Не кешуємо дані, завантажені до інвалідації
+            return value
+
+        fetched_at = time.time()
+        cls._local[key] = (value, fetched_at, version)
+        if cls._redis is not None:
+            try:
+                await cls._redis.set(
+                    cls._redis_key(key),
+                    json.dumps({'value': raw, 'fetched_at': fetched_at}, ensure_ascii=False),
+                    ex=int(cls.ttl + cls.stale_ttl),
+                )
+            except Exception as e:
+                logger.error(f"Failed to store catalog cache '{key}': {e}")
+        return value
+
+    @classmethod
+    def conditional_headers(cls, key: str) -> dict:
+        """Заголовок If-None-Match для повторного завантаження, якщо відома версія відповіді."""
+        validator = cls._validators.get(key)
+        return {'If-None-Match': validator[0]} if validator else {}
+
+    @classmethod
+    def remember(cls, key: str, etag: str, value):
+        """Запам'ятовує ETag відповіді, щоб наступне завантаження було умовним запитом."""
+        if not etag or not value:
+            return
+        if len(cls._validators) >= cls.MAX_VALIDATORS and key not in cls._validators:
+            cls._validators.pop(next(iter(cls._validators)))
+        cls._validators[key] = (etag, value)
+
+    @classmethod
+    def not_modified(cls, key: str):
+        """Відповідь 304: дані не змінились, повертаємо збережене значення без повторного розбору тіла."""
+        cls.metrics['not_modified'] += 1
+        validator = cls._validators.get(key)
+        return validator[1] if validator else None
@@ -0,0 +1,209 @@
+import asyncio
+import collections
+import contextlib
+import logging
+import time
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+
+from configuration import CHAT_QUEUE_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+class WaitMetrics:
+    """Глибина черги і час очікування: лічильники та перцентилі останніх значень"""
+
+    def __init__(self, samples: int = CHAT_QUEUE_SETTINGS['wait_samples']):
+        self.waiting = 0
+        self.max_waiting = 0
+        self.in_progress = 0
+        self.processed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent = collections.deque(maxlen=samples)
+
+    def enter(self):
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def leave(self, wait: float = None):
+        """Кінець очікування; wait = None, якщо оновлення скасували в черзі."""
+        self.waiting -= 1
+        if wait is not None:
+            self.processed += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent.append(wait)
+
+    def snapshot(self) -> dict:
+        recent = sorted(self._recent)
+
+        def percentile(fraction):
+            return recent[min(len(recent) - 1, int(len(recent) * fraction))] * 1000 if recent else 0.0
+
+        return {
+            'waiting': self.waiting,
+            'max_waiting': self.max_waiting,
+            'in_progress': self.in_progress,
+            'processed': self.processed,
+            'avg_wait_ms': self.total_wait / self.processed * 1000 if self.processed else 0.0,
+            'p50_wait_ms': percentile(0.5),
+            'p95_wait_ms': percentile(0.95),
+            'max_wait_ms': self.max_wait * 1000,
+        }
+
+
+class _ChatSlot:
+    def __init__(self):
+        self.lock = asyncio.Lock()  # FIFO: оновлення чату обробляються в порядку надходження
+        self.users = 0  # Оновлення цього чату в черзі і в обробці
+        self.pending = []  # (update_id, текст) повідомлень, які ще не класифіковані
+
+
+class ChatQueueMiddleware(BaseMiddleware):
+    """
+    Зовнішній middleware оновлень: одночасно обробляється лише одне оновлення чату, різні чати - паралельно.
+
+    Без цього швидкі повідомлення одного користувача обробляються конкурентно і перезаписують один одному
+    стан у RedisStorage. Текстові повідомлення, які накопичились, поки чат був зайнятий, об'єднуються:
+    перше з них отримує весь текст у coalesced_text, решта пропускаються. У стані FSM (вибір букета,
+    підтвердження) повідомлення не об'єднуються - кожне є відповіддю на окреме питання.
+    """
+
+    LOCK_PREFIX = 'chat_lock:'
+    metrics = WaitMetrics()
+    counters = {'coalesced': 0, 'lock_timeouts': 0}
+
+    def __init__(self, redis_client=None, settings: dict = CHAT_QUEUE_SETTINGS):
+        self.settings = settings
+        # Між процесами порядок забезпечує Redis lock; в межах процесу - локальна черга
+        self.redis = redis_client if settings['distributed_lock'] else None
+        self._chats = {}
+
+    async def __call__(self, handler, event, data):
+        chat = data.get('event_chat')
+        if chat is None:
+            return await handler(event, data)
+
+        slot = self._chats.get(chat.id)
+        if slot is None:
+            slot = self._chats[chat.id] = _ChatSlot()
+        entry = None
+        message = getattr(event, 'message', None)
+        if self.settings['coalesce'] and message is not None and message.text:
+            entry = (event.update_id, message.text)
+            slot.pending.append(entry)
+
+        slot.users += 1
+        self.metrics.enter()
+        queued_at = time.monotonic()
+        acquired = False
+        try:
+            await slot.lock.acquire()
+            acquired = True
+            self.metrics.leave(time.monotonic() - queued_at)
+
+            if entry is not None:
+                if entry not in slot.pending:
+                    # Текст уже оброблено разом з попереднім повідомленням
+                    self.counters['coalesced'] += 1
+                    return None
+                data['coalesced_text'] = await self._take_burst(slot, entry, data.get('state'))
+
+            self.metrics.in_progress += 1
+            try:
+                async with self._cross_process_lock(chat.id):
+                    return await handler(event, data)
+            finally:
+                self.metrics.in_progress -= 1
+        finally:
+            if acquired:
+                slot.lock.release()
+            else:
+                self.metrics.leave()
+                if entry in slot.pending:
+                    slot.pending.remove(entry)
+            slot.users -= 1
+            if slot.users == 0:
+                del self._chats[chat.id]
+
+    async def _take_burst(self, slot: _ChatSlot, entry: tuple, state) -> str:
+        """Забирає з черги це повідомлення і, поза станами FSM, ті, що прийшли після нього."""
+        index = slot.pending.index(entry)
+        count = 1
+        if state is not None and await state.get_state() is None:
+            count = self.settings['max_coalesced']
+        burst = slot.pending[index:index + count]
+        del slot.pending[index:index + count]
+        if len(burst) > 1:
+            logger.info(f"Coalesced {len(burst)} messages into one update")
+        return "\n".join(text for _, text in burst)
+
+    @contextlib.asynccontextmanager
+    async def _cross_process_lock(self, chat_id: int):
+        if self.redis is None:
+            yield
+            return
+
+        lock = self.redis.lock(f"{self.LOCK_PREFIX}{chat_id}", timeout=self.settings['lock_timeout'],
+                               blocking_timeout=self.settings['lock_wait'])
+        acquired = False
+        try:
+            acquired = await lock.acquire()
+        except Exception as e:
+            logger.error(f"Failed to acquire chat lock for {chat_id}: {e}")
+        if not acquired:
+            # Краще обробити оновлення без lock, ніж загубити його
+            self.counters['lock_timeouts'] += 1
+            logger.warning(f"Processing chat {chat_id} without cross-process lock")
+        try:
+            yield
+        finally:
+            if acquired:
+                try:
+                    await lock.release()
+                except Exception as e:
+                    logger.warning(f"Failed to release chat lock for {chat_id}: {e}")
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        return {**cls.metrics.snapshot(), **cls.counters}
+
+
+class LLMConcurrencyMiddleware(BaseMiddleware):
+    """
+    Внутрішній middleware: обмежує кількість хендлерів з прапорцем {'llm': True}, що виконуються одночасно.
+    Решта чекає в черзі, а не відкриває сотні паралельних запитів до LLM під піковим навантаженням.
+    """
+
+    metrics = WaitMetrics()
+
+    def __init__(self, limit: int = CHAT_QUEUE_SETTINGS['llm_concurrency']):
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def __call__(self, handler, event, data):
+        if not get_flag(data, 'llm'):
+            return await handler(event, data)
+
+        self.metrics.enter()
+        queued_at = time.monotonic()
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            self.metrics.leave()
+            raise
+        self.metrics.leave(time.monotonic() - queued_at)
+
+        self.metrics.in_progress += 1
+        try:
+            return await handler(event, data)
+        finally:
+            self.metrics.in_progress -= 1
+            self._semaphore.release()
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        return cls.metrics.snapshot()
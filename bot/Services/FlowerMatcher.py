@@ -0,0 +1,168 @@
+import re
+
+# Закінчення відмінків і множини, від найдовших до найкоротших
+ENDINGS = sorted([
+    'ами', 'ями', 'ові', 'еві', 'ого', 'ому', 'ими', 'ією', 'ію', 'ія', 'ії', 'ій', 'ея', 'еї', 'ею', 'ей',
+    'ої', 'ою', 'ів', 'їв', 'ах', 'ях', 'ам', 'ям', 'ом', 'ем', 'их', 'им', 'ий',
+    'а', 'я', 'и', 'і', 'ї', 'у', 'ю', 'о', 'е', 'ь', 'й',
+], key=len, reverse=True)
+
+# Основи кольорів після стемінгу
+COLOR_STEMS = (
+    'червон', 'біл', 'жовт', 'рожев', 'син', 'фіолетов', 'помаранчев', 'оранжев', 'кремов', 'бордов',
+    'блакитн', 'зелен', 'чорн', 'бузков', 'персиков', 'пурпуров', 'лілов', 'малинов', 'багрян',
+)
+
+# Слова запиту, які не є назвою квітки
+STOP_WORDS = {
+    'у', 'в', 'вас', 'є', 'чи', 'а', 'і', 'й', 'та', 'з', 'із', 'на', 'по', 'до', 'для', 'мені', 'мене', 'нас',
+    'наявності', 'наявность', 'продаєте', 'продаються', 'маєте', 'бувають', 'сьогодні', 'зараз', 'будь', 'ласка',
+    'квіти', 'квітка', 'квітів', 'квіточки', 'букет', 'хочу', 'потрібні', 'потрібна', 'треба', 'які', 'який',
+    'яка', 'щось', 'ще', 'теж', 'також', 'штук', 'шт',
+}
+
+MIN_STEM_LENGTH = 3
+
+
+def normalize(text: str) -> str:
+    text = text.casefold().replace('’', "'").replace('ʼ', "'").replace('`', "'").replace('ё', 'е')
+    # Типові описки транслітерацією: "тройанда" -> "троянда"
+    text = text.replace('йа', 'я').replace('йу', 'ю').replace('йе', 'є')
+    return re.sub(r"[^\w\s']|\d|_", ' ', text)
+
+
+def stem(word: str) -> str:
+    """Легкий стемер для української: відкидає одне закінчення відмінка чи множини."""
+    word = word.replace("'", '')
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+            return word[:-len(ending)]
+    return word
+
+
+def is_color(token: str) -> bool:
+    return token.startswith(COLOR_STEMS)
+
+
+def trigrams(token: str) -> set:
+    padded = f" {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(query_token: str, token: str) -> float:
+    """Схожість основ: 1 - відстань Левенштейна / довжина; префікс запиту вважається сильним збігом."""
+    if query_token == token:
+        return 1.0
+    if len(query_token) >= 4 and token.startswith(query_token):
+        return 0.9
+
+    previous = list(range(len(token) + 1))
+    for i, query_char in enumerate(query_token, 1):
+        current = [i]
+        for j, char in enumerate(token, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (query_char != char)))
+        previous = current
+    return 1.0 - previous[-1] / max(len(query_token), len(token))
+
+
+class FlowerMatcher:
+    """
+    Локальний пошук квіток каталогу за запитом користувача з урахуванням відмінків, кольорів і описок.
+
+    Індекс: символьні 3-грами -> основи слів -> назви квіток. Кандидати беруться з 3-грамного індексу,
+    тому час пошуку залежить від кількості схожих основ, а не від розміру каталогу.
+    """
+
+    def __init__(self, names: list, confident: float = 0.75, ambiguous: float = 0.6):
+        self.names = list(names)
+        self.confident = confident
+        self.ambiguous = ambiguous
+
+        self.tokens = []  # Основи слів з усіх назв
+        token_ids = {}
+        self.token_names = []  # Основа -> індекси назв, де вона зустрічається
+        self.name_colors = []  # Назва -> основи кольорів у ній
+        self.trigram_tokens = {}  # 3-грама -> основи, що її містять
+
+        for name_index, name in enumerate(self.names):
+            colors = set()
+            for token in {stem(word) for word in normalize(name).split()}:
+                if is_color(token):
+                    colors.add(token)
+                token_id = token_ids.get(token)
+                if token_id is None:
+                    token_id = token_ids[token] = len(self.tokens)
+                    self.tokens.append(token)
+                    self.token_names.append([])
+                    for trigram in trigrams(token):
+                        self.trigram_tokens.setdefault(trigram, []).append(token_id)
+                self.token_names[token_id].append(name_index)
+            self.name_colors.append(colors)
+
+    def _similar_tokens(self, query_token: str) -> dict:
+        """Повертає основи каталогу, схожі на основу запиту: id -> схожість."""
+        candidates = set()
+        for trigram in trigrams(query_token):
+            candidates.update(self.trigram_tokens.get(trigram, ()))
+
+        similar = {}
+        for token_id in candidates:
+            score = similarity(query_token, self.tokens[token_id])
+            if score >= self.ambiguous:
+                similar[token_id] = score
+        return similar
+
+    def match(self, query: str, limit: int = 10):
+        """
+        Шукає квітки каталогу, що відповідають запиту.
+        :return: Список назв (можливо, порожній) або None, якщо запит неоднозначний і його варто віддати LLM.
+        """
+        query_tokens = [stem(word) for word in normalize(query).split() if word not in STOP_WORDS]
+        query_tokens = [token for token in query_tokens if len(token) >= 2]
+        if not query_tokens:
+            return None
+
+        query_colors = [token for token in query_tokens if is_color(token)]
+        query_nouns = [token for token in query_tokens if not is_color(token)] or query_colors
+
+        name_scores = {}  # Індекс назви -> (кількість знайдених слів запиту, сумарна схожість)
+        best_score = 0.0
+        for query_token in query_nouns:
+            per_name = {}
+            for token_id, score in self._similar_tokens(query_token).items():
+                best_score = max(best_score, score)
+                if score < self.confident:
+                    continue
+                for name_index in self.token_names[token_id]:
+                    if score > per_name.get(name_index, 0.0):
+                        per_name[name_index] = score
+            for name_index, score in per_name.items():
+                matched, total = name_scores.get(name_index, (0, 0.0))
+                name_scores[name_index] = (matched + 1, total + score)
+
+        if best_score < self.confident:
+            # Нічого схожого або лише слабкі збіги - нехай вирішує LLM
+            return None
+
+        color_matches = set()
+        if query_colors and query_nouns is not query_colors:
+            # Якщо користувач указав колір, квітки іншого кольору не підходять
+            for query_color in query_colors:
+                for token_id, score in self._similar_tokens(query_color).items():
+                    if score >= self.confident:
+                        color_matches.add(self.tokens[token_id])
+            name_scores = {
+                name_index: score for name_index, score in name_scores.items()
+                if not self.name_colors[name_index] or self.name_colors[name_index] & color_matches
+            }
+
+        # Спершу назви, де знайдено більше слів запиту, потім ті, де збігся колір, потім найкоротші
+        ranked = sorted(
+            name_scores.items(),
+            key=lambda item: (-item[1][0], not (self.name_colors[item[0]] & color_matches),
+                              -item[1][1], len(self.names[item[0]]))
+        )
+        if not ranked:
+            return []
+        most_matched = ranked[0][1][0]
+        return [self.names[name_index] for name_index, (matched, _) in ranked if matched == most_matched][:limit]
@@ -1,118 +1,320 @@
+import asyncio
 import logging
-from aiohttp import ClientSession
-from configuration import API_URLS
+from dataclasses import dataclass
+from typing import Optional
+
+from configuration import API_URLS, HTTP_SETTINGS, STATE_TTL
+from Services.CatalogCache import CatalogCache
+from Services.HttpClient import HttpClient
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True, slots=True)
+class Flower:
+    """Квітка каталогу. Поля, які не запитувались (fields=), лишаються None."""
+    id: int
+    name: str
+    photo: Optional[str] = None
+    quantity: Optional[int] = None
+    price: Optional[float] = None
+    description: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Flower':
+        return cls(
+            id=data.get('id'),
+            name=data.get('name'),
+            photo=data.get('photo'),
+            quantity=data.get('quantity'),
+            price=data.get('price'),
+            description=data.get('description'),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FlowerPage:
+    """Сторінка каталогу. Незмінна, тож один об'єкт з кешу безпечно віддається всім чатам."""
+    flowers: tuple
+    total_count: int
+    page: int
+    per_page: int
+    next_after_id: Optional[int] = None
+
+    @property
+    def total_pages(self) -> int:
+        """Розрахунок кількості сторінок для пагінації"""
+        if self.per_page <= 0:
+            return 0
+        return (self.total_count + self.per_page - 1) // self.per_page
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'FlowerPage':
+        return cls(
+            flowers=tuple(Flower.from_dict(flower) for flower in data.get('flowers', [])),
+            total_count=data.get('total_flowers', 0),
+            page=data.get('page', 1),
+            per_page=data.get('per_page', 0),
+            next_after_id=data.get('next_after_id'),
+        )
+
+
+def decode_flower(data: dict) -> Optional[Flower]:
+    return Flower.from_dict(data) if data else None
+
+
+def normalize_flower_name(name: str) -> str:
+    """Нормалізація назви так само, як на бекенді (back/models/flower.py): без регістру та зайвих пробілів."""
+    return ' '.join(name.split()).casefold()
+
+
 class FlowerService:
-    """Клас для отримання квіток з API, обробки відповідей та бізнес-логіки"""
+    """
+    Клас для отримання квіток з API, обробки відповідей та бізнес-логіки.
+    Не зберігає стану між викликами: один екземпляр безпечно використовується всіма чатами одночасно.
+    """
 
-    def __init__(self):
-        self.flowers = []
-        self.total_count = 0
+    __slots__ = ()
 
-    async def fetch_all_flowers(self, page: int, per_page: int) -> dict:
-        """Отримання всіх квіток з API з пагінацією"""
+    async def fetch_all_flowers(self, page: int, per_page: int, after_id: int = None,
+                                fields: tuple = None) -> Optional[FlowerPage]:
+        """
+        Отримання всіх квіток з API з пагінацією.
+        :param after_id: Курсор keyset пагінації (next_after_id з попередньої сторінки); якщо не вказано - пагінація за номером сторінки
+        :param fields: Поля квіток, які потрібні викликачу (наприклад, ('id', 'name')); за замовчуванням - усі
+        :return: Сторінка квіток або None, якщо отримати її не вдалося
+        """
         params = {'page': page, 'per_page': per_page}
+        if after_id is not None:
+            params['after_id'] = after_id
+        if fields:
+            params['fields'] = ','.join(fields)
+
+        cache_key = f"all_flowers:{page}:{per_page}:{after_id}:{params.get('fields', '')}"
+        return await CatalogCache.get(cache_key, lambda: self._request_all_flowers(params, cache_key),
+                                      decode=FlowerPage.from_dict)
 
-        async with ClientSession() as session:
-            async with session.get(API_URLS['all_flowers'], json=params) as response:
+    async def _request_all_flowers(self, params: dict, cache_key: str) -> dict:
+        page = params['page']
+        try:
+            session = HttpClient.session()
+            # Умовний запит: якщо каталог не змінився, бекенд відповідає 304 без тіла і без запиту до бази
+            async with session.get(API_URLS['all_flowers'], json=params,
+                                   headers=CatalogCache.conditional_headers(cache_key)) as response:
+                if response.status == 304:
+                    logger.info(f"Flowers on page {page} not modified")
+                    return CatalogCache.not_modified(cache_key)
                 response_text = await response.text()  # Отримуємо текстову відповідь від сервера
                 if response.status == 200:
                     logger.info(f"Successfully fetched flowers on page {page}. Response: {response_text}")
                     result = await response.json()  # Повертаємо результат у форматі JSON
-                    self.flowers = result.get('flowers', [])
-                    self.total_count = result.get('total_flowers', 0)
+                    CatalogCache.remember(cache_key, response.headers.get('ETag'), result)
                     return result
                 else:
                     logger.error(f"Failed to fetch flowers on page {page}. Status: {response.status}. Response: {response_text}")
                     return {}
+        except Exception as e:
+            logger.error(f"An error occurred while fetching flowers on page {page}: {e}")
+            return {}
 
-    async def get_flower_by_id(self, flower_id: int) -> dict:
+    async def get_flower_by_id(self, flower_id: int) -> Optional[Flower]:
         """
         Отримує квітку за її ID через API.
         :param flower_id: ID квітки
         :return: Квітка або None, якщо не знайдено
         """
+        # Картка квітки показує залишок на складі, тож вона не береться з кешу каталогу (stale-while-revalidate
+        # віддав би кількість до години давності, навіть після резерву цього ж бота) - це один запит за id
+        return decode_flower(await self._request_flower_by_id(flower_id))
+
+    async def _request_flower_by_id(self, flower_id: int) -> dict:
         try:
-            async with ClientSession() as session:
-                async with session.get(API_URLS['flower_by_id'], json={'id': flower_id}) as response:
-                    if response.status == 200:
-                        logger.info(f"Successfully fetched flower with ID '{flower_id}'")
-                        return await response.json()  # Повертаємо результат у форматі JSON
-                    else:
-                        logger.warning(f"Failed to fetch flower with ID '{flower_id}'. Status: {response.status}")
-                        return None
+            session = HttpClient.session()
+            async with session.get(API_URLS['flower_by_id'], json={'id': flower_id}) as response:
+                if response.status == 200:
+                    logger.info(f"Successfully fetched flower with ID '{flower_id}'")
+                    return await response.json()  # Повертаємо результат у форматі JSON
+                else:
+                    logger.warning(f"Failed to fetch flower with ID '{flower_id}'. Status: {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"An error occurred while fetching flower by ID: {e}")
             return None
 
-    async def get_total_pages(self, per_page: int) -> int:
-        """Розрахунок кількості сторінок для пагінації"""
-        if per_page <= 0:
-            return 0
-        return (self.total_count + per_page - 1) // per_page
-
-    async def fetch_flower_names(self) -> list:
+    async def fetch_flower_names(self) -> tuple:
         """Отримання лише імен всіх квіток"""
+        return await CatalogCache.get("flower_names", self._request_flower_names, decode=tuple) or ()
+
+    async def _request_flower_names(self) -> list:
         try:
-            async with ClientSession() as session:
-                async with session.get(API_URLS['flower_names']) as response:
-                    if response.status == 200:
-                        logger.info("Successfully fetched flower names")
-                        result = await response.json()
-                        flowers = result.get('flower_names', [])
-                        flower_names = [name for name in flowers]
-                        return flower_names
-                    else:
-                        logger.warning(f"Failed to fetch flower names. Status: {response.status}")
-                        return []
+            session = HttpClient.session()
+            async with session.get(API_URLS['flower_names'],
+                                   headers=CatalogCache.conditional_headers("flower_names")) as response:
+                if response.status == 304:
+                    logger.info("Flower names not modified")
+                    return CatalogCache.not_modified("flower_names")
+                if response.status == 200:
+                    logger.info("Successfully fetched flower names")
+                    result = await response.json()
+                    flower_names = result.get('flower_names', [])
+                    CatalogCache.remember("flower_names", response.headers.get('ETag'), flower_names)
+                    return flower_names
+                else:
+                    logger.warning(f"Failed to fetch flower names. Status: {response.status}")
+                    return []
         except Exception as e:
             logger.error(f"An error occurred while fetching flower names: {e}")
             return []
 
-    async def get_flower_by_name(self, name: str) -> dict:
+    async def get_flower_by_name(self, name: str) -> Optional[Flower]:
         """
         Отримує квітку за назвою через API.
         :param name: Назва квітки
         :return: Квітка або None, якщо не знайдено
         """
+        # Як і get_flower_by_id - з актуальним залишком, без кешу каталогу
+        return decode_flower(await self._request_flower_by_name(name))
+
+    async def _request_flower_by_name(self, name: str) -> dict:
         try:
-            async with ClientSession() as session:
-                async with session.get(API_URLS['flower_by_name'], json={'name': name}) as response:
-                    if response.status == 200:
-                        logger.info(f"Successfully fetched flower with name '{name}'")
-                        return await response.json()  # Повертаємо результат у форматі JSON
-                    else:
-                        logger.warning(f"Failed to fetch flower with name '{name}'. Status: {response.status}")
-                        return None
+            session = HttpClient.session()
+            async with session.get(API_URLS['flower_by_name'], json={'name': name}) as response:
+                if response.status == 200:
+                    logger.info(f"Successfully fetched flower with name '{name}'")
+                    return await response.json()  # Повертаємо результат у форматі JSON
+                else:
+                    logger.warning(f"Failed to fetch flower with name '{name}'. Status: {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"An error occurred while fetching flower by name: {e}")
             return None
 
-    def get_total_pages(self, per_page: int) -> int:
-        """Розрахунок кількості сторінок для пагінації"""
-        if per_page <= 0:
-            return 0
-        return (self.total_count + per_page - 1) // per_page
+    async def get_flowers_by_names(self, names: list) -> list[Flower]:
+        """
+        Отримує квітки за списком назв одним запитом до API.
+        Якщо пакетний запит не вдався, запитує квітки по одній паралельно з обмеженням кількості запитів.
+        :param names: Назви квіток
+        :return: Знайдені квітки в порядку запиту
+        """
+        flowers = await self._request_flowers_by_names(names)
+        if flowers is not None:
+            return flowers
 
-    async def calculate_flower_price(self, flowers: dict) -> dict:
+        semaphore = asyncio.Semaphore(HTTP_SETTINGS['fan_out_concurrency'])
+
+        async def fetch(name):
+            async with semaphore:
+                return await self.get_flower_by_name(name)
+
+        flowers = await asyncio.gather(*(fetch(name) for name in names))
+        return [flower for flower in flowers if flower]
+
+    async def _request_flowers_by_names(self, names: list):
+        try:
+            session = HttpClient.session()
+            async with session.get(API_URLS['flowers_by_names'], json={'names': names}) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    logger.info(f"Successfully fetched {len(result['flowers'])} flowers by names, missing: {result['missing']}")
+                    return [Flower.from_dict(flower) for flower in result['flowers']]
+                else:
+                    logger.warning(f"Failed to fetch flowers by names. Status: {response.status}")
+                    return None
+        except Exception as e:
+            logger.error(f"An error occurred while fetching flowers by names: {e}")
+            return None
+
+    async def quote_delivery(self, flowers: dict, address: str = None, weather: str = None) -> dict:
         """
-        Отримує розрахунок загальної вартості квітів за їх кількістю через API.
+        Розраховує вартість букета, доставки і час доставки одним запитом, без резервування квітів.
         :param flowers: Словник, де ключ - назва квітки, значення - кількість.
-        :return: Відповідь з загальною вартістю або повідомлення про помилку.
+        :param address: Адреса доставки; без неї бекенд рахує доставку за стандартною зоною.
+        :param weather: Поточна група погоди (clear, rain...) для розрахунку доставки.
+        :return: Відповідь з goods_total, delivery_fee, total і eta або повідомлення про помилку.
         """
+        payload = {'flowers': flowers, 'address': address, 'weather': weather}
         try:
-            async with ClientSession() as session:
-                async with session.get(API_URLS['flower_parse_calculator'], json={'flowers': flowers}) as response:
-                    if response.status == 200:
-                        logger.info("Successfully calculated flower price")
-                        return await response.json()  # Повертаємо результат у форматі JSON
-                    else:
-                        logger.warning(f"Failed to calculate flower price. Status: {response.status}")
-                        return {'error': f"Failed to calculate flower price. Status: {response.status}"}
+            session = HttpClient.session()
+            async with session.post(API_URLS['delivery_quote'], json=payload) as response:
+                result = await response.json()
+                if response.status == 200:
+                    logger.info(f"Successfully quoted delivery: {result['total']} ({result['zone']})")
+                    return result
+                else:
+                    logger.warning(f"Failed to quote delivery. Status: {response.status}. Response: {result}")
+                    return {
+                        'error': result.get('message', f"Failed to quote delivery. Status: {response.status}"),
+                        'missing': result.get('missing', []),
+                        'insufficient': result.get('insufficient', {}),
+                        'invalid': result.get('invalid', {}),
+                    }
         except Exception as e:
-            logger.error(f"An error occurred while calculating flower price: {e}")
+            logger.error(f"An error occurred while quoting delivery: {e}")
             return {'error': 'An error occurred while processing the request'}
 
+    async def reserve_bouquet(self, flowers: dict, address: str = None, weather: str = None) -> dict:
+        """
+        Резервує квіти букета на складі на час, поки користувач підтверджує покупку.
+        :param flowers: Словник, де ключ - назва квітки, значення - кількість.
+        :param address: Адреса доставки; без неї бекенд рахує доставку за стандартною зоною.
+        :param weather: Поточна група погоди (clear, rain...) для розрахунку доставки.
+        :return: Відповідь з reservation_id і розрахунком доставки (delivery) або повідомлення про помилку.
+        """
+        payload = {'flowers': flowers, 'ttl': STATE_TTL, 'address': address, 'weather': weather}
+        try:
+            session = HttpClient.session()
+            async with session.post(API_URLS['reservation'], json=payload) as response:
+                result = await response.json()
+                if response.status == 201:
+                    logger.info(f"Successfully reserved bouquet: {result['reservation_id']}")
+                    return result
+                else:
+                    logger.warning(f"Failed to reserve bouquet. Status: {response.status}. Response: {result}")
+                    return {
+                        'error': result.get('message', f"Failed to reserve bouquet. Status: {response.status}"),
+                        'missing': result.get('missing', []),
+                        'insufficient': result.get('insufficient', {}),
+                        'invalid': result.get('invalid', {}),
+                    }
+        except Exception as e:
+            logger.error(f"An error occurred while reserving bouquet: {e}")
+            return {'error': 'An error occurred while processing the request'}
 
+    async def confirm_reservation(self, reservation_id: str) -> dict:
+        """
+        Оформлює замовлення за резервом.
+        :param reservation_id: ID резерву
+        :return: Відповідь зі статусом замовлення або повідомлення про помилку.
+        """
+        try:
+            session = HttpClient.session()
+            async with session.put(API_URLS['reservation'], json={'reservation_id': reservation_id}) as response:
+                result = await response.json()
+                if response.status == 200:
+                    logger.info(f"Successfully confirmed reservation '{reservation_id}'")
+                    return result
+                else:
+                    logger.warning(f"Failed to confirm reservation '{reservation_id}'. Status: {response.status}")
+                    return {'error': result.get('message'), 'status': result.get('status')}
+        except Exception as e:
+            logger.error(f"An error occurred while confirming reservation: {e}")
+            return {'error': 'An error occurred while processing the request'}
+
+    async def cancel_reservation(self, reservation_id: str) -> bool:
+        """
+        Скасовує резерв і повертає квіти на склад.
+        :param reservation_id: ID резерву
+        :return: True, якщо резерв скасовано
+        """
+        try:
+            session = HttpClient.session()
+            async with session.delete(API_URLS['reservation'], json={'reservation_id': reservation_id}) as response:
+                if response.status == 200:
+                    logger.info(f"Successfully cancelled reservation '{reservation_id}'")
+                    return True
+                else:
+                    logger.warning(f"Failed to cancel reservation '{reservation_id}'. Status: {response.status}")
+                    return False
+        except Exception as e:
+            logger.error(f"An error occurred while cancelling reservation: {e}")
+            return False
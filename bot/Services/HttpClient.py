@@ -0,0 +1,119 @@
+import logging
+import time
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, TraceConfig
+
+from configuration import HTTP_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+class HttpMetrics:
+    """Лічильники повторного використання з'єднань і затримки запитів"""
+
+    def __init__(self):
+        self.requests = 0
+        self.failed_requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def snapshot(self) -> dict:
+        """Повертає поточні значення лічильників у вигляді словника"""
+        connections = self.connections_created + self.connections_reused
+        return {
+            'requests': self.requests,
+            'failed_requests': self.failed_requests,
+            'connections_created': self.connections_created,
+            'connections_reused': self.connections_reused,
+            'connection_reuse_ratio': self.connections_reused / connections if connections else 0.0,
+            'dns_cache_hits': self.dns_cache_hits,
+            'dns_cache_misses': self.dns_cache_misses,
+            'avg_latency_ms': self.total_latency / self.requests * 1000 if self.requests else 0.0,
+            'max_latency_ms': self.max_latency * 1000,
+        }
+
+    def trace_config(self) -> TraceConfig:
+        """Створює TraceConfig, який оновлює лічильники з подій aiohttp"""
+        trace_config = TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.started = time.perf_counter()
+
+        async def on_request_end(session, context, params):
+            latency = time.perf_counter() - context.started
+            self.requests += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+        async def on_request_exception(session, context, params):
+            self.failed_requests += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        async def on_dns_cache_hit(session, context, params):
+            self.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, context, params):
+            self.dns_cache_misses += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+
+class HttpClient:
+    """Спільна для всього процесу aiohttp сесія з пулом keep-alive з'єднань"""
+
+    _session = None
+    metrics = HttpMetrics()
+
+    @classmethod
+    def _create_session(cls) -> ClientSession:
+        connector = TCPConnector(
+            limit=HTTP_SETTINGS['pool_limit'],
+            limit_per_host=HTTP_SETTINGS['pool_limit_per_host'],
+            keepalive_timeout=HTTP_SETTINGS['keepalive_timeout'],
+            use_dns_cache=True,
+            ttl_dns_cache=HTTP_SETTINGS['dns_cache_ttl'],
+        )
+        return ClientSession(
+            connector=connector,
+            timeout=ClientTimeout(total=HTTP_SETTINGS['request_timeout']),
+            trace_configs=[cls.metrics.trace_config()],
+        )
+
+    @classmethod
+    async def start(cls):
+        """Створює сесію. Викликається один раз при старті бота."""
+        if cls._session is None or cls._session.closed:
+            cls._session = cls._create_session()
+            logger.info("HTTP session started")
+
+    @classmethod
+    async def close(cls):
+        """Закриває сесію і всі з'єднання пулу. Викликається при завершенні роботи бота."""
+        if cls._session is not None:
+            await cls._session.close()
+            cls._session = None
+            logger.info(f"HTTP session closed. Metrics: {cls.metrics.snapshot()}")
+
+    @classmethod
+    def session(cls) -> ClientSession:
+        """Повертає спільну сесію; якщо бот її ще не відкрив, створює ліниво."""
+        if cls._session is None or cls._session.closed:
+            logger.warning("HTTP session was not started explicitly, creating it lazily")
+            cls._session = cls._create_session()
+        return cls._session
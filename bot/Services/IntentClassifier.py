@@ -0,0 +1,116 @@
+import json
+import logging
+import math
+import os
+import random
+import re
+
+from configuration import INTENT_CLASSIFIER_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+SAMPLES_PATH = os.path.join(os.path.dirname(__file__), 'intent_samples.jsonl')
+
+
+def load_samples(path: str) -> list:
+    """Завантажує розмічені повідомлення: по одному JSON {"text", "stage", "label"} на рядок."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class IntentClassifier:
+    """
+    Локальний класифікатор намірів для категорій gpt_classify_intent.
+
+    Ознаки - слова, їх префікси (для відмінків), символьні 3-грами та стадія розмови.
+    Модель - мультиноміальна логістична регресія, яка навчається на старті бота за частки секунди.
+    Якщо впевненість нижча за поріг, classify() повертає None і класифікацію виконує LLM.
+    """
+
+    def __init__(self, samples: list = None, threshold: float = INTENT_CLASSIFIER_SETTINGS['threshold'],
+                 epochs: int = 30, learning_rate: float = 0.5, l2: float = 1e-4):
+        self.threshold = threshold
+        self.labels = []
+        self.weights = {}  # Ознака -> ваги для кожної мітки
+        self.bias = []
+        self.train(samples if samples is not None else load_samples(SAMPLES_PATH), epochs, learning_rate, l2)
+
+    @staticmethod
+    def features(text: str, stage: str = 'initial') -> dict:
+        normalized = re.sub(r"[^\w\s']", ' ', text.casefold())
+        words = normalized.split()
+
+        features = {f"s:{stage}": 1.0}
+        for word in words:
+            features[f"w:{word}"] = 1.0
+            if len(word) > 4:
+                features[f"p:{word[:5]}"] = 1.0
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                features[f"c:{padded[i:i + 3]}"] = 1.0
+
+        # Нормалізація вектора, щоб довгі повідомлення не отримували завищених оцінок
+        norm = math.sqrt(len(features))
+        return {feature: value / norm for feature, value in features.items()}
+
+    def _scores(self, features: dict) -> list:
+        scores = list(self.bias)
+        for feature, value in features.items():
+            weights = self.weights.get(feature)
+            if weights is not None:
+                for i, weight in enumerate(weights):
+                    scores[i] += weight * value
+        return scores
+
+    @staticmethod
+    def _softmax(scores: list) -> list:
+        top = max(scores)
+        exps = [math.exp(score - top) for score in scores]
+        total = sum(exps)
+        return [value / total for value in exps]
+
+    def train(self, samples: list, epochs: int, learning_rate: float, l2: float):
+        self.labels = sorted({str(sample['label']) for sample in samples}, key=int)
+        label_index = {label: i for i, label in enumerate(self.labels)}
+        self.bias = [0.0] * len(self.labels)
+        self.weights = {}
+
+        dataset = [(self.features(sample['text'], sample.get('stage', 'initial')), label_index[str(sample['label'])])
+                   for sample in samples]
+        rng = random.Random(0)
+        for _ in range(epochs):
+            rng.shuffle(dataset)
+            for features, target in dataset:
+                probabilities = self._softmax(self._scores(features))
+                for i, probability in enumerate(probabilities):
+                    gradient = probability - (1.0 if i == target else 0.0)
+                    self.bias[i] -= learning_rate * gradient
+                    for feature, value in features.items():
+                        weights = self.weights.setdefault(feature, [0.0] * len(self.labels))
+                        weights[i] -= learning_rate * (gradient * value + l2 * weights[i])
+
+        logger.info(f"Intent classifier trained on {len(samples)} samples, {len(self.weights)} features")
+
+    def predict(self, text: str, stage: str = 'initial'):
+        """Повертає (мітка, ймовірність) найімовірнішої категорії."""
+        probabilities = self._softmax(self._scores(self.features(text, stage)))
+        best = max(range(len(probabilities)), key=probabilities.__getitem__)
+        return self.labels[best], probabilities[best]
+
+    def classify(self, text: str, stage: str = 'initial', threshold: float = None):
+        """
+        Класифікує повідомлення у форматі відповіді gpt_classify_intent.
+        :param threshold: Поріг впевненості замість типового (нижчий, коли LLM недоступний).
+        :return: {"classification": ..., "additional_info": ...} або None, якщо модель не впевнена.
+        """
+        label, confidence = self.predict(text, stage)
+        if confidence < (self.threshold if threshold is None else threshold):
+            logger.info(f"Local intent classifier is not confident: {label} ({confidence:.2f})")
+            return None
+
+        logger.info(f"Message classified locally as {label} ({confidence:.2f})")
+        # Для запиту про наявність квітки назву шукає check_flower_availability у повному тексті
+        return {
+            'classification': int(label),
+            'additional_info': text if label == '8' else '',
+        }
@@ -0,0 +1,222 @@
+import asyncio
+import collections
+import logging
+import random
+import time
+
+import openai
+
+from configuration import LLM_RESILIENCE_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """LLM провайдер вважається недоступним: виклик не виконувався, потрібна локальна заміна."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Таймаути, обриви з'єднання, 429 і 5xx - проблема провайдера; 400/401/404 повтор не виправить."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """
+    Після failure_threshold помилок поспіль переходить у стан open і відхиляє виклики open_seconds.
+    Потім пропускає один пробний виклик (half_open): успіх закриває breaker, помилка - знову відкриває.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int, open_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_at = None
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self.opened_at >= self.open_seconds:
+            self.state = self.HALF_OPEN
+            self.probe_at = None
+            logger.info("LLM circuit breaker is half-open, probing the provider")
+        if self.state == self.CLOSED:
+            return True
+        # Пробний виклик, який скасували без результату, не блокує breaker назавжди
+        if self.state == self.HALF_OPEN and (self.probe_at is None or now - self.probe_at >= self.open_seconds):
+            self.probe_at = now
+            return True
+        return False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("LLM circuit breaker closed")
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+            logger.warning(f"LLM circuit breaker opened after {self.failures} failures")
+
+
+class LatencyTracker:
+    """Затримки останніх успішних запитів для розрахунку затримки дублюючого запиту."""
+
+    def __init__(self, samples: int, min_samples: int):
+        self.min_samples = min_samples
+        self._samples = collections.deque(maxlen=samples)
+
+    def record(self, latency: float):
+        self._samples.append(latency)
+
+    def percentile(self, fraction: float):
+        if len(self._samples) < self.min_samples:
+            return None
+        values = sorted(self._samples)
+        return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class LLMResilience:
+    """
+    Виконує запити до LLM з дедлайном, повторами з випадковою паузою, дублюючим (hedged) запитом
+    і circuit breaker. Один екземпляр на процес, спільний для всіх екземплярів GPTService.
+    """
+
+    def __init__(self, settings: dict = LLM_RESILIENCE_SETTINGS):
+        self.deadlines = settings['deadlines']
+        self.max_attempts = settings['max_attempts']
+        self.backoff_base = settings['backoff_base']
+        self.backoff_max = settings['backoff_max']
+        self.hedge_percentile = settings['hedge_percentile']
+        self.hedge_default_delay = settings['hedge_default_delay']
+        self.hedge_min_delay = settings['hedge_min_delay']
+        self.hedge_budget = settings['hedge_budget']
+        self.breaker = CircuitBreaker(settings['failure_threshold'], settings['open_seconds'])
+        self._latency = collections.defaultdict(
+            lambda: LatencyTracker(settings['latency_samples'], settings['latency_min_samples']))
+        self.metrics = {'calls': 0, 'attempts': 0, 'retries': 0, 'hedges': 0, 'hedge_wins': 0, 'timeouts': 0,
+                        'failures': 0, 'short_circuited': 0}
+
+    def snapshot(self) -> dict:
+        return {**self.metrics, 'breaker': self.breaker.state, 'breaker_opened': self.breaker.times_opened}
+
+    def hedge_delay(self, kind: str) -> float:
+        p95 = self._latency[kind].percentile(self.hedge_percentile)
+        return self.hedge_default_delay if p95 is None else max(self.hedge_min_delay, p95)
+
+    def record_failure(self, error: BaseException):
+        """Помилка поза call() (наприклад, обрив потокової відповіді посередині)."""
+        if is_retryable(error):
+            self.breaker.record_failure()
+
+    async def call(self, operation, kind: str = 'default', deadline: float = None, hedge: bool = True):
+        """
+        Виконує запит з повторами в межах дедлайну.
+        :param operation: Функція без аргументів, що повертає корутину одного запиту; викликається на кожну спробу.
+        :param kind: Тип запиту (classify, reply...): свій дедлайн і своя статистика затримок.
+        :param hedge: Дублювати запит, що відповідає довше за p95; не для потокових відповідей.
+        :raises CircuitOpenError: Провайдер недоступний, запит не виконувався.
+        :raises asyncio.TimeoutError: Дедлайн вичерпано.
+        """
+        if not self.breaker.allow():
+            self.metrics['short_circuited'] += 1
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        self.metrics['calls'] += 1
+        deadline_at = time.monotonic() + (deadline or self.deadlines.get(kind, self.deadlines['default']))
+        last_error = None
+        for attempt in range(self.max_attempts):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            if attempt:
+                self.metrics['retries'] += 1
+            try:
+                result = await self._attempt(operation, kind, remaining, hedge)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+                self.breaker.record_failure()
+                logger.warning(f"LLM {kind} attempt {attempt + 1} failed: {type(e).__name__}: {e}")
+                if self.breaker.state == CircuitBreaker.OPEN:
+                    break
+                # Випадкова пауза, щоб повтори всіх чатів не вдарили по провайдеру одночасно
+                backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if backoff >= deadline_at - time.monotonic():
+                    break
+                await asyncio.sleep(backoff)
+                continue
+            self.breaker.record_success()
+            return result
+
+        self.metrics['failures'] += 1
+        if last_error is None or isinstance(last_error, (asyncio.TimeoutError, TimeoutError)):
+            raise asyncio.TimeoutError()
+        raise last_error
+
+    async def _attempt(self, operation, kind: str, remaining: float, hedge: bool):
+        """Одна спроба: перший успішний з основного і, якщо він затримався, дублюючого запиту."""
+        started_at = {}
+        deadline_at = time.monotonic() + remaining
+
+        def launch():
+            self.metrics['attempts'] += 1
+            task = asyncio.ensure_future(operation())
+            started_at[task] = time.monotonic()
+            return task
+
+        primary = launch()
+        pending = {primary}
+        error = None
+        try:
+            if hedge and self.metrics['hedges'] < self.hedge_budget * self.metrics['calls'] + 1:
+                delay = self.hedge_delay(kind)
+                if delay < remaining:
+                    done, pending = await asyncio.wait(pending, timeout=delay)
+                    if not done:
+                        self.metrics['hedges'] += 1
+                        pending.add(launch())
+                    else:
+                        pending = done  # Розбирається нижче
+
+            while pending:
+                timeout = deadline_at - time.monotonic()
+                if timeout <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.metrics['hedge_wins'] += 1
+                        self._latency[kind].record(time.monotonic() - started_at[task])
+                        return task.result()
+                    error = task.exception()
+
+            if error is not None and not pending:
+                raise error
+            self.metrics['timeouts'] += 1
+            raise asyncio.TimeoutError()
+        finally:
+            # Запит, що програв або не встиг, скасовується разом з його HTTP з'єднанням
+            unfinished = [task for task in started_at if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+            for task in started_at:
+                if not task.cancelled():
+                    task.exception()  # Помилка програшного запиту вже не потрібна, але має бути прочитана
@@ -0,0 +1,124 @@
+import asyncio
+import contextlib
+import logging
+import time
+
+from aiogram import types
+from aiogram.enums import ChatAction
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+from configuration import STREAMING_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+def split_text(text: str, limit: int) -> tuple:
+    """Ділить текст перед limit по межі абзацу або слова; повертає (перша частина, залишок)."""
+    cut = text.rfind('\n', 0, limit)
+    if cut < limit // 2:
+        cut = text.rfind(' ', 0, limit)
+    if cut <= 0:
+        cut = limit
+    return text[:cut], text[cut:].lstrip()
+
+
+class MessageStream:
+    """
+    Показує відповідь LLM по мірі генерації: перша частина надсилається новим повідомленням,
+    далі воно редагується пачками не частіше за edit_interval. Текст, довший за ліміт Telegram,
+    продовжується наступним повідомленням.
+
+    Повідомлення надсилаються без parse_mode: незавершений фрагмент тексту не є валідним HTML.
+    """
+
+    def __init__(self, message: types.Message, prefix: str = "", suffix: str = "",
+                 settings: dict = STREAMING_SETTINGS):
+        self.message = message
+        self.prefix = prefix
+        self.suffix = suffix
+        self.edit_interval = settings['edit_interval']
+        self.min_chars = settings['min_chars']
+        self.max_length = settings['max_length']
+        self.cursor = settings['cursor']
+        self.current = None  # Повідомлення бота, яке зараз редагується
+        self.shown = ""  # Текст, який зараз показаний у ньому
+        self.text = ""  # Текст поточного повідомлення, включно з ще не показаним
+        self.next_edit_at = 0.0
+        self.edits = 0
+
+    async def run(self, chunks) -> str:
+        """
+        Показує всі частини генератора і повертає згенерований текст (без prefix і suffix).
+        Якщо генератор нічого не віддав, нічого не надсилає і повертає порожній рядок.
+        """
+        started = time.perf_counter()
+        generated = []
+        await self._typing()
+        async with contextlib.aclosing(chunks):
+            async for chunk in chunks:
+                if not generated:
+                    self.text = self.prefix
+                    logger.info(f"First LLM chunk after {(time.perf_counter() - started) * 1000:.0f} ms")
+                generated.append(chunk)
+                self.text += chunk
+                await self._flush_overflow(len(self.cursor))
+
+                if self.current is None or (time.monotonic() >= self.next_edit_at
+                                            and len(self.text) - len(self.shown) >= self.min_chars):
+                    await self._show(self.text + self.cursor, required=self.current is None)
+
+        if not generated:
+            return ""
+        self.text += self.suffix
+        await self._flush_overflow(0)
+        await self._show(self.text, required=True)
+        logger.info(f"Streamed reply of {sum(map(len, generated))} chars with {self.edits} edits "
+                    f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return "".join(generated)
+
+    async def _typing(self):
+        try:
+            await self.message.bot.send_chat_action(self.message.chat.id, ChatAction.TYPING)
+        except Exception as e:
+            logger.warning(f"Failed to send chat action: {e}")
+
+    async def _flush_overflow(self, reserve: int):
+        """Завершує поточне повідомлення, якщо текст не вміщається в ліміт, і починає наступне."""
+        while len(self.text) + reserve > self.max_length:
+            head, self.text = split_text(self.text, self.max_length - reserve)
+            await self._show(head, required=True)
+            self.current = None
+            self.shown = ""
+
+    async def _show(self, text: str, required: bool):
+        """
+        Надсилає або редагує повідомлення. Проміжне редагування, на яке Telegram відповів RetryAfter,
+        пропускається (наступне покаже весь текст); обов'язкове - повторюється після паузи.
+        """
+        if self.current is not None and text == self.shown:
+            return
+        while True:
+            try:
+                if self.current is None:
+                    self.current = await self.message.answer(text, parse_mode=None)
+                else:
+                    await self.current.edit_text(text, parse_mode=None)
+                    self.edits += 1
+                break
+            except TelegramRetryAfter as e:
+                logger.warning(f"Telegram asked to retry after {e.retry_after} s while streaming reply")
+                self.next_edit_at = time.monotonic() + e.retry_after
+                if not required:
+                    return
+                await asyncio.sleep(e.retry_after)
+            except TelegramBadRequest as e:
+                if "message is not modified" not in str(e):
+                    raise
+                break
+        self.shown = text
+        self.next_edit_at = time.monotonic() + self.edit_interval
+
+
+async def stream_answer(message: types.Message, chunks, prefix: str = "", suffix: str = "") -> str:
+    """Відповідає на повідомлення текстом, що генерується; повертає згенерований текст."""
+    return await MessageStream(message, prefix, suffix).run(chunks)
@@ -0,0 +1,144 @@
+import asyncio
+import hashlib
+import logging
+import os
+
+from aiogram import types
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile, InputMediaPhoto
+
+from configuration import MEDIA_ROOT, PHOTO_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# Обмеження Telegram: фото в одному альбомі та символів у підписі
+MEDIA_GROUP_LIMIT = 10
+CAPTION_LIMIT = 1024
+
+# Варіант фото, зменшений для Telegram (до 1280px), який бекенд створює поруч з оригіналом (back/images.py)
+TELEGRAM_VARIANT_SUFFIX = '_tg.jpg'
+
+
+class PhotoCache:
+    """
+    Кеш Telegram file_id для фото квітів у Redis.
+
+    Ключ - flower_photo:<Flower.photo>, поле хешу - SHA-256 вмісту файлу, значення - file_id.
+    Бекенд видаляє ключ, коли адміністратор замінює або видаляє фото.
+    """
+
+    KEY_PREFIX = 'flower_photo:'
+
+    def __init__(self, redis_client, media_root: str = MEDIA_ROOT):
+        self.redis = redis_client
+        self.media_root = media_root
+        self._hashes = {}  # Шлях -> (mtime, розмір, хеш), щоб не читати файл при кожному показі
+
+    def photo_path(self, photo_filename: str) -> str:
+        """Шлях до варіанта фото для Telegram; якщо його ще не створено - до оригіналу."""
+        original = os.path.abspath(os.path.join(self.media_root, photo_filename))
+        variant = os.path.splitext(original)[0] + TELEGRAM_VARIANT_SUFFIX
+        return variant if os.path.exists(variant) else original
+
+    def _hash_file(self, path: str) -> str:
+        stat = os.stat(path)
+        cached = self._hashes.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+        self._hashes[path] = (stat.st_mtime_ns, stat.st_size, content_hash)
+        return content_hash
+
+    async def content_hash(self, photo_filename: str) -> str:
+        """Повертає хеш вмісту фото; файл читається в окремому потоці, щоб не блокувати event loop."""
+        return await asyncio.to_thread(self._hash_file, self.photo_path(photo_filename))
+
+    async def get_file_id(self, photo_filename: str, content_hash: str):
+        try:
+            return await self.redis.hget(f"{self.KEY_PREFIX}{photo_filename}", content_hash)
+        except Exception as e:
+            logger.error(f"Failed to read photo cache for '{photo_filename}': {e}")
+            return None
+
+    async def store_file_id(self, photo_filename: str, content_hash: str, file_id: str):
+        key = f"{self.KEY_PREFIX}{photo_filename}"
+        try:
+            await self.redis.hset(key, content_hash, file_id)
+            await self.redis.expire(key, PHOTO_CACHE_TTL)
+        except Exception as e:
+            logger.error(f"Failed to store photo cache for '{photo_filename}': {e}")
+
+    async def forget(self, photo_filename: str, content_hash: str):
+        try:
+            await self.redis.hdel(f"{self.KEY_PREFIX}{photo_filename}", content_hash)
+        except Exception as e:
+            logger.error(f"Failed to drop photo cache for '{photo_filename}': {e}")
+
+    async def send_photo(self, message: types.Message, photo_filename: str, caption: str) -> types.Message:
+        """
+        Надсилає фото квітки: за кешованим file_id, якщо він є, інакше завантажує файл і кешує отриманий file_id.
+        """
+        caption = caption[:CAPTION_LIMIT]
+        content_hash = await self.content_hash(photo_filename)
+        file_id = await self.get_file_id(photo_filename, content_hash)
+
+        if file_id:
+            try:
+                return await message.answer_photo(file_id, caption=caption)
+            except TelegramBadRequest as e:
+                # file_id міг стати недійсним (інший бот, видалений файл) - завантажуємо заново
+                logger.warning(f"Cached file_id for '{photo_filename}' was rejected: {e}")
+                await self.forget(photo_filename, content_hash)
+
+        sent = await message.answer_photo(FSInputFile(self.photo_path(photo_filename)), caption=caption)
+        await self.store_file_id(photo_filename, content_hash, sent.photo[-1].file_id)
+        return sent
+
+    async def send_photo_group(self, message: types.Message, photos: list) -> list:
+        """
+        Надсилає кілька фото одним або кількома альбомами (до 10 фото в альбомі).
+        :param photos: Список пар (Flower.photo, підпис)
+        """
+        if len(photos) == 1:
+            return [await self.send_photo(message, *photos[0])]
+
+        # Хеші файлів рахуються паралельно в пулі потоків
+        hashes = await asyncio.gather(*(self.content_hash(photo_filename) for photo_filename, _ in photos))
+        file_ids = await asyncio.gather(*(self.get_file_id(photo_filename, content_hash)
+                                          for (photo_filename, _), content_hash in zip(photos, hashes)))
+
+        sent = []
+        for start in range(0, len(photos), MEDIA_GROUP_LIMIT):
+            chunk = list(zip(photos, hashes, file_ids))[start:start + MEDIA_GROUP_LIMIT]
+            if len(chunk) == 1:
+                # Альбом не може складатися з одного фото
+                sent.append(await self.send_photo(message, *chunk[0][0]))
+                continue
+            try:
+                messages = await message.answer_media_group(self._media(chunk))
+            except TelegramBadRequest as e:
+                # Хоча б один file_id недійсний - надсилаємо альбом із завантаженням усіх файлів
+                logger.warning(f"Cached file_id in media group was rejected: {e}")
+                for (photo_filename, _), content_hash, file_id in chunk:
+                    if file_id:
+                        await self.forget(photo_filename, content_hash)
+                chunk = [(photo, content_hash, None) for photo, content_hash, _ in chunk]
+                messages = await message.answer_media_group(self._media(chunk))
+
+            for ((photo_filename, _), content_hash, file_id), sent_message in zip(chunk, messages):
+                if not file_id:
+                    await self.store_file_id(photo_filename, content_hash, sent_message.photo[-1].file_id)
+            sent.extend(messages)
+        return sent
+
+    def _media(self, chunk: list) -> list:
+        return [
+            InputMediaPhoto(media=file_id or FSInputFile(self.photo_path(photo_filename)),
+                            caption=caption[:CAPTION_LIMIT])
+            for (photo_filename, caption), _, file_id in chunk
+        ]
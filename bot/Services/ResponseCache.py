@@ -0,0 +1,85 @@
+import hashlib
+import json
+import logging
+import re
+import time
+
+from configuration import RESPONSE_CACHE_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Кеш відповідей LLM у Redis для промптів, що не залежать від контексту розмови.
+
+    Ключ - хеш від області кешу (scope), моделі, версії каталогу та нормалізованого тексту.
+    Записи живуть ttl секунд; понад max_entries найдавніше використані записи витісняються (LRU
+    за відсортованою множиною з часом останнього звернення).
+    """
+
+    KEY_PREFIX = 'llm_cache:'
+    LRU_KEY = 'llm_cache:lru'
+
+    # Спільні для всіх екземплярів лічильники
+    metrics = {'hits': 0, 'misses': 0, 'saved_latency': 0.0, 'saved_tokens': 0, 'evictions': 0}
+
+    def __init__(self, redis_client, ttl: int = RESPONSE_CACHE_SETTINGS['ttl'],
+                 max_entries: int = RESPONSE_CACHE_SETTINGS['max_entries']):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Нормалізує текст: без регістру, пунктуації, емоджі та зайвих пробілів."""
+        return ' '.join(re.sub(r"[^\w\s']", ' ', text.casefold()).split())
+
+    def make_key(self, scope: str, model: str, text: str, catalog_version: str = '') -> str:
+        raw = f"{scope}|{model}|{catalog_version}|{self.normalize(text)}"
+        return f"{self.KEY_PREFIX}{hashlib.sha256(raw.encode()).hexdigest()}"
+
+    async def get(self, key: str):
+        """Повертає закешований текст відповіді або None."""
+        try:
+            cached = await self.redis.get(key)
+            if cached is None:
+                self.metrics['misses'] += 1
+                return None
+            await self.redis.zadd(self.LRU_KEY, {key: time.time()})
+        except Exception as e:
+            logger.error(f"Failed to read LLM response cache: {e}")
+            return None
+
+        entry = json.loads(cached)
+        self.metrics['hits'] += 1
+        self.metrics['saved_latency'] += entry['latency']
+        self.metrics['saved_tokens'] += entry['tokens']
+        logger.info(f"LLM response cache hit. Metrics: {self.snapshot()}")
+        return entry['content']
+
+    async def set(self, key: str, content: str, latency: float, tokens: int):
+        """Зберігає відповідь разом із затримкою і кількістю токенів, які вона коштувала."""
+        now = time.time()
+        try:
+            await self.redis.set(key, json.dumps({'content': content, 'latency': latency, 'tokens': tokens},
+                                                 ensure_ascii=False), ex=self.ttl)
+            await self.redis.zadd(self.LRU_KEY, {key: now})
+            # Прострочені за TTL ключі вже видалені Redis - прибираємо їх з індексу LRU
+            await self.redis.zremrangebyscore(self.LRU_KEY, '-inf', now - self.ttl)
+
+            excess = await self.redis.zcard(self.LRU_KEY) - self.max_entries
+            if excess > 0:
+                evicted = [member for member, _ in await self.redis.zpopmin(self.LRU_KEY, excess)]
+                if evicted:
+                    await self.redis.delete(*evicted)
+                    self.metrics['evictions'] += len(evicted)
+        except Exception as e:
+            logger.error(f"Failed to store LLM response cache: {e}")
+
+    def snapshot(self) -> dict:
+        lookups = self.metrics['hits'] + self.metrics['misses']
+        return {
+            **self.metrics,
+            'hit_ratio': self.metrics['hits'] / lookups if lookups else 0.0,
+        }
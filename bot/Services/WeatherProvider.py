@@ -0,0 +1,150 @@
+import abc
+import asyncio
+import logging
+import time
+
+from aiohttp import ClientTimeout
+
+from configuration import WEATHER_SETTINGS
+from Services.HttpClient import HttpClient
+
+logger = logging.getLogger(__name__)
+
+
+class WeatherProvider(abc.ABC):
+    """
+    Базовий провайдер погоди.
+    fetch() повертає {"condition", "description", "temperature"} або кидає виняток, якщо погода недоступна.
+    condition - мовонезалежна група погоди OpenWeatherMap у нижньому регістрі (clear, clouds, rain, snow...).
+    """
+
+    @abc.abstractmethod
+    async def fetch(self) -> dict:
+        ...
+
+
+class OpenWeatherMapProvider(WeatherProvider):
+    """Поточна погода з OpenWeatherMap через спільну aiohttp сесію бота."""
+
+    URL = "https://api.openweathermap.org/data/2.5/weather"
+
+    def __init__(self, api_key: str, location: str, timeout: float):
+        self.api_key = api_key
+        self.location = location
+        self.timeout = timeout
+
+    async def fetch(self) -> dict:
+        params = {'q': self.location, 'appid': self.api_key, 'lang': 'ua', 'units': 'metric'}
+        session = HttpClient.session()
+        async with session.get(self.URL, params=params, timeout=ClientTimeout(total=self.timeout)) as response:
+            if response.status != 200:
+                raise RuntimeError(f"Weather API returned {response.status}: {await response.text()}")
+            weather_data = await response.json()
+
+        logger.info(f'Weather API response: {weather_data}')
+        return {
+            'condition': weather_data['weather'][0]['main'].lower(),
+            'description': weather_data['weather'][0]['description'],
+            'temperature': weather_data['main']['temp'],
+        }
+
+
+class StaticWeatherProvider(WeatherProvider):
+    """Незмінна погода без мережевих запитів - для локального запуску і тестів."""
+
+    def __init__(self, weather: dict = None):
+        self.weather = weather or {'condition': 'clear', 'description': 'ясно', 'temperature': 20}
+
+    async def fetch(self) -> dict:
+        return dict(self.weather)
+
+
+def create_weather_provider(settings: dict = WEATHER_SETTINGS) -> WeatherProvider:
+    if settings['provider'] == 'static':
+        return StaticWeatherProvider()
+    return OpenWeatherMapProvider(settings['api_key'], settings['location'], settings['timeout'])
+
+
+class WeatherCache:
+    """
+    Спільна для процесу погода, яку у фоні оновлює refresher кожні refresh_interval секунд.
+
+    Обробники не чекають на API погоди: get() віддає кешоване значення, а якщо воно старше max_age,
+    чекає на оновлення не довше timeout і далі повертає останнє відоме значення (або None).
+    """
+
+    provider = None
+    _value = None
+    _fetched_at = 0.0
+    _refresher = None
+    _inflight = None
+    refresh_interval = WEATHER_SETTINGS['refresh_interval']
+    max_age = WEATHER_SETTINGS['max_age']
+    timeout = WEATHER_SETTINGS['timeout']
+    metrics = {'hits': 0, 'refreshes': 0, 'failures': 0, 'timeouts': 0}
+
+    @classmethod
+    async def start(cls, provider: WeatherProvider = None):
+        """Підключає провайдера і запускає фонове оновлення. Викликається при старті бота."""
+        cls.provider = provider or create_weather_provider()
+        cls._refresher = asyncio.create_task(cls._refresh_forever())
+        logger.info(f"Weather cache started with {type(cls.provider).__name__}")
+
+    @classmethod
+    async def close(cls):
+        for task in (cls._refresher, cls._inflight):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        cls._refresher = None
+        cls._inflight = None
+        logger.info(f"Weather cache closed. Metrics: {cls.metrics}")
+
+    @classmethod
+    async def _refresh_forever(cls):
+        while True:
+            await cls._load()
+            await asyncio.sleep(cls.refresh_interval)
+
+    @classmethod
+    def _load(cls) -> asyncio.Task:
+        """Одне оновлення на процес: паралельні виклики чекають ту саму задачу."""
+        if cls._inflight is None or cls._inflight.done():
+            cls._inflight = asyncio.create_task(cls._refresh())
+        return cls._inflight
+
+    @classmethod
+    async def _refresh(cls):
+        try:
+            weather = await cls.provider.fetch()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            cls.metrics['failures'] += 1
+            logger.error(f"Error fetching weather data: {e}")
+            return cls._value
+
+        cls._value = weather
+        cls._fetched_at = time.time()
+        cls.metrics['refreshes'] += 1
+        return weather
+
+    @classmethod
+    async def get(cls):
+        """Повертає поточну погоду або None, якщо вона ще жодного разу не була отримана."""
+        if cls.provider is None:
+            return None
+        if cls._value is not None and time.time() - cls._fetched_at < cls.max_age:
+            cls.metrics['hits'] += 1
+            return cls._value
+
+        try:
+            # shield: таймаут очікування не скасовує саме оновлення
+            return await asyncio.wait_for(asyncio.shield(cls._load()), cls.timeout)
+        except asyncio.TimeoutError:
+            cls.metrics['timeouts'] += 1
+            logger.warning("Timed out while waiting for weather, using last known value")
+            return cls._value
@@ -1,42 +1,174 @@
 import asyncio
 import logging
+import multiprocessing
+import os
 
 import redis.asyncio as redis  # Використовуємо redis.asyncio замість aioredis
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.redis import RedisStorage
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 
+from configuration import (BOT_MODE, BOT_TOKEN, CHAT_QUEUE_SETTINGS, REDIS_URL, STATE_TTL, TELEGRAM_API_URL,
+                           WEBHOOK_SETTINGS)
+from Handlers.GPTService import GPTService
 from Handlers.IntentClassifyHandler import IntentClassifyHandler
+from Services.CatalogCache import CatalogCache
+from Services.ChatQueue import ChatQueueMiddleware, LLMConcurrencyMiddleware
+from Services.HttpClient import HttpClient
+from Services.WeatherProvider import WeatherCache
 
 logging.basicConfig(
     level=logging.INFO,  # Set to DEBUG for more detailed logs
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format='%(asctime)s - %(process)d - %(name)s - %(levelname)s - %(message)s',
 )
+logger = logging.getLogger(__name__)
 
-Token = ''
 
-# Ініціалізуємо Redis клієнт з hiredis для кращої продуктивності
-redis_client = redis.Redis(host="localhost", decode_responses=True)
+def create_bot() -> Bot:
+    # Адресу Bot API можна замінити на локальний сервер або стаб (scripts/replay_updates.py)
+    session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL)) if TELEGRAM_API_URL else None
+    return Bot(BOT_TOKEN, session=session, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
 
-# Використовуємо RedisStorage з TTL для стейтів (600 секунд = 10 хвилин)
-storage = RedisStorage(redis=redis_client, state_ttl=600, data_ttl=600)
 
-async def start_polling(bot, dp):
-    # Запуск полінгу для бота
-    await dp.start_polling(bot)
+def create_dispatcher(bot: Bot) -> Dispatcher:
+    """
+    Диспетчер з хендлерами і спільними сервісами процесу.
+    Стейти зберігаються в Redis з TTL (600 секунд = 10 хвилин), тож будь-який воркер може продовжити діалог.
+    """
+    redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+    storage = RedisStorage(redis=redis_client, state_ttl=STATE_TTL, data_ttl=STATE_TTL)
+    dp = Dispatcher(storage=storage)
+
+    # Оновлення одного чату - по черзі, різних чатів - паралельно; обробники LLM - не більше ліміту
+    dp.update.outer_middleware(ChatQueueMiddleware(redis_client))
+    dp.message.middleware(LLMConcurrencyMiddleware(CHAT_QUEUE_SETTINGS['llm_concurrency']))
+
+    # Ініціалізація хендлерів
+    IntentClassifyHandler(bot, dp, redis_client)
+
+    async def on_startup():
+        # Одна HTTP сесія з пулом з'єднань на весь процес бота
+        await HttpClient.start()
+        # Кеш каталогу, який скидається бекендом при змінах у адмінці
+        await CatalogCache.start(redis_client)
+        # Погода для доставки оновлюється у фоні, а не на кожне замовлення
+        await WeatherCache.start()
+
+    async def on_shutdown():
+        logger.info(f"Bot metrics: {collect_metrics()}")
+        await WeatherCache.close()
+        await CatalogCache.close()
+        await HttpClient.close()
+        await GPTService.close()
+        await storage.close()
+
+    # Однаково спрацьовують і для полінгу, і для вебхука
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return dp
+
+
+def collect_metrics() -> dict:
+    return {
+        'chat_queue': ChatQueueMiddleware.snapshot(),
+        'llm': LLMConcurrencyMiddleware.snapshot(),
+        'llm_resilience': GPTService.resilience_snapshot(),
+        'catalog_cache': CatalogCache.metrics,
+        'weather_cache': WeatherCache.metrics,
+        'http': HttpClient.metrics.snapshot(),
+    }
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    # Метрики цього воркера; при BOT_WORKERS > 1 кожен запит потрапляє до одного з процесів
+    return web.json_response({'pid': os.getpid(), **collect_metrics()})
 
 
 async def main() -> None:
-    bot = Bot(Token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
-    dp = Dispatcher(storage=storage)
+    bot = create_bot()
+    dp = create_dispatcher(bot)
+    # Полінг працює лише з одним процесом, тож вебхук, якщо був, треба зняти
+    await bot.delete_webhook()
+    await dp.start_polling(bot)
 
-    IntentClassifyHandler(bot,dp)
-    # Ініціалізація хендлерів
 
-    await start_polling(bot, dp)
+def create_webhook_app() -> web.Application:
+    bot = create_bot()
+    dp = create_dispatcher(bot)
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=WEBHOOK_SETTINGS['secret'] or None,
+    ).register(app, path=WEBHOOK_SETTINGS['path'])
+    app.router.add_get('/metrics', metrics_handler)
+    # Запускає startup/shutdown диспетчера разом із сервером і закриває сесію бота
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+def run_webhook_worker(reuse_port: bool) -> None:
+    # SO_REUSEPORT: ядро розподіляє з'єднання між процесами, що слухають один порт
+    web.run_app(
+        create_webhook_app(),
+        host=WEBHOOK_SETTINGS['host'],
+        port=WEBHOOK_SETTINGS['port'],
+        reuse_port=reuse_port,
+        print=None,
+    )
+
+
+async def set_webhook() -> None:
+    """Реєструє вебхук один раз для всіх воркерів."""
+    url = f"{WEBHOOK_SETTINGS['base_url'].rstrip('/')}{WEBHOOK_SETTINGS['path']}"
+    bot = create_bot()
+    try:
+        await bot.set_webhook(
+            url,
+            secret_token=WEBHOOK_SETTINGS['secret'] or None,
+            allowed_updates=WEBHOOK_SETTINGS['allowed_updates'],
+        )
+        logger.info(f"Webhook set to {url}")
+    finally:
+        await bot.session.close()
+
+
+def run_webhook() -> None:
+    if WEBHOOK_SETTINGS['set_webhook']:
+        if not WEBHOOK_SETTINGS['base_url']:
+            raise RuntimeError("WEBHOOK_BASE_URL is required to register the webhook")
+        asyncio.run(set_webhook())
+
+    workers = max(1, WEBHOOK_SETTINGS['workers'])
+    if workers == 1:
+        run_webhook_worker(reuse_port=False)
+        return
+
+    logger.info(f"Starting {workers} webhook workers on port {WEBHOOK_SETTINGS['port']}")
+    processes = [
+        multiprocessing.Process(target=run_webhook_worker, args=(True,), name=f"webhook-worker-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Воркери отримують SIGINT від терміналу і зупиняються самі
+        for process in processes:
+            process.join()
 
 
 if __name__ == "__main__":
-    # Запуск асинхронної програми
-    asyncio.run(main())
+    if BOT_MODE == 'webhook':
+        run_webhook()
+    else:
+        # Запуск асинхронної програми
+        asyncio.run(main())
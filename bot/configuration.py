@@ -1,7 +1,137 @@
+import os
+
+# Бекенд: Flask (server.py) і, за потреби, асинхронний API читання каталогу (async_server.py).
+# Без READ_API_BASE_URL маршрути читання теж ідуть на Flask
+API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:5000')
+READ_API_BASE_URL = os.getenv('READ_API_BASE_URL', API_BASE_URL)
+
 API_URLS = {
-    'all_flowers': 'http://localhost:5000/api/resources/all_flowers',
-    'flower_by_name': 'http://localhost:5000/api/resources/flower_by_name',
-    'flower_by_id': 'http://localhost:5000/api/resources/flower_by_id',
-    'flower_names': 'http://localhost:5000/api/resources/flower_names',
-    'flower_parse_calculator': 'http://localhost:5000/api/resources/flower_parse_calculator',
-}
\ No newline at end of file
+    'all_flowers': f'{READ_API_BASE_URL}/api/resources/all_flowers',
+    'flower_by_name': f'{READ_API_BASE_URL}/api/resources/flower_by_name',
+    'flowers_by_names': f'{READ_API_BASE_URL}/api/resources/flowers_by_names',
+    'flower_by_id': f'{READ_API_BASE_URL}/api/resources/flower_by_id',
+    'flower_names': f'{READ_API_BASE_URL}/api/resources/flower_names',
+    'reservation': f'{API_BASE_URL}/api/resources/reservation',
+    'delivery_quote': f'{API_BASE_URL}/api/resources/delivery_quote',
+}
+
+# Фото квітів, які завантажує адмінка бекенду
+MEDIA_ROOT = '../back/media/flowers'
+# Скільки зберігати Telegram file_id фото в Redis, секунди
+PHOTO_CACHE_TTL = 30 * 24 * 3600
+
+# Кеш каталогу (Services/CatalogCache.py): свіжі дані ttl секунд, ще stale_ttl - застарілі з фоновим оновленням
+CATALOG_CACHE_SETTINGS = {
+    'ttl': 300,
+    'stale_ttl': 3600,
+}
+
+# Кеш відповідей LLM (Services/ResponseCache.py)
+RESPONSE_CACHE_SETTINGS = {
+    'ttl': 6 * 3600,
+    'max_entries': 10000,
+    # Категорії, відповідь на які не залежить від тексту повідомлення: привітання, консультація,
+    # доставка, намір купити, намір зібрати букет
+    'reply_classifications': ['1', '3', '6', '11', '12'],
+}
+
+# Локальний класифікатор намірів (Services/IntentClassifier.py): нижче порогу впевненості класифікує LLM
+INTENT_CLASSIFIER_SETTINGS = {
+    'threshold': float(os.getenv('INTENT_CLASSIFIER_THRESHOLD', '0.7')),
+}
+
+# TTL стану FSM у Redis, секунди. Резерв квітів на бекенді живе стільки ж, скільки і стан покупки
+STATE_TTL = 600
+
+# Налаштування LLM клієнта. OPENAI_BASE_URL дозволяє спрямувати бота на локальний стаб (scripts/stub_llm_server.py)
+GPT_SETTINGS = {
+    'api_key': os.getenv('OPENAI_API_KEY', ''),
+    'base_url': os.getenv('OPENAI_BASE_URL') or None,
+    'model': os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
+    'max_concurrency': int(os.getenv('GPT_MAX_CONCURRENCY', '16')),  # Одночасних запитів до LLM на процес
+    'timeout': float(os.getenv('GPT_TIMEOUT', '20')),  # Таймаут одного виклику, секунди
+}
+
+# Стійкість викликів LLM (Services/LLMResilience.py)
+LLM_RESILIENCE_SETTINGS = {
+    # Загальний дедлайн виклику разом з повторами, секунди; stream - до отримання відповіді на потоковий запит
+    'deadlines': {'classify': 4.0, 'reply': 15.0, 'structured': 12.0, 'stream': 8.0, 'default': 12.0},
+    'max_attempts': 3,
+    'backoff_base': 0.2,  # Пауза перед повтором - випадкова від 0 до min(backoff_max, backoff_base * 2^спроба)
+    'backoff_max': 2.0,
+    # Дублюючий запит, якщо перший не відповів за p95 затримки успішних запитів
+    'hedge_percentile': 0.95,
+    'hedge_default_delay': 1.5,  # Поки статистики замало, секунди
+    'hedge_min_delay': 0.3,
+    'hedge_budget': 0.1,  # Не більше 10% викликів з дублюючим запитом, щоб не подвоювати навантаження
+    'latency_samples': 200,
+    'latency_min_samples': 20,
+    # Після failure_threshold помилок поспіль виклики LLM не виконуються open_seconds, працюють локальні заміни
+    'failure_threshold': 5,
+    'open_seconds': 30.0,
+}
+
+# Впевненість локального класифікатора, достатня, коли LLM недоступний; інакше - категорія 10 (Інше)
+INTENT_FALLBACK_THRESHOLD = float(os.getenv('INTENT_FALLBACK_THRESHOLD', '0.35'))
+
+# Поступовий показ відповіді LLM редагуванням повідомлення (Services/MessageStream.py)
+STREAMING_SETTINGS = {
+    'edit_interval': 1.0,  # Не частіше одного редагування на секунду - ліміт Telegram для чату
+    'min_chars': 40,  # Нового тексту, щоб редагування мало сенс
+    'max_length': 4096,  # Ліміт Telegram на довжину повідомлення; довший текст продовжується новим повідомленням
+    'cursor': ' ▌',  # Показується в кінці тексту, поки генерація триває
+}
+
+# Погода для розрахунку доставки (Services/WeatherProvider.py). WEATHER_PROVIDER=static - стаб без мережі
+WEATHER_SETTINGS = {
+    'provider': os.getenv('WEATHER_PROVIDER', 'openweathermap'),
+    'api_key': os.getenv('OPENWEATHER_API_KEY', ''),
+    'location': os.getenv('WEATHER_LOCATION', 'Kyiv'),
+    'refresh_interval': 300,  # Як часто оновлювати погоду у фоні, секунди
+    'max_age': 1800,  # Старіше значення обробник оновлює сам, але не чекає довше timeout
+    'timeout': 2.0,
+}
+
+# Структурований розбір складу букета: до цієї кількості назв каталогу схема обмежує назви переліком (enum)
+BOUQUET_SCHEMA_ENUM_LIMIT = 500
+
+# Пул з'єднань спільної aiohttp сесії (Services/HttpClient.py)
+HTTP_SETTINGS = {
+    'pool_limit': 100,  # Загальна кількість з'єднань у пулі
+    'pool_limit_per_host': 30,  # З'єднань до одного хоста (бекенд Flask)
+    'keepalive_timeout': 30,  # Скільки тримати простоюче з'єднання відкритим, секунди
+    'dns_cache_ttl': 300,  # Кешування DNS, секунди
+    'request_timeout': 15,  # Загальний таймаут запиту, секунди
+    'fan_out_concurrency': 5,  # Одночасних запитів, коли квітки доводиться запитувати по одній
+}
+
+# Режим отримання оновлень: polling (один процес) або webhook (кілька воркерів за балансувальником)
+BOT_TOKEN = os.getenv('BOT_TOKEN', '')
+BOT_MODE = os.getenv('BOT_MODE', 'polling')
+# Спільний Redis для FSM: будь-яка репліка може обробити оновлення будь-якого чату
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+# Локальний Bot API сервер або стаб для тестів; за замовчуванням api.telegram.org
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL')
+
+WEBHOOK_SETTINGS = {
+    'base_url': os.getenv('WEBHOOK_BASE_URL', ''),  # Публічна адреса балансувальника, наприклад https://shop.example.com
+    'path': os.getenv('WEBHOOK_PATH', '/webhook'),
+    'secret': os.getenv('WEBHOOK_SECRET', ''),  # Telegram надсилає його в X-Telegram-Bot-Api-Secret-Token
+    'host': os.getenv('WEBHOOK_HOST', '0.0.0.0'),
+    'port': int(os.getenv('WEBHOOK_PORT', '8080')),
+    'workers': int(os.getenv('BOT_WORKERS', '1')),  # Процеси на одному порту (SO_REUSEPORT)
+    'set_webhook': os.getenv('WEBHOOK_SET', '1') == '1',  # Вимкнути, якщо вебхук реєструє інша репліка
+    'allowed_updates': ['message', 'callback_query'],
+}
+
+# Черга оновлень по чатах (Services/ChatQueue.py)
+CHAT_QUEUE_SETTINGS = {
+    'coalesce': True,  # Серія повідомлень, що накопичилась за час обробки, класифікується одним запитом
+    'max_coalesced': 5,  # Скільки повідомлень максимум об'єднується в одне
+    'llm_concurrency': int(os.getenv('LLM_CONCURRENCY', '8')),  # Хендлерів з прапорцем llm одночасно на процес
+    # Redis lock на чат, щоб оновлення одного чату не оброблялись паралельно в різних воркерах
+    'distributed_lock': WEBHOOK_SETTINGS['workers'] > 1 or os.getenv('CHAT_DISTRIBUTED_LOCK') == '1',
+    'lock_timeout': 120,  # Lock звільняється сам, якщо воркер впав, секунди
+    'lock_wait': 60,  # Скільки чекати lock, перш ніж обробити оновлення без нього, секунди
+    'wait_samples': 1000,  # Останні часи очікування для перцентилів
+}
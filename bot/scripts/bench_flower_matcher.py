@@ -0,0 +1,62 @@
+"""
+Бенчмарк локального пошуку квіток на великому синтетичному каталозі.
+
+    python scripts/bench_flower_matcher.py --size 12000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from Services.FlowerMatcher import FlowerMatcher
+
+COLORS = ['Червона', 'Біла', 'Жовта', 'Рожева', 'Синя', 'Фіолетова', 'Кремова', 'Бордова', 'Помаранчева', 'Персикова']
+FLOWERS = ['троянда', 'лілія', 'ромашка', 'півонія', 'орхідея', 'хризантема', 'гвоздика', 'гербера', 'еустома',
+           'гортензія', 'фрезія', 'календула', 'айстра', 'жоржина', 'анемона', 'ранункулюс', 'альстромерія',
+           'матіола', 'гіпсофіла', 'лаванда']
+VARIETIES = ['Наомі', 'Експлорер', 'Аваланж', 'Мондіаль', 'Пінк Флойд', 'Фрідом', 'Вендела', 'Кантрі Блюз',
+             'Дольче Віта', 'Хай Меджик', 'Аква', 'Мемурі', 'Ескімо', 'Лемонада', 'Шангрі-Ла']
+
+QUERIES = ['троянди', 'білі троянди', 'у вас є червоні лілії?', 'ромашкі', 'тройанди', 'півоній', 'орхідей',
+           'гортензії є?', 'кремові еустоми', 'лаванду', 'кактуси', 'наомі', 'жовті ранункулюси']
+
+
+def build_catalog(size: int) -> list:
+    rng = random.Random(0)
+    names = set()
+    while len(names) < size:
+        name = f"{rng.choice(COLORS)} {rng.choice(FLOWERS)} {rng.choice(VARIETIES)} {rng.randint(1, 99)}"
+        names.add(name)
+    return sorted(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FlowerMatcher lookup latency benchmark")
+    parser.add_argument('--size', type=int, default=12000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    names = build_catalog(args.size)
+    started = time.perf_counter()
+    matcher = FlowerMatcher(names)
+    build_time = time.perf_counter() - started
+    print(f"catalog={len(names)} tokens={len(matcher.tokens)} build={build_time * 1000:.0f}ms")
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = matcher.match(query)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        found = 'fallback to LLM' if result is None else f"{len(result)} matches, e.g. {result[:2]}"
+        print(f"{query!r:32} p50={statistics.median(timings) * 1000:6.2f}ms "
+              f"p99={timings[int(len(timings) * 0.99) - 1] * 1000:6.2f}ms  {found}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Бенчмарк затримки event loop під час паралельних класифікацій.
+
+Порівнює синхронний клієнт (стара поведінка GPTService) з асинхронним.
+Спершу запустіть стаб: python scripts/stub_llm_server.py --delay 0.5
+
+    python scripts/bench_loop_latency.py --base-url http://127.0.0.1:8088/v1 --chats 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float, samples: list):
+    """Кожні interval секунд фіксує, наскільки пізніше запланованого прокинувся loop."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - started - interval)
+
+
+async def run(mode: str, chats: int):
+    from openai import OpenAI
+    from Handlers.GPTService import GPTService
+
+    service = GPTService()
+    sync_client = OpenAI(api_key=service.client.api_key, base_url=service.client.base_url, max_retries=0)
+
+    async def classify_sync(text):
+        # Так працював GPTService до переходу на AsyncOpenAI
+        sync_client.chat.completions.create(model=service.model, messages=[{"role": "user", "content": text}])
+
+    async def classify_async(text):
+        await service.gpt_classify_intent(text, "initial")
+
+    classify = classify_sync if mode == "sync" else classify_async
+
+    stop = asyncio.Event()
+    lag_samples = []
+    lag_task = asyncio.create_task(measure_loop_lag(stop, 0.01, lag_samples))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(classify(f"привіт {i}") for i in range(chats)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await lag_task
+    await GPTService.close()
+
+    lag_ms = sorted(sample * 1000 for sample in lag_samples) or [0.0]
+    print(f"mode={mode} chats={chats} wall={elapsed:.2f}s "
+          f"loop_lag_p50={statistics.median(lag_ms):.1f}ms "
+          f"loop_lag_max={lag_ms[-1]:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event loop latency benchmark for GPTService")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8088/v1")
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    args = parser.parse_args()
+
+    os.environ["OPENAI_BASE_URL"] = args.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+    for selected_mode in (["sync", "async"] if args.mode == "both" else [args.mode]):
+        asyncio.run(run(selected_mode, args.chats))
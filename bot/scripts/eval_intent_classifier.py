@@ -0,0 +1,59 @@
+"""
+Офлайн оцінка локального класифікатора намірів: точність проти частки повідомлень,
+які обробляються без LLM, і зекономленого часу.
+
+    python scripts/eval_intent_classifier.py --llm-latency 0.9
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from Services.IntentClassifier import IntentClassifier, load_samples
+
+EVAL_PATH = os.path.join(os.path.dirname(__file__), 'intent_eval.jsonl')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the local intent classifier")
+    parser.add_argument('--eval', default=EVAL_PATH, help="JSONL with text, stage and label")
+    parser.add_argument('--llm-latency', type=float, default=0.9, help="Average gpt_classify_intent latency, seconds")
+    parser.add_argument('--thresholds', default='0.3,0.4,0.5,0.6,0.7,0.8,0.9')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    classifier = IntentClassifier()
+    train_time = time.perf_counter() - started
+
+    samples = load_samples(args.eval)
+    predictions = []
+    started = time.perf_counter()
+    for sample in samples:
+        predictions.append(classifier.predict(sample['text'], sample.get('stage', 'initial')))
+    local_latency = (time.perf_counter() - started) / len(samples)
+
+    correct = [label == str(sample['label']) for sample, (label, _) in zip(samples, predictions)]
+    print(f"samples={len(samples)} train_time={train_time * 1000:.0f}ms "
+          f"local_latency={local_latency * 1e6:.0f}us top1_accuracy={sum(correct) / len(samples):.2%}")
+    print(f"{'threshold':>9} {'coverage':>9} {'accuracy':>9} {'saved/msg':>10}")
+
+    for threshold in (float(value) for value in args.thresholds.split(',')):
+        confident = [ok for ok, (_, confidence) in zip(correct, predictions) if confidence >= threshold]
+        coverage = len(confident) / len(samples)
+        accuracy = sum(confident) / len(confident) if confident else 0.0
+        # Впевнені повідомлення економлять виклик LLM, решта платять ще й за локальну класифікацію
+        saved = coverage * args.llm_latency - local_latency
+        print(f"{threshold:>9.2f} {coverage:>9.1%} {accuracy:>9.1%} {saved * 1000:>8.0f}ms")
+
+    errors = [(sample, label, confidence) for sample, ok, (label, confidence) in zip(samples, correct, predictions)
+              if not ok and confidence >= classifier.threshold]
+    if errors:
+        print(f"\nConfident mistakes at threshold {classifier.threshold}:")
+        for sample, label, confidence in errors:
+            print(f"  {sample['text']!r}: expected {sample['label']}, got {label} ({confidence:.2f})")
+
+
+if __name__ == '__main__':
+    main()
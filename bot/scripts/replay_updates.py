@@ -0,0 +1,181 @@
+"""
+Навантажувальний тест вебхука: відтворює записані оновлення Telegram на локальному вебхуку бота.
+
+Скрипт піднімає стаб Bot API, куди бот надсилає відповіді, і рахує затримку від POST оновлення
+до першої відповіді в той самий чат. Оновлення читаються з JSONL файлу (один Update на рядок, як у
+getUpdates); без --updates вони генеруються з текстів scripts/intent_eval.jsonl.
+
+    python scripts/stub_llm_server.py --delay 0.5
+    OPENAI_BASE_URL=http://localhost:8088/v1 TELEGRAM_API_URL=http://127.0.0.1:8081 \\
+        BOT_MODE=webhook WEBHOOK_SET=0 BOT_WORKERS=4 BOT_TOKEN=123:replay python bot.py
+    python scripts/replay_updates.py --chats 200 --updates-per-chat 5 --concurrency 50
+
+Порівняйте req/s і затримки з BOT_WORKERS=1 і більшою кількістю воркерів.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import time
+
+from aiohttp import ClientSession, ClientTimeout, web
+
+EVAL_FILE = os.path.join(os.path.dirname(__file__), 'intent_eval.jsonl')
+
+
+class FakeBotAPI:
+    """Стаб Bot API: відповідає на будь-який метод і фіксує час відповідей по чатах."""
+
+    def __init__(self):
+        self.calls = collections.Counter()
+        self.pending = collections.defaultdict(collections.deque)  # chat_id -> час надсилання оновлень
+        self.latencies = []
+        self.last_reply = time.perf_counter()
+        self.message_id = 0
+
+    def expect_reply(self, chat_id: int):
+        self.pending[chat_id].append(time.perf_counter())
+
+    def message(self, chat_id, data) -> dict:
+        self.message_id += 1
+        return {
+            'message_id': self.message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': data.get('text') or data.get('caption') or '',
+        }
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        data = await request.post()
+        self.calls[method] += 1
+
+        chat_id = data.get('chat_id')
+        chat_id = int(chat_id) if chat_id and str(chat_id).lstrip('-').isdigit() else 0
+        if method in ('sendMessage', 'sendPhoto', 'sendMediaGroup') and self.pending.get(chat_id):
+            self.latencies.append(time.perf_counter() - self.pending[chat_id].popleft())
+            self.last_reply = time.perf_counter()
+
+        if method == 'getMe':
+            result = {'id': 1, 'is_bot': True, 'first_name': 'Replay', 'username': 'replay_bot'}
+        elif method == 'sendMediaGroup':
+            media = json.loads(data.get('media') or '[]')
+            result = [self.message(chat_id, item) for item in media]
+        elif (method.startswith('send') and method != 'sendChatAction') or method.startswith('edit'):
+            result = self.message(chat_id, data)
+        else:
+            result = True
+        return web.json_response({'ok': True, 'result': result})
+
+
+def load_updates(path: str, chats: int, per_chat: int) -> list:
+    """Записані оновлення або синтетичні: кожен чат надсилає per_chat повідомлень по черзі."""
+    if path:
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    with open(EVAL_FILE, encoding='utf-8') as f:
+        texts = [json.loads(line)['text'] for line in f if line.strip()]
+    updates = []
+    for round_number in range(per_chat):
+        for chat in range(chats):
+            chat_id = 100000 + chat
+            updates.append({
+                'message': {
+                    'message_id': round_number + 1,
+                    'date': int(time.time()),
+                    'chat': {'id': chat_id, 'type': 'private', 'first_name': 'Replay'},
+                    'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Replay'},
+                    'text': random.choice(texts),
+                }
+            })
+    return updates
+
+
+def update_chat_id(update: dict):
+    for key in ('message', 'edited_message'):
+        if key in update:
+            return update[key]['chat']['id']
+    if 'callback_query' in update:
+        return update['callback_query']['message']['chat']['id']
+    return None
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+async def replay(args):
+    api = FakeBotAPI()
+    app = web.Application()
+    app.router.add_post('/bot{token}/{method}', api.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', args.api_port).start()
+
+    updates = load_updates(args.updates, args.chats, args.updates_per_chat)
+    headers = {'X-Telegram-Bot-Api-Secret-Token': args.secret} if args.secret else {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    webhook_latencies = []
+    errors = 0
+
+    async def send(session: ClientSession, update_id: int, update: dict):
+        nonlocal errors
+        update = {**update, 'update_id': update_id}  # Унікальні id, щоб файл можна було відтворювати повторно
+        chat_id = update_chat_id(update)
+        async with semaphore:
+            if chat_id is not None:
+                api.expect_reply(chat_id)
+            started = time.perf_counter()
+            try:
+                async with session.post(args.webhook_url, json=update, headers=headers) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except Exception:
+                errors += 1
+            webhook_latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    async with ClientSession(timeout=ClientTimeout(total=30)) as session:
+        first_id = int(time.time() * 1000)
+        await asyncio.gather(*(send(session, first_id + i, update) for i, update in enumerate(updates)))
+    sent_in = time.perf_counter() - started
+
+    # Чекаємо, поки бот відповість на все або відповіді перестануть надходити
+    expected = sum(len(queue) for queue in api.pending.values()) + len(api.latencies)
+    while len(api.latencies) < expected and time.perf_counter() - api.last_reply < args.drain:
+        await asyncio.sleep(0.1)
+    total = api.last_reply - started if api.latencies else sent_in
+    await runner.cleanup()
+
+    print(f"updates sent:      {len(updates)} in {sent_in:.2f}s ({len(updates) / sent_in:.1f} req/s), errors: {errors}")
+    print(f"webhook response:  p50 {percentile(webhook_latencies, 0.5) * 1000:.1f} ms, "
+          f"p95 {percentile(webhook_latencies, 0.95) * 1000:.1f} ms")
+    print(f"replies:           {len(api.latencies)}/{expected} in {total:.2f}s "
+          f"({len(api.latencies) / total if total else 0:.1f} updates/s)")
+    print(f"update -> reply:   p50 {percentile(api.latencies, 0.5) * 1000:.1f} ms, "
+          f"p95 {percentile(api.latencies, 0.95) * 1000:.1f} ms, "
+          f"p99 {percentile(api.latencies, 0.99) * 1000:.1f} ms")
+    print(f"Bot API calls:     {dict(api.calls)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay Telegram updates against a local webhook")
+    parser.add_argument('--webhook-url', default='http://127.0.0.1:8080/webhook')
+    parser.add_argument('--secret', default=os.getenv('WEBHOOK_SECRET', ''))
+    parser.add_argument('--updates', help="JSONL file with recorded updates; synthetic updates by default")
+    parser.add_argument('--chats', type=int, default=100, help="Synthetic chats")
+    parser.add_argument('--updates-per-chat', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=50, help="Concurrent webhook requests")
+    parser.add_argument('--api-port', type=int, default=8081, help="Port of the stub Bot API (TELEGRAM_API_URL)")
+    parser.add_argument('--drain', type=float, default=10.0, help="Stop waiting after this many seconds without replies")
+    args = parser.parse_args()
+    asyncio.run(replay(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Локальний стаб OpenAI-сумісного API для офлайн бенчмарків і тестування без реального LLM.
+
+Запуск:
+    python scripts/stub_llm_server.py --port 8088 --delay 0.8
+    OPENAI_BASE_URL=http://localhost:8088/v1 python bot.py
+
+Інжекція збоїв для перевірки повторів, дублюючих запитів і circuit breaker (Services/LLMResilience.py):
+    python scripts/stub_llm_server.py --error-rate 0.2 --slow-rate 0.05 --slow-delay 5
+    curl -X POST localhost:8088/faults -d '{"error_rate": 1.0}'   # повна відмова, breaker має відкритись
+    curl -X POST localhost:8088/faults -d '{"error_rate": 0}'     # відновлення
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from aiohttp import web
+
+
+def build_content(prompt: str, response_format: dict = None) -> str:
+    """Повертає правдоподібну відповідь залежно від типу промпту."""
+    if response_format and response_format.get("type") == "json_schema":
+        # Структурований склад букета: перша квітка з переліку схеми
+        name_schema = response_format["json_schema"]["schema"]["properties"]["items"]["items"]["properties"]["name"]
+        names = name_schema.get("enum") or ["Червона троянда"]
+        return json.dumps({"items": [{"name": names[0], "quantity": 5}]}, ensure_ascii=False)
+    if "Класифікуйте" in prompt:
+        return json.dumps({"classification": 1, "additional_info": ""}, ensure_ascii=False)
+    if "Запропонуй кілька варіантів букетів" in prompt:
+        return ("Букет 1: 5 червоних троянд і 3 білі лілії - класика для святкового вечора 🌹\n"
+                "Букет 2: 7 тюльпанів і 5 ромашок - легкий весняний настрій 🌷\n"
+                "Букет 3: 3 соняшники, 4 хризантеми і трохи зелені - яскраво і тепло 🌻")
+    return "Добрий день! Раді бачити вас у магазині 'Квітка' 🌸"
+
+
+async def stream_completion(request: web.Request, payload: dict, content: str) -> web.StreamResponse:
+    """
+    Потокова відповідь (stream=True) у форматі SSE: перша частина через ttft від --delay,
+    решта слів рівномірно розподілені на залишок затримки.
+    """
+    delay = request.app["delay"]
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    words = [word + " " for word in content.split(" ")]
+    words[-1] = words[-1].rstrip(" ")
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+
+    async def send(delta: dict, finish_reason=None, usage=None):
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        if usage is not None:
+            chunk["usage"] = usage
+        await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+
+    await asyncio.sleep(delay * request.app["ttft"])
+    await send({"role": "assistant", "content": ""})
+    for word in words:
+        await send({"content": word})
+        await asyncio.sleep(delay * (1 - request.app["ttft"]) / len(words))
+    await send({}, finish_reason="stop", usage=usage_for(payload["messages"][-1]["content"], content))
+    await response.write(b"data: [DONE]\n\n")
+    await response.write_eof()
+    return response
+
+
+def usage_for(prompt: str, content: str) -> dict:
+    return {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4}
+
+
+FAULT_NAMES = ("error_rate", "error_status", "hang_rate", "slow_rate", "slow_delay", "garbage_rate")
+
+
+async def inject_fault(request: web.Request):
+    """
+    Повертає відповідь з помилкою або затримує запит згідно з налаштуваннями збоїв; None - запит обробляється як звичайно.
+    """
+    faults = request.app["faults"]
+    request.app["stats"]["requests"] += 1
+    if random.random() < faults["error_rate"]:
+        request.app["stats"]["errors"] += 1
+        return web.json_response({"error": {"message": "Injected failure", "type": "server_error"}},
+                                 status=faults["error_status"])
+    if random.random() < faults["hang_rate"]:
+        # Відповідь не прийде ніколи: клієнт має обірвати запит за дедлайном
+        request.app["stats"]["hangs"] += 1
+        await asyncio.sleep(3600)
+    if random.random() < faults["slow_rate"]:
+        # Хвіст затримок: саме ці запити має обганяти дублюючий запит
+        request.app["stats"]["slow"] += 1
+        await asyncio.sleep(faults["slow_delay"])
+    return None
+
+
+async def faults_handler(request: web.Request) -> web.Response:
+    """GET - поточні налаштування збоїв і лічильники; POST з JSON - змінює налаштування без перезапуску."""
+    if request.method == "POST":
+        changes = await request.json()
+        request.app["faults"].update({name: changes[name] for name in FAULT_NAMES if name in changes})
+    return web.json_response({"faults": request.app["faults"], "stats": request.app["stats"]})
+
+
+async def chat_completions(request: web.Request) -> web.StreamResponse:
+    payload = await request.json()
+    prompt = payload["messages"][-1]["content"]
+    fault_response = await inject_fault(request)
+    if fault_response is not None:
+        return fault_response
+
+    content = build_content(prompt, payload.get("response_format"))
+    if random.random() < request.app["faults"]["garbage_rate"]:
+        # Модель відповіла не в тому форматі (наприклад, лише номер категорії замість JSON)
+        content = "10"
+    if payload.get("stream"):
+        return await stream_completion(request, payload, content)
+
+    await asyncio.sleep(request.app["delay"])
+    return web.json_response({
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": usage_for(prompt, content),
+    })
+
+
+def create_app(delay: float, ttft: float = 0.2, faults: dict = None) -> web.Application:
+    app = web.Application()
+    app["delay"] = delay
+    app["ttft"] = ttft
+    app["faults"] = {"error_rate": 0.0, "error_status": 500, "hang_rate": 0.0, "slow_rate": 0.0, "slow_delay": 5.0,
+                     "garbage_rate": 0.0, **(faults or {})}
+    app["stats"] = {"requests": 0, "errors": 0, "hangs": 0, "slow": 0}
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_route("*", "/faults", faults_handler)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--delay", type=float, default=0.8, help="Simulated completion latency, seconds")
+    parser.add_argument("--ttft", type=float, default=0.2,
+                        help="Time to first token of streamed replies, as a fraction of --delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected errors (500, 503, 429)")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of requests that never get a response")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests delayed by --slow-delay")
+    parser.add_argument("--slow-delay", type=float, default=5.0, help="Extra latency of slow requests, seconds")
+    parser.add_argument("--garbage-rate", type=float, default=0.0,
+                        help="Fraction of completions with malformed content instead of the expected JSON")
+    args = parser.parse_args()
+
+    faults = {name: getattr(args, name) for name in FAULT_NAMES}
+    web.run_app(create_app(args.delay, args.ttft, faults), host=args.host, port=args.port)
@@ -0,0 +1,165 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import configuration
+from Services.CatalogCache import CatalogCache
+from Services.FlowerService import FlowerPage, FlowerService
+from Services.HttpClient import HttpClient
+
+
+@pytest.fixture(autouse=True)
+def catalog_cache(monkeypatch):
+    """Стан CatalogCache - атрибути класу: кожен тест починає з порожнього кешу без Redis."""
+    monkeypatch.setattr(CatalogCache, '_redis', None)
+    monkeypatch.setattr(CatalogCache, '_local', {})
+    monkeypatch.setattr(CatalogCache, '_inflight', {})
+    monkeypatch.setattr(CatalogCache, '_validators', {})
+    monkeypatch.setattr(CatalogCache, 'version', '1')
+    monkeypatch.setattr(CatalogCache, 'metrics', dict.fromkeys(CatalogCache.metrics, 0))
+    return CatalogCache
+
+
+class Loader:
+    """Завантажувач, що рахує виклики і повертає наступне значення зі списку."""
+
+    def __init__(self, *values, delay: float = 0):
+        self.values = list(values)
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.values[min(self.calls, len(self.values)) - 1]
+
+
+def age_entry(key: str, seconds: float):
+    value, fetched_at, version = CatalogCache._local[key]
+    CatalogCache._local[key] = (value, fetched_at - seconds, version)
+
+
+def test_fresh_entry_is_served_from_memory():
+    loader = Loader(['троянда'])
+
+    async def run():
+        assert await CatalogCache.get('names', loader) == ['троянда']
+        assert await CatalogCache.get('names', loader) == ['троянда']
+
+    asyncio.run(run())
+    assert loader.calls == 1
+    assert CatalogCache.metrics['local_hits'] == 1
+
+
+def test_stale_entry_is_served_while_revalidating():
+    loader = Loader(['старе'], ['нове'], delay=0.01)
+
+    async def run():
+        await CatalogCache.get('names', loader)
+        age_entry('names', CatalogCache.ttl + 1)
+
+        # Застаріле значення віддається одразу, свіже завантажується у фоні
+        assert await CatalogCache.get('names', loader) == ['старе']
+        assert 'names' in CatalogCache._inflight
+        await CatalogCache._inflight['names']
+        assert await CatalogCache.get('names', loader) == ['нове']
+
+    asyncio.run(run())
+    assert loader.calls == 2
+    assert CatalogCache.metrics['stale_served'] == 1
+
+
+def test_entry_older_than_stale_ttl_is_reloaded_synchronously():
+    loader = Loader(['старе'], ['нове'])
+
+    async def run():
+        await CatalogCache.get('names', loader)
+        age_entry('names', CatalogCache.ttl + CatalogCache.stale_ttl + 1)
+        assert await CatalogCache.get('names', loader) == ['нове']
+
+    asyncio.run(run())
+    assert CatalogCache.metrics['stale_served'] == 0
+
+
+def test_concurrent_misses_share_one_load():
+    loader = Loader(['троянда'], delay=0.05)
+
+    async def run():
+        results = await asyncio.gather(*(CatalogCache.get('names', loader) for _ in range(10)))
+        assert results == [['троянда']] * 10
+        assert CatalogCache._inflight == {}
+
+    asyncio.run(run())
+    assert loader.calls == 1
+
+
+def test_failed_load_is_not_cached():
+    loader = Loader([], ['троянда'])
+
+    async def run():
+        assert await CatalogCache.get('names', loader) == []
+        assert await CatalogCache.get('names', loader) == ['троянда']
+
+    asyncio.run(run())
+    assert loader.calls == 2
+
+
+def test_invalidation_drops_entries_and_data_loaded_before_it():
+    async def invalidated_loader():
+        CatalogCache.invalidate('2')
+        return ['до інвалідації']
+
+    async def run():
+        assert await CatalogCache.get('names', invalidated_loader) == ['до інвалідації']
+        assert 'names' not in CatalogCache._local
+
+    asyncio.run(run())
+
+
+def test_reload_after_invalidation_revalidates_with_etag(monkeypatch):
+    flowers = {'flowers': [{'id': 1, 'name': 'Тюльпан', 'quantity': 5}], 'total_flowers': 1, 'page': 1,
+               'per_page': 10, 'next_after_id': None}
+    requests = []
+
+    async def all_flowers(request):
+        requests.append(request.headers.get('If-None-Match'))
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304, headers={'ETag': '"v1"'})
+        return web.json_response(flowers, headers={'ETag': '"v1"'})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/api/resources/all_flowers', all_flowers)
+        server = TestServer(app)
+        await server.start_server()
+        monkeypatch.setitem(configuration.API_URLS, 'all_flowers', str(server.make_url('/api/resources/all_flowers')))
+        try:
+            service = FlowerService()
+            first = await service.fetch_all_flowers(1, 10)
+            CatalogCache.invalidate('2')
+            second = await service.fetch_all_flowers(1, 10)
+        finally:
+            await HttpClient.close()
+            await server.close()
+
+        assert isinstance(first, FlowerPage)
+        assert second == first
+        assert second.flowers[0].name == 'Тюльпан'
+
+    asyncio.run(run())
+    # Повторне завантаження - умовний запит, на який бекенд відповів 304 без тіла
+    assert requests == [None, '"v1"']
+    assert CatalogCache.metrics['not_modified'] == 1
+
+
+def test_validators_are_bounded(monkeypatch):
+    monkeypatch.setattr(CatalogCache, 'MAX_VALIDATORS', 2)
+    for key in ('a', 'b', 'c'):
+        CatalogCache.remember(key, f'"{key}"', [key])
+
+    assert list(CatalogCache._validators) == ['b', 'c']
+    assert CatalogCache.conditional_headers('a') == {}
+    assert CatalogCache.conditional_headers('c') == {'If-None-Match': '"c"'}
+
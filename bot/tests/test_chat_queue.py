@@ -0,0 +1,120 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('aiogram')
+
+from configuration import CHAT_QUEUE_SETTINGS  # noqa: E402
+from Services.ChatQueue import ChatQueueMiddleware, LLMConcurrencyMiddleware  # noqa: E402
+
+SETTINGS = {**CHAT_QUEUE_SETTINGS, 'distributed_lock': False, 'coalesce': True, 'max_coalesced': 5}
+
+
+class FakeState:
+    def __init__(self, state=None):
+        self.state = state
+
+    async def get_state(self):
+        return self.state
+
+
+def update(update_id: int, text: str):
+    return SimpleNamespace(update_id=update_id, message=SimpleNamespace(text=text))
+
+
+async def send_burst(middleware, texts: list, state=None) -> tuple:
+    """
+    Надсилає перше повідомлення і, поки його хендлер зайнятий, решту.
+    :return: (тексти, які отримали хендлери, результати всіх викликів middleware)
+    """
+    busy = asyncio.Event()
+    release = asyncio.Event()
+    handled = []
+
+    async def handler(event, data):
+        handled.append(data['coalesced_text'])
+        if not busy.is_set():
+            busy.set()
+            await release.wait()
+        return event.update_id
+
+    def dispatch(update_id, text):
+        data = {'event_chat': SimpleNamespace(id=1), 'state': FakeState(state)}
+        return asyncio.ensure_future(middleware(handler, update(update_id, text), data))
+
+    tasks = [dispatch(1, texts[0])]
+    await busy.wait()
+    tasks += [dispatch(update_id, text) for update_id, text in enumerate(texts[1:], 2)]
+    await asyncio.sleep(0)  # Решта оновлень стає в чергу чату
+    release.set()
+    return handled, await asyncio.gather(*tasks)
+
+
+def test_burst_is_coalesced_outside_fsm_state():
+    middleware = ChatQueueMiddleware(settings=SETTINGS)
+    coalesced_before = ChatQueueMiddleware.counters['coalesced']
+
+    handled, results = asyncio.run(send_burst(middleware, ['привіт', 'хочу', 'троянди', 'на завтра']))
+
+    assert handled == ['привіт', 'хочу\nтроянди\nна завтра']
+    # Об'єднані оновлення пропускаються, хендлер для них не викликається
+    assert results == [1, 2, None, None]
+    assert ChatQueueMiddleware.counters['coalesced'] - coalesced_before == 2
+    assert middleware._chats == {}
+
+
+def test_messages_are_not_coalesced_in_fsm_state():
+    middleware = ChatQueueMiddleware(settings=SETTINGS)
+
+    handled, results = asyncio.run(send_burst(middleware, ['так', 'ні', 'так'], state='waiting_for_confirmation'))
+
+    assert handled == ['так', 'ні', 'так']
+    assert results == [1, 2, 3]
+
+
+def test_burst_is_capped_by_max_coalesced():
+    middleware = ChatQueueMiddleware(settings={**SETTINGS, 'max_coalesced': 2})
+
+    handled, results = asyncio.run(send_burst(middleware, ['a', 'b', 'c', 'd', 'e']))
+
+    assert handled == ['a', 'b\nc', 'd\ne']
+    assert results == [1, 2, None, 4, None]
+
+
+def test_coalescing_can_be_disabled():
+    middleware = ChatQueueMiddleware(settings={**SETTINGS, 'coalesce': False})
+    handled = []
+
+    async def handler(event, data):
+        handled.append(data.get('coalesced_text'))
+
+    async def run():
+        data = {'event_chat': SimpleNamespace(id=1), 'state': FakeState()}
+        await middleware(handler, update(1, 'привіт'), data)
+
+    asyncio.run(run())
+    assert handled == [None]
+
+
+def test_llm_handlers_are_limited():
+    middleware = LLMConcurrencyMiddleware(limit=2)
+    running = 0
+    peak = 0
+
+    async def handler(event, data):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def run():
+        llm = {'handler': SimpleNamespace(flags={'llm': True})}
+        await asyncio.gather(*(middleware(handler, None, dict(llm)) for _ in range(6)))
+        assert peak == 2
+        # Хендлери без прапорця llm не чекають на семафор
+        await asyncio.gather(*(middleware(handler, None, {}) for _ in range(6)))
+        assert peak == 6
+
+    asyncio.run(run())
@@ -0,0 +1,66 @@
+import pytest
+
+from Services.FlowerMatcher import FlowerMatcher, stem
+
+CATALOG = ['Червона троянда', 'Біла троянда', 'Тюльпан', 'Півонія', 'Біла лілія', 'Соняшник', 'Хризантема', 'Ромашка']
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return FlowerMatcher(CATALOG)
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('тюльпанів', ['Тюльпан']),
+    ('півоній', ['Півонія']),
+    ('півоніями', ['Півонія']),
+    ('півонії', ['Півонія']),
+    ('хризантеми', ['Хризантема']),
+    ('лілію', ['Біла лілія']),
+    ('соняшники', ['Соняшник']),
+    ('червоних троянд', ['Червона троянда']),
+])
+def test_declensions_match_catalog_name(matcher, query, expected):
+    assert matcher.match(query) == expected
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('тюлпан', ['Тюльпан']),
+    ('хрезантеми', ['Хризантема']),
+    ('ромашкі', ['Ромашка']),
+    ('піонія', ['Півонія']),
+])
+def test_typos_match_catalog_name(matcher, query, expected):
+    assert matcher.match(query) == expected
+
+
+def test_transliteration_typo_matches_all_roses(matcher):
+    assert sorted(matcher.match('тройанда')) == ['Біла троянда', 'Червона троянда']
+
+
+def test_stop_words_are_ignored(matcher):
+    assert sorted(matcher.match('чи є у вас троянди?')) == ['Біла троянда', 'Червона троянда']
+
+
+def test_color_narrows_matches(matcher):
+    assert matcher.match('білі троянди') == ['Біла троянда']
+    assert sorted(matcher.match('білих квітів')) == ['Біла лілія', 'Біла троянда']
+
+
+def test_color_missing_from_catalog_matches_nothing(matcher):
+    # Жовтих троянд немає: порожній список, а не інші троянди
+    assert matcher.match('жовті троянди') == []
+
+
+def test_several_flowers_in_one_query(matcher):
+    assert matcher.match('ромашки і тюльпани') == ['Ромашка', 'Тюльпан']
+
+
+@pytest.mark.parametrize('query', ['кактус', 'хочу щось гарне', 'чи є у вас'])
+def test_unknown_or_vague_query_is_left_to_llm(matcher, query):
+    assert matcher.match(query) is None
+
+
+def test_stem_keeps_short_words():
+    assert stem('троянди') == stem('трояндами') == 'троянд'
+    assert stem('мак') == 'мак'
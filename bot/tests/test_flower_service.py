@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import configuration
+from Services.CatalogCache import CatalogCache
+from Services.FlowerService import FlowerService
+from Services.HttpClient import HttpClient
+
+
+@pytest.fixture
+def slow_backend(monkeypatch):
+    """Бекенд, що відповідає довше за таймаут спільної сесії."""
+    monkeypatch.setitem(configuration.HTTP_SETTINGS, 'request_timeout', 0.1)
+    monkeypatch.setattr(CatalogCache, '_redis', None)
+    monkeypatch.setattr(CatalogCache, '_local', {})
+    monkeypatch.setattr(CatalogCache, '_inflight', {})
+
+    async def slow(request):
+        await asyncio.sleep(1)
+        return web.json_response({})
+
+    async def run(call):
+        app = web.Application()
+        app.router.add_get('/{name}', slow)
+        server = TestServer(app)
+        await server.start_server()
+        for name in ('all_flowers', 'flower_by_id', 'flower_names'):
+            monkeypatch.setitem(configuration.API_URLS, name, str(server.make_url(f'/{name}')))
+        try:
+            return await call(FlowerService())
+        finally:
+            await HttpClient.close()
+            await server.close()
+
+    return lambda call: asyncio.run(run(call))
+
+
+def test_catalog_page_timeout_returns_none(slow_backend):
+    # Як і решта запитів, завантажувач сторінки сам обробляє таймаут, а не покладається на CatalogCache
+    params = {'page': 1, 'per_page': 10}
+    assert slow_backend(lambda service: service._request_all_flowers(params, 'all_flowers:1:10')) == {}
+    assert slow_backend(lambda service: service.fetch_all_flowers(1, 10)) is None
+
+
+def test_flower_names_timeout_returns_empty(slow_backend):
+    assert slow_backend(lambda service: service.fetch_flower_names()) == ()
+
+
+def test_flower_by_id_timeout_returns_none(slow_backend):
+    assert slow_backend(lambda service: service.get_flower_by_id(1)) is None
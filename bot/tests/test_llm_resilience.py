@@ -0,0 +1,180 @@
+import asyncio
+import contextlib
+import json
+import time
+
+import pytest
+
+pytest.importorskip('openai')
+
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+import configuration  # noqa: E402
+from Handlers.GPTService import GPTService  # noqa: E402
+from Services.LLMResilience import CircuitBreaker, CircuitOpenError, LLMResilience  # noqa: E402
+from scripts.stub_llm_server import create_app  # noqa: E402
+
+OPEN_SECONDS = 0.2
+
+
+def settings(**overrides) -> dict:
+    """LLM_RESILIENCE_SETTINGS з короткими паузами, щоб тести не чекали секундами."""
+    return {**configuration.LLM_RESILIENCE_SETTINGS, 'backoff_base': 0.01, 'backoff_max': 0.02,
+            'failure_threshold': 2, 'open_seconds': OPEN_SECONDS, **overrides}
+
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=OPEN_SECONDS)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(OPEN_SECONDS)
+    assert breaker.allow()  # Пробний виклик
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # Другий виклик чекає на результат пробного
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=OPEN_SECONDS)
+    breaker.record_failure()
+    time.sleep(OPEN_SECONDS)
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+    assert not breaker.allow()
+
+
+def test_retryable_error_is_retried():
+    resilience = LLMResilience(settings(failure_threshold=5))
+    calls = []
+
+    async def operation():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise asyncio.TimeoutError()
+        return 'ok'
+
+    assert asyncio.run(resilience.call(operation, hedge=False)) == 'ok'
+    assert len(calls) == 2
+    assert resilience.metrics['retries'] == 1
+    assert resilience.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_retryable_error_is_raised_at_once():
+    resilience = LLMResilience(settings())
+
+    async def operation():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(resilience.call(operation, hedge=False))
+    assert resilience.metrics['attempts'] == 1
+    assert resilience.breaker.failures == 0
+
+
+def test_slow_request_is_hedged_and_loser_cancelled():
+    resilience = LLMResilience(settings(hedge_default_delay=0.05))
+    cancelled = []
+
+    async def operation():
+        if resilience.metrics['attempts'] == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        return 'hedged'
+
+    started = time.monotonic()
+    assert asyncio.run(resilience.call(operation)) == 'hedged'
+    assert time.monotonic() - started < 1
+    assert resilience.metrics['hedges'] == 1
+    assert resilience.metrics['hedge_wins'] == 1
+    assert cancelled == [True]
+
+
+def test_open_breaker_short_circuits_without_calling():
+    resilience = LLMResilience(settings())
+    resilience.breaker.record_failure()
+    resilience.breaker.record_failure()
+
+    async def operation():
+        raise AssertionError("provider must not be called while the breaker is open")
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilience.call(operation))
+    assert resilience.metrics['short_circuited'] == 1
+
+
+@contextlib.asynccontextmanager
+async def stub_gpt_service(monkeypatch, faults: dict):
+    """GPTService, спрямований на scripts/stub_llm_server.py з інжекцією збоїв."""
+    stub = create_app(delay=0.01, faults=faults)
+    server = TestServer(stub)
+    await server.start_server()
+    monkeypatch.setitem(configuration.GPT_SETTINGS, 'api_key', 'test')
+    monkeypatch.setitem(configuration.GPT_SETTINGS, 'base_url', str(server.make_url('/v1')))
+    for name, value in settings().items():
+        monkeypatch.setitem(configuration.LLM_RESILIENCE_SETTINGS, name, value)
+    try:
+        yield GPTService(), stub
+    finally:
+        await GPTService.close()
+        await server.close()
+
+
+async def collect(chunks) -> str:
+    return ''.join([chunk async for chunk in chunks])
+
+
+def test_provider_outage_opens_breaker_and_uses_local_fallbacks(monkeypatch):
+    async def run():
+        async with stub_gpt_service(monkeypatch, {'error_rate': 1.0}) as (gpt, stub):
+            classification = json.loads(await gpt.gpt_classify_intent("Добрий день", 'initial'))
+            assert classification == GPTService.FALLBACK_CLASSIFICATION
+            assert gpt.resilience.breaker.state == CircuitBreaker.OPEN
+
+            # Поки breaker відкритий, провайдер не отримує запитів, а відповіді беруться локально
+            requests = stub['stats']['requests']
+            reply = await collect(gpt.gpt_generate_reply("Добрий день", "1", 'initial'))
+            assert reply == GPTService.LOCAL_REPLIES["1"]
+            local = json.loads(await gpt.gpt_classify_intent("Привіт", 'initial', fallback=lambda: {
+                'classification': 1, 'additional_info': ''}))
+            assert local['classification'] == 1
+            assert stub['stats']['requests'] == requests
+            assert gpt.resilience.metrics['short_circuited'] == 2
+
+            # Провайдер відновився: після open_seconds пробний запит закриває breaker
+            stub['faults']['error_rate'] = 0.0
+            await asyncio.sleep(OPEN_SECONDS)
+            classification = json.loads(await gpt.gpt_classify_intent("Добрий день", 'initial'))
+            assert classification['classification'] == 1
+            assert gpt.resilience.breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(run())
+
+
+def test_hedged_duplicate_does_not_take_second_semaphore_slot(monkeypatch):
+    async def run():
+        async with stub_gpt_service(monkeypatch, {'slow_rate': 1.0, 'slow_delay': 0.3}) as (gpt, stub):
+            gpt.resilience.hedge_default_delay = 0.05
+            gpt.semaphore = asyncio.Semaphore(1)
+
+            await gpt.send_to_gpt("Привіт")
+
+            assert gpt.resilience.metrics['hedges'] == 1
+            assert stub['stats']['requests'] == 2
+            assert not gpt.semaphore.locked()
+
+    asyncio.run(run())
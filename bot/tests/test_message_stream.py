@@ -0,0 +1,121 @@
+import asyncio
+import math
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('aiogram')
+
+from aiogram.exceptions import TelegramRetryAfter  # noqa: E402
+from aiogram.methods import EditMessageText  # noqa: E402
+
+from configuration import STREAMING_SETTINGS  # noqa: E402
+from Services.MessageStream import MessageStream, split_text  # noqa: E402
+
+LIMIT = STREAMING_SETTINGS['max_length']
+CURSOR = STREAMING_SETTINGS['cursor']
+
+
+class FakeChat:
+    """Чат Telegram: надіслані повідомлення з історією їх редагувань."""
+
+    def __init__(self, retry_after_edits: int = 0):
+        self.messages = []
+        self.retry_after_edits = retry_after_edits  # Скільки редагувань поспіль відхилити з RetryAfter
+        self.chat = SimpleNamespace(id=1)
+        self.bot = SimpleNamespace(send_chat_action=self._send_chat_action)
+
+    async def _send_chat_action(self, chat_id, action):
+        pass
+
+    async def answer(self, text, parse_mode=None):
+        assert len(text) <= LIMIT
+        sent = SentMessage(self, text)
+        self.messages.append(sent)
+        return sent
+
+
+class SentMessage:
+    def __init__(self, chat: FakeChat, text: str):
+        self.chat = chat
+        self.versions = [text]
+
+    @property
+    def text(self):
+        return self.versions[-1]
+
+    async def edit_text(self, text, parse_mode=None):
+        assert len(text) <= LIMIT
+        if self.chat.retry_after_edits:
+            self.chat.retry_after_edits -= 1
+            raise TelegramRetryAfter(EditMessageText(text=text), 'Too Many Requests', 0)
+        self.versions.append(text)
+
+
+async def chunked(text: str, size: int):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def stream(chat: FakeChat, chunks, **settings) -> str:
+    return asyncio.run(MessageStream(chat, settings={**STREAMING_SETTINGS, **settings}).run(chunks))
+
+
+def test_split_text_prefers_paragraph_then_word_boundary():
+    assert split_text("перший абзац\nдругий абзац", 20) == ("перший абзац", "другий абзац")
+    assert split_text("одне довге речення без абзаців", 12) == ("одне довге", "речення без абзаців")
+    assert split_text("x" * 10, 4) == ("xxxx", "xxxxxx")
+
+
+def test_long_reply_continues_in_next_messages():
+    text = " ".join(f"слово{i}" for i in range(2000))
+    chat = FakeChat()
+
+    assert stream(chat, chunked(text, 50), edit_interval=0) == text
+
+    assert len(chat.messages) == math.ceil(len(text) / LIMIT)
+    # Кожне повідомлення, крім останнього, заповнене до ліміту з точністю до слова
+    assert all(LIMIT - 20 < len(message.text) <= LIMIT for message in chat.messages[:-1])
+    assert " ".join(message.text for message in chat.messages) == text
+
+
+def test_edits_are_rate_limited():
+    text = "а" * 2000
+    chat = FakeChat()
+
+    stream(chat, chunked(text, 10), edit_interval=3600)
+
+    # Перша частина надсилається одразу, далі лише фінальне редагування з повним текстом
+    [message] = chat.messages
+    assert message.versions == ["а" * 10 + CURSOR, text]
+
+
+def test_intermediate_edits_show_cursor_and_final_removes_it():
+    text = "б" * 400
+    chat = FakeChat()
+
+    stream(chat, chunked(text, 100), edit_interval=0, min_chars=50)
+
+    [message] = chat.messages
+    assert all(version.endswith(CURSOR) for version in message.versions[:-1])
+    assert len(message.versions) == 5
+    assert message.text == text
+
+
+def test_retry_after_skips_intermediate_edit_and_retries_final():
+    text = "в" * 300
+    chat = FakeChat(retry_after_edits=2)
+
+    stream(chat, chunked(text, 100), edit_interval=0, min_chars=100)
+
+    # Перше проміжне редагування відхилено і пропущено, фінальне повторено після паузи
+    [message] = chat.messages
+    assert message.text == text
+    assert chat.retry_after_edits == 0
+
+
+def test_empty_generator_sends_nothing():
+    chat = FakeChat()
+
+    assert stream(chat, chunked("", 10)) == ""
+    assert chat.messages == []